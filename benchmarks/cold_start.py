@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module benchmarks the cold start of pyrover, that is the time a fresh interpreter spends
+importing pyrover.mission, as reported by python -X importtime. The median over several runs is
+compared against a budget, and the script exits with a non zero status when the budget is
+exceeded, so that it can be used as a gate.
+
+    $ python benchmarks/cold_start.py --runs 20 --budget 20000
+'''
+
+from argparse import ArgumentParser
+from os.path import abspath, dirname
+from statistics import median
+from subprocess import run, PIPE
+from sys import executable, exit
+
+
+def measure(module='pyrover.mission'):
+    '''
+    Imports the given module in a fresh interpreter and returns the cumulative import time of the
+    module, in microseconds, along with the per module breakdown.
+    '''
+    process = run(
+                    [executable, '-X', 'importtime', '-c', 'import %s' % (module)],
+                    cwd=dirname(dirname(abspath(__file__))),
+                    stderr=PIPE,
+                    universal_newlines=True,
+                    check=True,
+                    )
+    breakdown = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            breakdown[name.strip()] = int(cumulative)
+    return breakdown[module], breakdown
+
+
+def main(argv=None):
+    parser = ArgumentParser(description="Benchmarks the cold start of pyrover.")
+    parser.add_argument('--module', default='pyrover.mission')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--budget', type=int, default=20000, help="import time budget, in microseconds")
+    args = parser.parse_args(argv)
+
+    timings = []
+    for _ in range(args.runs):
+        cumulative, breakdown = measure(args.module)
+        timings.append(cumulative)
+    slowest = sorted(breakdown.items(), key=lambda item: item[1], reverse=True)[:10]
+
+    print("%s: median %d us, min %d us, max %d us over %d runs (budget %d us)" % (args.module, median(timings), min(timings), max(timings), args.runs, args.budget))
+    for name, cumulative in slowest:
+        print("    %8d us  %s" % (cumulative, name))
+    if median(timings) > args.budget:
+        print("The import time budget was exceeded!")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
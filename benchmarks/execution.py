@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module benchmarks the execution of rovers by the reference engine, that is Rover.send followed
+by Rover.execute_instructions, against the reference loop executing every instruction on its own.
+Long runs of M instructions are validated by the destination in a single call, so that the script
+measures both programs mixing instructions at random, which are made of short runs, and programs of
+long straight runs. The former must not get any slower.
+
+    $ python benchmarks/execution.py --rovers 4000 --length 200 --runs 3
+'''
+
+import sys
+from argparse import ArgumentParser
+from os.path import abspath, dirname
+from random import Random
+from statistics import median
+from time import perf_counter
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from pyrover.mars import Mars
+from pyrover.rover import Rover
+
+
+def generate_rovers(rovers, size, length, straight, seed=1234):
+    '''
+    Returns the landing co-ordinates and the instructions of the given number of random rovers, on
+    a square plateau. Straight programs are made of runs of length // 4 moves.
+    '''
+    generator = Random(seed)
+    blueprints = []
+    for _ in range(rovers):
+        landing_coords = {'x' : generator.randint(0, size), 'y' : generator.randint(0, size), 'facing' : generator.choice('NESW')}
+        if straight:
+            instructions = ''.join('M' * (length // 4) + generator.choice('LR') for _ in range(4))
+        else:
+            instructions = ''.join(generator.choice('LRM') for _ in range(length))
+        blueprints.append((landing_coords, instructions))
+    return blueprints
+
+
+def measure(blueprints, size, collisions, stepwise):
+    '''
+    Executes the given rovers on a fresh plateau, and returns the time it took, in seconds, along
+    with the final state of the rovers.
+    '''
+    handle_mars = Mars(size, size, collisions=collisions)
+    rovers = [Rover(dict(landing_coords), handle_mars, instructions, validate=False) for landing_coords, instructions in blueprints]
+    started = perf_counter()
+    for rover in rovers:
+        rover.send()
+        rover.execute_instructions(stepwise=stepwise)
+    elapsed = perf_counter() - started
+    return elapsed, [(rover._status, rover._current_position, rover._last_known_position) for rover in rovers]
+
+
+def main(argv=None):
+    parser = ArgumentParser(description="Benchmarks the execution of rovers, with and without batched runs of moves.")
+    parser.add_argument('--rovers', type=int, default=4000)
+    parser.add_argument('--size', type=int, default=1000)
+    parser.add_argument('--length', type=int, default=200)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--collisions', action='store_true')
+    args = parser.parse_args(argv)
+
+    print("%d rovers of %d instructions, on a %dx%d plateau" % (args.rovers, args.length, args.size, args.size))
+    for workload, straight in (('mixed', False), ('straight', True)):
+        blueprints = generate_rovers(args.rovers, args.size, args.length, straight)
+        timings, states = {}, []
+        for name, stepwise in (('stepwise', True), ('batched', False)):
+            timings[name] = []
+            for _ in range(args.runs):
+                elapsed, final_states = measure(blueprints, args.size, args.collisions, stepwise)
+                timings[name].append(elapsed)
+            states.append(final_states)
+        if states[0] != states[1]:
+            print("The final states of the %s rovers differ!" % (workload))
+            return 1
+        stepwise, batched = median(timings['stepwise']), median(timings['batched'])
+        print("    %-8s  stepwise %8.3f s  batched %8.3f s  speedup %5.2fx" % (workload, stepwise, batched, stepwise / batched))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module benchmarks the execution of a mission on threads against its execution on worker
+processes, and against the sequential one through both the reference and the table engine, the
+latter running the same kernel as the threads and processes do. Threads spare pickling the batches
+and starting the workers, but only run in parallel on free-threaded builds of CPython, so that the
+script reports whether the global interpreter lock is enabled, and is meant to be run on both.
+
+    $ python benchmarks/threads.py --rovers 20000 --workers 4 --runs 3
+    $ python3.13t benchmarks/threads.py --rovers 20000 --workers 4 --runs 3
+'''
+
+import sys
+from argparse import ArgumentParser
+from io import StringIO
+from os.path import abspath, dirname
+from random import Random
+from statistics import median
+from time import perf_counter
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from pyrover.mission import Mission
+
+
+def generate_blueprints(rovers, size, length, seed=1234):
+    '''
+    Returns the blueprints of a random mission of the given number of rovers, on a square plateau.
+    '''
+    generator = Random(seed)
+    lines = ["%s %s" % (size, size)]
+    for _ in range(rovers):
+        lines.append("%s %s %s" % (generator.randint(0, size), generator.randint(0, size), generator.choice('NESW')))
+        lines.append(''.join(generator.choice('LRMM') for _ in range(length)))
+    return '\n'.join(lines) + '\n'
+
+
+def gil_enabled():
+    '''
+    Returns True if the global interpreter lock is enabled, as it always is before CPython 3.13.
+    '''
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+def measure(blueprints, collisions, engine, start_kwargs):
+    '''
+    Sets a mission up out of the given blueprints, and returns the time its start took, in seconds,
+    along with its outcome.
+    '''
+    handle_mission = Mission(StringIO(blueprints), collisions=collisions, engine=engine)
+    handle_mission.setup()
+    started = perf_counter()
+    handle_mission.start(**start_kwargs)
+    return perf_counter() - started, handle_mission.outcome
+
+
+def main(argv=None):
+    parser = ArgumentParser(description="Benchmarks the execution of a mission on threads and on processes.")
+    parser.add_argument('--rovers', type=int, default=20000)
+    parser.add_argument('--size', type=int, default=1000)
+    parser.add_argument('--length', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--collisions', action='store_true')
+    args = parser.parse_args(argv)
+
+    blueprints = generate_blueprints(args.rovers, args.size, args.length)
+    modes = (
+                ('reference', 'reference', {}),
+                ('table', 'table', {}),
+                ('processes', 'reference', {'parallel' : True, 'workers' : args.workers}),
+                ('threads', 'reference', {'threads' : args.workers}),
+                )
+
+    print("Python %s, GIL %s, %d rovers of %d instructions, %d workers" % (sys.version.split()[0], 'enabled' if gil_enabled() else 'disabled', args.rovers, args.length, args.workers))
+    outcomes, baseline = set(), None
+    for name, engine, start_kwargs in modes:
+        timings = []
+        for _ in range(args.runs):
+            elapsed, outcome = measure(blueprints, args.collisions, engine, start_kwargs)
+            timings.append(elapsed)
+            outcomes.add(outcome)
+        baseline = baseline or median(timings)
+        print("    %-10s  median %8.3f s  speedup %5.2fx" % (name, median(timings), baseline / median(timings)))
+    if len(outcomes) != 1:
+        print("The outcomes of the modes differ!")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+
+__version__ = '1.0.4'
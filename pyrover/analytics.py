@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module represent the analytics of a mission, that is aggregates kept incrementally as its
+rovers finish, rather than computed afterwards out of its outcome:
+
+ - A binned histogram of the final positions of the rovers still on the plateau.
+ - A binned histogram of the loss sites, that is the last known position of each lost rover.
+ - The number of rovers facing each cardinal point, both among those still on the plateau and
+   among the lost ones.
+
+Histograms are fixed-size NumPy arrays, indexed by [bin_y, bin_x], whatever the number of rovers.
+Recording a rover only appends its bin to a buffer, and buffers are added to the arrays in batches,
+through a single array operation each. Heatmaps of shards of a mission can be merged. NumPy is an
+optional dependency, that must be installed to keep the heatmaps of a mission.
+'''
+
+import numpy
+
+
+# the default resolution of the histograms, as a (bins_x, bins_y) tuple
+DEFAULT_BINS = (64, 64)
+# the buffered rovers are added to the arrays once there are this many of them
+FLUSH_EVERY = 4096
+
+HEADINGS = {'N' : 0, 'E' : 1, 'S' : 2, 'W' : 3}
+
+
+class Heatmaps(object):
+    '''
+    This class represents the heatmaps of the rovers of a mission.
+    '''
+    def __init__(self, width, height, bins=DEFAULT_BINS):
+        '''
+        Initializes the Heatmaps of a plateau of the given width and height, as stored by Mars.
+        bins is the (bins_x, bins_y) resolution of the histograms.
+        '''
+        if not isinstance(width, int) or not isinstance(height, int) or width < 1 or height < 1:
+            raise ValueError("The dimensions of the heatmaps must be both positive integers, not %s and %s." % (width, height))
+        if len(bins) != 2 or any(not isinstance(size, int) or size < 1 for size in bins):
+            raise ValueError("The bins of the heatmaps must be two positive integers, not %s." % (bins,))
+        self._bins = tuple(bins)
+        self._buffers = ([], [])
+        self._counts = numpy.zeros((2, bins[0] * bins[1]), dtype=numpy.int64)
+        self._height = height
+        self._headings = numpy.zeros((2, 4), dtype=numpy.int64)
+        self._width = width
+
+    def __getstate__(self):
+        self.flush()
+        return self.__dict__
+
+    def __len__(self):
+        '''
+        Returns the number of rovers recorded.
+        '''
+        return int(self.headings.sum())
+
+    @property
+    def bins(self):
+        '''
+        Returns the resolution of the histograms, as a (bins_x, bins_y) tuple.
+        '''
+        return self._bins
+
+    @property
+    def final_positions(self):
+        '''
+        Returns the histogram of the final positions of the rovers still on the plateau.
+        '''
+        self.flush()
+        return self._counts[0].reshape(self._bins[1], self._bins[0])
+
+    @property
+    def loss_sites(self):
+        '''
+        Returns the histogram of the last known positions of the lost rovers.
+        '''
+        self.flush()
+        return self._counts[1].reshape(self._bins[1], self._bins[0])
+
+    @property
+    def headings(self):
+        '''
+        Returns the number of rovers facing N, E, S and W, in the first row for those still on the
+        plateau, and in the second for the lost ones.
+        '''
+        self.flush()
+        return self._headings
+
+    def bin_of(self, x, y):
+        '''
+        Returns the (bin_x, bin_y) bin the position x, y falls into.
+        '''
+        return x * self._bins[0] // self._width, y * self._bins[1] // self._height
+
+    def record(self, rover):
+        '''
+        Records a rover that finished, into the final positions if it is still on the plateau,
+        into the loss sites if it was lost. Rovers that never made it to the plateau have neither.
+        '''
+        if rover._status == 'LOST':
+            position, kind = rover._last_known_position, 1
+        else:
+            position, kind = rover._current_position, 0
+        if position is None:
+            return
+        bin_x, bin_y = self.bin_of(position['x'], position['y'])
+        buffer = self._buffers[kind]
+        buffer.append((bin_y * self._bins[0] + bin_x) * 4 + HEADINGS[position['facing']])
+        if len(buffer) >= FLUSH_EVERY:
+            self._flush(kind)
+
+    def flush(self):
+        '''
+        Adds the buffered rovers to the arrays.
+        '''
+        self._flush(0)
+        self._flush(1)
+
+    def _flush(self, kind):
+        '''
+        Adds the buffered rovers of the given kind, 0 for the final positions and 1 for the loss
+        sites, to the arrays. Each rover is buffered as its bin times 4 plus its heading, so that a
+        single integer holds both.
+        '''
+        buffer = self._buffers[kind]
+        if not buffer:
+            return
+        codes = numpy.array(buffer, dtype=numpy.int64)
+        numpy.add.at(self._counts[kind], codes >> 2, 1)
+        self._headings[kind] += numpy.bincount(codes & 3, minlength=4)
+        del buffer[:]
+
+    def merge(self, other):
+        '''
+        Adds the rovers recorded by other to these heatmaps. This allows the heatmaps of shards of
+        a mission to be combined.
+        '''
+        if not isinstance(other, Heatmaps):
+            raise TypeError("Only Heatmaps can be merged, not %s." % (type(other)))
+        if (other._width, other._height, other._bins) != (self._width, self._height, self._bins):
+            raise ValueError("Only heatmaps of plateaus of the same size, and with the same bins, can be merged.")
+        self.flush()
+        other.flush()
+        self._counts += other._counts
+        self._headings += other._headings
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module represent an on-disk cache of the results of rovers. Without collisions, the result of
+a rover is a pure function of the size of the plateau, its landing position and its instructions,
+so that it can be looked up by a hash of those, rather than executed again. Missions whose
+blueprints changed in a few rovers only execute those.
+
+Results are kept in a SQLite database. Entries are keyed by a SHA-256 digest that includes the
+version of pyrover, so that results computed by another version are never returned, and the least
+recently used ones are evicted once the cache holds more than its maximum number of entries.
+'''
+
+from pyrover import __version__
+
+
+# at most this many keys are looked up by a single query, SQLite bounding its parameters
+LOOKUP_CHUNK = 500
+
+
+class ResultCache(object):
+    '''
+    This class represents an on-disk, size-bounded cache of the results of rovers.
+    '''
+    def __init__(self, path, max_entries=100000):
+        '''
+        Opens the cache stored at the given path, creating it if needed. Entries stored by another
+        version of pyrover are dropped.
+        '''
+        import sqlite3
+
+        if not isinstance(max_entries, int) or max_entries < 1:
+            raise ValueError("A cache must hold at least one entry, not %s." % (max_entries))
+        self._clock = 0
+        self._hits = 0
+        self._max_entries = max_entries
+        self._misses = 0
+        self._path = path
+
+        self._connection = sqlite3.connect(path)
+        with self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS results (key BLOB PRIMARY KEY, status TEXT, x INTEGER, y INTEGER, facing TEXT, used INTEGER)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+            row = self._connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != __version__:
+                self._connection.execute("DELETE FROM results")
+                self._connection.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (__version__,))
+            self._clock = self._connection.execute("SELECT COALESCE(MAX(used), 0) FROM results").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        '''
+        Returns the number of entries in the cache.
+        '''
+        return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def __str__(self):
+        return "Cache %s holds %s results, %s hits and %s misses." % (self._path, len(self), self._hits, self._misses)
+
+    @staticmethod
+    def key(width, height, landing_coords, instructions):
+        '''
+        Returns the key of the result of a rover with the given landing co-ordinates and
+        instructions, on a plateau of the given size.
+        '''
+        from hashlib import sha256
+
+        blueprint = "%s\n%s %s\n%s %s %s\n%s" % (__version__, width, height, landing_coords['x'], landing_coords['y'], landing_coords['facing'], instructions)
+        return sha256(blueprint.encode('utf-8')).digest()
+
+    def get(self, key):
+        '''
+        Returns the result stored under the given key, as a (status, x, y, facing) tuple, or None
+        if there is none. Both outcomes are accounted for in the hit rate.
+        '''
+        return self.get_many([key])[0]
+
+    def get_many(self, keys):
+        '''
+        Returns the results stored under the given keys, in the same order, each as a (status, x,
+        y, facing) tuple, or None if there is none. The entries found are marked as used in a single
+        transaction, rather than one per entry.
+        '''
+        found = {}
+        for start in range(0, len(keys), LOOKUP_CHUNK):
+            chunk = keys[start:start + LOOKUP_CHUNK]
+            query = "SELECT key, status, x, y, facing FROM results WHERE key IN (%s)" % (', '.join('?' * len(chunk)))
+            for key, *result in self._connection.execute(query, chunk):
+                found[key] = tuple(result)
+
+        results, used = [], []
+        for key in keys:
+            result = found.get(key)
+            if result is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._clock += 1
+                used.append((self._clock, key))
+            results.append(result)
+        if used:
+            with self._connection:
+                self._connection.executemany("UPDATE results SET used = ? WHERE key = ?", used)
+        return results
+
+    def put_many(self, entries):
+        '''
+        Stores the given (key, (status, x, y, facing)) entries, then evicts the least recently used
+        entries in excess.
+        '''
+        rows = []
+        for key, (status, x, y, facing) in entries:
+            self._clock += 1
+            rows.append((key, status, x, y, facing, self._clock))
+        with self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)", rows)
+            excess = len(self) - self._max_entries
+            if excess > 0:
+                self._connection.execute("DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY used LIMIT ?)", (excess,))
+
+    def put(self, key, result):
+        '''
+        Stores a result, as a (status, x, y, facing) tuple, under the given key.
+        '''
+        self.put_many([(key, result)])
+
+    @property
+    def stats(self):
+        '''
+        Returns the number of hits and misses of the cache since it was opened, and its hit rate.
+        '''
+        lookups = self._hits + self._misses
+        return {'hits' : self._hits, 'misses' : self._misses, 'hit_rate' : self._hits / lookups if lookups else 0.0}
+
+    def close(self):
+        '''
+        Closes the cache.
+        '''
+        self._connection.close()
+
+
+def result_of(rover):
+    '''
+    Returns the result of a rover that executed its instructions, as a (status, x, y, facing)
+    tuple. The co-ordinates are None if the rover never landed.
+    '''
+    position = rover._current_position if rover._current_position is not None else rover._last_known_position
+    if position is None:
+        return rover._status, None, None, None
+    return rover._status, position['x'], position['y'], position['facing']
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module represent the execution of a mission sharded over several nodes, each of them a
+MissionServer, possibly running on another host, along with its pool of warm worker processes.
+
+Without collisions, the result of a rover depends on the size of the plateau, its landing position
+and its instructions only. The coordinator, that is the process that set the mission up, splits the
+rovers into batches, each sent to a node as the blueprints of a small mission through the batch
+request of the server protocol, and applies the results to its own rovers, in order, once every
+batch came back. The outcome is the same as the sequential one.
+
+Each connection to a node is served by its own thread, taking the next batch waiting as soon as
+the previous one is answered, so that faster nodes run more batches. A connection that cannot be
+opened, is closed, or does not answer within the timeout, is given up, and the batch it was running
+is handed to the other connections. A batch a node timed out on, rejected because it was busy, or
+lost because the worker running it died, is handed out again too, up to a given number of attempts.
+Any other error, such as invalid blueprints, would happen again, and fails the mission at once.
+'''
+
+import threading
+from collections import deque
+
+
+class ClusterError(Exception):
+    '''
+    This class represents a mission that could not be completed by the nodes of a cluster.
+    '''
+    pass
+
+
+def _batch_blueprints(width, height, programs):
+    '''
+    Returns the blueprints of a mission made of the given rovers, each represented by an (x, y,
+    facing, instructions) tuple, on a plateau of the given width and height, as stored by Mars.
+    '''
+    lines = ["%s %s" % (width - 1, height - 1)]
+    for x, y, facing, instructions in programs:
+        lines.append("%s %s %s" % (x, y, facing))
+        lines.append(instructions)
+    return '\n'.join(lines) + '\n'
+
+
+class Coordinator(object):
+    '''
+    This class represents the coordinator of a mission sharded over several nodes.
+    '''
+    def __init__(self, nodes, batch_size=10000, timeout=30.0, connections=1, attempts=3):
+        '''
+        Initializes a Coordinator over the given nodes, that is the addresses of MissionServers,
+        each either a (host, port) tuple or the path of a Unix socket. connections connections are
+        opened to each node, so that as many of its workers run batches at once.
+
+        A connection that does not answer within timeout seconds is given up, and a batch is
+        handed out at most attempts times.
+        '''
+        if not nodes:
+            raise ValueError("A Coordinator requires at least one node.")
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError("A batch must hold at least one rover, not %s." % (batch_size))
+        if not isinstance(connections, int) or connections < 1:
+            raise ValueError("A Coordinator requires at least one connection per node, not %s." % (connections))
+        if not isinstance(attempts, int) or attempts < 1:
+            raise ValueError("A batch must be handed out at least once, not %s." % (attempts))
+        if timeout is None or timeout <= 0:
+            raise ValueError("The timeout of a Coordinator must be a positive number, not %s." % (timeout))
+
+        self._attempts = attempts
+        self._batch_size = batch_size
+        self._connections = connections
+        self._nodes = list(nodes)
+        self._stats = None
+        self._timeout = timeout
+
+    @property
+    def stats(self):
+        '''
+        Returns the statistics of the last run: the number of batches, the number of times a batch
+        was handed out again, and the nodes whose connections were given up.
+        '''
+        return self._stats
+
+    def run(self, width, height, programs):
+        '''
+        Runs the given rovers, each represented by an (x, y, facing, instructions) tuple, on a
+        plateau of the given width and height, as stored by Mars. Returns the (status, x, y,
+        facing) result of each rover, in order.
+        '''
+        shards = [programs[i:i + self._batch_size] for i in range(0, len(programs), self._batch_size)]
+        batches = [(len(shard), _batch_blueprints(width, height, shard)) for shard in shards]
+        self._stats = {'batches' : len(batches), 'reassigned' : 0, 'failed_nodes' : []}
+        if not batches:
+            return []
+
+        state = {
+                    'stats' : self._stats,
+                    'pending' : deque(range(len(batches))),
+                    'attempts' : [0] * len(batches),
+                    'results' : [None] * len(batches),
+                    'remaining' : len(batches),
+                    'alive' : len(self._nodes) * self._connections,
+                    'error' : None,
+                    }
+        condition = threading.Condition()
+        threads = [threading.Thread(target=self._serve, args=(node, batches, state, condition), daemon=True) for node in self._nodes for _ in range(self._connections)]
+        for thread in threads:
+            thread.start()
+        # threads still waiting on a stalled node are not joined, they give up once it times out
+        with condition:
+            while state['remaining'] and state['error'] is None:
+                condition.wait()
+
+        if state['error'] is not None:
+            raise ClusterError(state['error'])
+        return [tuple(result) for results in state['results'] for result in results]
+
+    def _serve(self, node, batches, state, condition):
+        '''
+        Runs batches on a connection to the given node until none is left, or the connection is
+        given up.
+        '''
+        from pyrover.server import MissionClient, WORKER_DIED
+
+        client, index = None, None
+        try:
+            while True:
+                with condition:
+                    while not state['pending'] and state['remaining'] and state['error'] is None:
+                        condition.wait()
+                    if not state['remaining'] or state['error'] is not None:
+                        return
+                    index = state['pending'].popleft()
+                    state['attempts'][index] += 1
+
+                try:
+                    if client is None:
+                        client = MissionClient(node, timeout=self._timeout)
+                    size, blueprints = batches[index]
+                    response = client.batch(blueprints, index)
+                except (ConnectionError, OSError, ValueError):
+                    self._hand_back(index, state, condition, node)
+                    return
+
+                rovers = response.get('rovers')
+                with condition:
+                    if response.get('status') == 'OK' and isinstance(rovers, list) and len(rovers) == size:
+                        if state['results'][index] is None:
+                            state['results'][index] = rovers
+                            state['remaining'] -= 1
+                        condition.notify_all()
+                    elif response.get('status') in ('BUSY', 'TIMEOUT') or response.get('error') == WORKER_DIED:
+                        self._hand_back(index, state, condition)
+                    elif response.get('status') == 'OK':
+                        # a node answering with results that do not match its batch is given up
+                        self._hand_back(index, state, condition, node)
+                        return
+                    else:
+                        state['error'] = "Node %s failed to run batch %s: %s" % (node, index, response.get('error'))
+                        condition.notify_all()
+                index = None
+        except Exception as e:
+            # whatever went wrong, run must not wait forever for the batch this connection held
+            if index is not None:
+                self._hand_back(index, state, condition, node)
+            else:
+                with condition:
+                    state['error'] = "The connection to node %s failed: %r" % (node, e)
+                    condition.notify_all()
+        finally:
+            if client is not None:
+                client.close()
+
+    def _hand_back(self, index, state, condition, node=None):
+        '''
+        Hands a batch back to the connections still alive. If node is given, the connection that
+        was running it is given up.
+        '''
+        with condition:
+            if node is not None:
+                state['alive'] -= 1
+                state['stats']['failed_nodes'].append(node)
+            if not state['remaining'] or state['error'] is not None:
+                return
+            if state['attempts'][index] >= self._attempts:
+                state['error'] = "Batch %s was handed out %s times without completing." % (index, self._attempts)
+            elif state['alive'] == 0:
+                state['error'] = "No node is left to run batch %s." % (index)
+            else:
+                state['pending'].append(index)
+                state['stats']['reassigned'] += 1
+            condition.notify_all()
+
+
+def cluster_start(rovers, destination, nodes, **kwargs):
+    '''
+    Sends the given rovers, which must not have been sent yet, to their destination and has them
+    execute their instructions, as Mission.start would, running them on the given nodes. The
+    keyword arguments are those of Coordinator.
+
+    Returns the Coordinator, whose statistics tell how the batches were run.
+    '''
+    from pyrover.kernel import apply_result, truncate
+
+    if destination._occupancy is not None or destination._coverage is not None or destination._terrain is not None:
+        raise ValueError("Rovers depending on collisions, coverage or a terrain cannot be run on a cluster.")
+    if any(not isinstance(rover._instructions, str) for rover in rovers):
+        raise ValueError("Rovers driven by a policy cannot be run on a cluster.")
+    if any(rover._observe() is not None for rover in rovers):
+        raise ValueError("Rovers whose events are observed cannot be run on a cluster.")
+
+    coordinator = Coordinator(nodes, **kwargs)
+    # rovers only execute the instructions within their budget
+    budgets = [truncate(rover._instructions, rover._budget) for rover in rovers]
+    programs = [(rover._landing_coords['x'], rover._landing_coords['y'], rover._landing_coords['facing'], instructions) for rover, (instructions, _) in zip(rovers, budgets)]
+    results = coordinator.run(destination._width, destination._height, programs)
+    for rover, (status, x, y, facing), (_, exhausted) in zip(rovers, results, budgets):
+        apply_result(rover, status, x, y, facing, exhausted=exhausted)
+    return coordinator
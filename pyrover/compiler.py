@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module represent the compiler of the instructions of a rover into a Python function
+specialized for them, which the compiled engine runs. When the same long program is executed many
+times, interpreting it instruction by instruction costs far more than executing it.
+
+The heading of a rover only depends on its landing heading and on the rotations it executed, so
+that a program is compiled once per landing heading, and rotations are folded away at compile time.
+The moves between two changes of heading then form a single straight run, which is compiled into a
+single jump checked against the one boundary of the plateau it heads towards. A rover jumping past
+it is lost, its last known position being the last cell within the plateau, on that boundary, as
+the reference loop would leave it.
+
+Compiling a program costs far more than executing it once, so that only the programs executed
+again are worth compiling. Compiled functions are cached by program text and landing heading, and
+take the plateau's width and height (as stored by Mars) and the landing cell, which must lie within
+the plateau. They return a (status, x, y, facing) tuple, as kernel.simulate does.
+'''
+
+from functools import lru_cache
+from itertools import groupby
+
+from pyrover.kernel import CARDINAL_POINTS, HEADINGS, ROTATIONS
+
+
+# at most this many compiled functions are cached
+CACHE_SIZE = 256
+# programs with more straight runs than this are not compiled, their functions being too large
+MAX_RUNS = 10000
+
+# the statements of a jump of a run of moves towards each cardinal point: the co-ordinate updated,
+# the check of the boundary it heads towards, and the last known position of a rover jumping past it
+JUMPS = (
+            ("y += %d", "y >= height", "x, height - 1"),
+            ("x += %d", "x >= width", "width - 1, y"),
+            ("y -= %d", "y < 0", "x, 0"),
+            ("x -= %d", "x < 0", "0, y"),
+            )
+
+
+def straight_runs(instructions, facing):
+    '''
+    Returns the straight runs of moves of a rover landing facing the given cardinal point and
+    executing the given instructions, as a list of (heading, moves) tuples, along with the heading
+    it ends up with. Consecutive rotations are folded into a single change of heading, and
+    consecutive runs with the same heading are merged.
+    '''
+    heading = HEADINGS[facing]
+    runs = []
+    for instruction, run in groupby(instructions):
+        count = sum(1 for _ in run)
+        if instruction == 'M':
+            if runs and runs[-1][0] == heading:
+                runs[-1] = (heading, runs[-1][1] + count)
+            else:
+                runs.append((heading, count))
+        else:
+            heading = (heading + ROTATIONS[instruction] * count) & 3
+    return runs, heading
+
+
+def generate_source(instructions, facing):
+    '''
+    Returns the source of the function specialized for the given instructions and landing heading,
+    or None if they have more than MAX_RUNS straight runs.
+    '''
+    runs, heading = straight_runs(instructions, facing)
+    if len(runs) > MAX_RUNS:
+        return None
+    lines = ["def program(width, height, x, y):"]
+    for run_heading, moves in runs:
+        update, check, last_known = JUMPS[run_heading]
+        lines.append("    " + update % (moves))
+        lines.append("    if %s:" % (check))
+        lines.append("        return 'LOST', %s, '%s'" % (last_known, CARDINAL_POINTS[run_heading]))
+    lines.append("    return 'ALIVE', x, y, '%s'" % (CARDINAL_POINTS[heading]))
+    return '\n'.join(lines) + '\n'
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_program(instructions, facing):
+    '''
+    Returns the function specialized for the given instructions and landing heading, or None if
+    they have too many straight runs to be compiled.
+    '''
+    source = generate_source(instructions, facing)
+    if source is None:
+        return None
+    namespace = {}
+    exec(compile(source, '<pyrover program>', 'exec'), namespace)
+    return namespace['program']
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module represent the coverage of a plateau, that is the cells that the cameras of the objects
+moving on it photographed. Two representations are available, sharing the same interface:
+
+ - A bitset, with one bit per cell, for modest plateaus.
+ - A set of disjoint intervals per row, for plateaus too large for a bitset. Its memory follows
+   the length of the paths walked on the plateau rather than the size of the plateau itself.
+
+Rectangles are expressed as (x_min, y_min, x_max, y_max) tuples, with both corners included.
+'''
+
+from bisect import bisect_left, bisect_right
+
+
+# plateaus with up to this many cells are tracked through a bitset, that is up to 16MB
+BITSET_MAX_CELLS = 2 ** 27
+
+
+def create_coverage(width, height, max_bitset_cells=BITSET_MAX_CELLS):
+    '''
+    Returns the coverage best suited to a plateau of the given size: a bitset if the plateau has
+    up to max_bitset_cells cells, intervals otherwise.
+    '''
+    if width * height <= max_bitset_cells:
+        return BitsetCoverage(width, height)
+    return IntervalCoverage(width, height)
+
+
+class Coverage(object):
+    '''
+    This class represents the interface common to the representations of a coverage.
+    '''
+    def __init__(self, width, height):
+        if not isinstance(width, int) or not isinstance(height, int):
+            raise ValueError("The dimensions of a coverage must be both integers, not %s and %s." % (type(width), type(height)))
+        if width < 1 or height < 1:
+            raise ValueError("The dimensions of a coverage must be both positive integers.")
+        self._covered = 0
+        self._height = height
+        self._width = width
+
+    def __len__(self):
+        '''
+        Returns the number of covered cells.
+        '''
+        return self._covered
+
+    def __str__(self):
+        return "%s of %s cells covered (%.2f%%)." % (len(self), self._width * self._height, self.coverage_ratio() * 100)
+
+    def add(self, x, y):
+        '''
+        Marks the cell at x, y as covered.
+        '''
+        raise NotImplementedError
+
+    def add_interval(self, y, x_min, x_max):
+        '''
+        Marks the cells of row y, from x_min to x_max included, as covered.
+        '''
+        raise NotImplementedError
+
+    def covered_in_row(self, y, x_min, x_max):
+        '''
+        Returns the number of covered cells of row y, from x_min to x_max included.
+        '''
+        raise NotImplementedError
+
+    def intervals(self):
+        '''
+        Yields the covered cells as (y, x_min, x_max) runs, with both ends included.
+        '''
+        raise NotImplementedError
+
+    def coverage_ratio(self):
+        '''
+        Returns the fraction of the plateau that is covered, between 0 and 1.
+        '''
+        return len(self) / (self._width * self._height)
+
+    def uncovered_in(self, rect):
+        '''
+        Returns the number of cells of the given rectangle that are not covered. The rectangle is
+        clipped to the plateau.
+        '''
+        x_min, y_min, x_max, y_max = self._clip(rect)
+        if x_min > x_max or y_min > y_max:
+            return 0
+        return (x_max - x_min + 1) * (y_max - y_min + 1) - self._covered_in(x_min, y_min, x_max, y_max)
+
+    def merge(self, other):
+        '''
+        Adds the cells covered by other, which can be of any representation, to this coverage.
+        This allows the coverages of shards of a mission to be combined.
+        '''
+        if not isinstance(other, Coverage):
+            raise TypeError("Only a Coverage can be merged, not %s." % (type(other)))
+        if (other._width, other._height) != (self._width, self._height):
+            raise ValueError("Only coverages of plateaus of the same size can be merged.")
+        for y, x_min, x_max in other.intervals():
+            self.add_interval(y, x_min, x_max)
+
+    def _clip(self, rect):
+        '''
+        Clips a rectangle to the boundaries of the plateau.
+        '''
+        x_min, y_min, x_max, y_max = rect
+        return max(x_min, 0), max(y_min, 0), min(x_max, self._width - 1), min(y_max, self._height - 1)
+
+    def _covered_in(self, x_min, y_min, x_max, y_max):
+        '''
+        Returns the number of covered cells in an already clipped rectangle.
+        '''
+        return sum(self.covered_in_row(y, x_min, x_max) for y in range(y_min, y_max + 1))
+
+
+class BitsetCoverage(Coverage):
+    '''
+    This class represents a coverage as a bitset, one bit per cell, in row-major order.
+    '''
+    def __init__(self, width, height):
+        super(BitsetCoverage, self).__init__(width, height)
+        self._bits = bytearray((width * height + 7) // 8)
+
+    def add(self, x, y):
+        index = y * self._width + x
+        mask = 1 << (index & 7)
+        byte = self._bits[index >> 3]
+        if not byte & mask:
+            self._bits[index >> 3] = byte | mask
+            self._covered += 1
+
+    def add_interval(self, y, x_min, x_max):
+        for x in range(x_min, x_max + 1):
+            self.add(x, y)
+
+    def covered_in_row(self, y, x_min, x_max):
+        start = y * self._width + x_min
+        stop = y * self._width + x_max + 1
+        chunk = int.from_bytes(self._bits[start >> 3:(stop + 7) >> 3], 'little')
+        chunk = (chunk >> (start & 7)) & ((1 << (stop - start)) - 1)
+        return bin(chunk).count('1')
+
+    def intervals(self):
+        for y in range(self._height):
+            row = int.from_bytes(self._bits[(y * self._width) >> 3:((y + 1) * self._width + 7) >> 3], 'little')
+            row = (row >> ((y * self._width) & 7)) & ((1 << self._width) - 1)
+            x = 0
+            while row:
+                # skip the uncovered cells, then measure the run of covered ones
+                skip = (row & -row).bit_length() - 1
+                row >>= skip
+                x += skip
+                run = (~row & (row + 1)).bit_length() - 1
+                yield y, x, x + run - 1
+                row >>= run
+                x += run
+
+    def merge(self, other):
+        if isinstance(other, BitsetCoverage) and (other._width, other._height) == (self._width, self._height):
+            merged = int.from_bytes(self._bits, 'little') | int.from_bytes(other._bits, 'little')
+            self._bits = bytearray(merged.to_bytes(len(self._bits), 'little'))
+            self._covered = bin(merged).count('1')
+        else:
+            super(BitsetCoverage, self).merge(other)
+
+
+class IntervalCoverage(Coverage):
+    '''
+    This class represents a coverage as a set of disjoint, sorted intervals per row. Only the rows
+    that have been covered at least once are stored, and adjacent intervals are coalesced, so that
+    an object walking a row grows an existing interval rather than adding a new one.
+    '''
+    def __init__(self, width, height):
+        super(IntervalCoverage, self).__init__(width, height)
+        # each row maps to a pair of lists, holding the starts and the (exclusive) ends of its intervals
+        self._rows = {}
+
+    def add(self, x, y):
+        row = self._rows.get(y)
+        if row is None:
+            self._rows[y] = ([x], [x + 1])
+            self._covered += 1
+            return
+        starts, ends = row
+        i = bisect_right(starts, x) - 1
+        if i >= 0 and ends[i] > x:
+            return
+        self._covered += 1
+        joins_left = i >= 0 and ends[i] == x
+        joins_right = i + 1 < len(starts) and starts[i + 1] == x + 1
+        if joins_left and joins_right:
+            ends[i] = ends[i + 1]
+            del starts[i + 1], ends[i + 1]
+        elif joins_left:
+            ends[i] = x + 1
+        elif joins_right:
+            starts[i + 1] = x
+        else:
+            starts.insert(i + 1, x)
+            ends.insert(i + 1, x + 1)
+
+    def add_interval(self, y, x_min, x_max):
+        start, end = x_min, x_max + 1
+        starts, ends = self._rows.setdefault(y, ([], []))
+        # the intervals touching or overlapping the new one are replaced by their union
+        first = bisect_left(ends, start)
+        last = bisect_right(starts, end)
+        covered = sum(ends[i] - starts[i] for i in range(first, last))
+        if first < last:
+            start = min(start, starts[first])
+            end = max(end, ends[last - 1])
+        starts[first:last] = [start]
+        ends[first:last] = [end]
+        self._covered += end - start - covered
+
+    def covered_in_row(self, y, x_min, x_max):
+        row = self._rows.get(y)
+        if row is None:
+            return 0
+        starts, ends = row
+        start, end = x_min, x_max + 1
+        covered = 0
+        for i in range(bisect_right(ends, start), len(starts)):
+            if starts[i] >= end:
+                break
+            covered += min(ends[i], end) - max(starts[i], start)
+        return covered
+
+    def intervals(self):
+        for y in sorted(self._rows):
+            starts, ends = self._rows[y]
+            for start, end in zip(starts, ends):
+                yield y, start, end - 1
+
+    def _covered_in(self, x_min, y_min, x_max, y_max):
+        # only the covered rows are visited, however tall the rectangle is
+        return sum(self.covered_in_row(y, x_min, x_max) for y in self._rows if y_min <= y <= y_max)
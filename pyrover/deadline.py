@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module represent the wall-clock deadline of a mission. Reading the clock at each instruction
+would cost about as much as executing it, so that the work done is accounted for instead, and the
+clock is only read once every given amount of work, one instruction or one rover landing being one
+unit of work. A mission overruns its deadline by at most the time that amount of work takes.
+'''
+
+from time import monotonic
+
+
+# the clock is read once every this many instructions
+CHECK_EVERY = 1024
+
+
+class Deadline(object):
+    '''
+    This class represents a wall-clock deadline, checked cooperatively by the loops executing the
+    rovers of a mission.
+    '''
+    def __init__(self, seconds, every=CHECK_EVERY):
+        '''
+        Initializes a Deadline expiring the given number of seconds from now.
+        '''
+        if isinstance(seconds, bool) or not isinstance(seconds, (int, float)) or seconds < 0:
+            raise ValueError("A deadline must be a non-negative number of seconds, not %s." % (seconds))
+        if not isinstance(every, int) or every < 1:
+            raise ValueError("A deadline must be checked every positive number of instructions, not %s." % (every))
+        self._credit = 0
+        self._every = every
+        self._expired = False
+        self._expires_at = monotonic() + seconds
+
+    @property
+    def expired(self):
+        '''
+        Returns True if the deadline was found expired the last time the clock was read.
+        '''
+        return self._expired
+
+    def spend(self, work=1):
+        '''
+        Accounts for the given amount of work, reading the clock once enough of it was done since
+        the last reading. Returns True if the deadline expired.
+        '''
+        if self._expired:
+            return True
+        self._credit -= work
+        if self._credit > 0:
+            return False
+        self._credit = self._every
+        self._expired = monotonic() >= self._expires_at
+        return self._expired
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module represent the execution engines of a mission, that is the interchangeable ways a rover
+is sent to its destination and executes its instructions. Each engine must leave the rover and its
+destination exactly as the reference engine, that is Rover.send followed by
+Rover.execute_instructions, would.
+
+Engines are registered by name, so that a Mission can be told which one to use:
+
+ - reference: the Rover and Mars objects themselves.
+ - table: the table-driven, pure-Python kernel.
+ - numpy: a kernel vectorized through NumPy, which must then be installed.
+ - compiled: functions generated for, and specialized to, each program.
+'''
+
+from pyrover.kernel import apply_result, CARDINAL_POINTS, DELTA_X, DELTA_Y, HEADINGS, simulate, truncate
+
+
+ENGINES = {}
+
+
+def register_engine(name, engine):
+    '''
+    Registers an engine under the given name, replacing any engine already registered with it. An
+    engine is any object with a run method taking a rover that was not sent yet.
+    '''
+    if not callable(getattr(engine, 'run', None)):
+        raise TypeError("An engine must have a run method, %s has none." % (type(engine)))
+    ENGINES[name] = engine
+
+
+def get_engine(name):
+    '''
+    Returns the engine registered under the given name.
+    '''
+    try:
+        return ENGINES[name]
+    except KeyError:
+        raise ValueError("%s is not a valid engine! Valid engines are %s." % (name, ', '.join(sorted(ENGINES))))
+
+
+class Engine(object):
+    '''
+    This class represents the interface of an execution engine.
+    '''
+    def run(self, rover):
+        '''
+        Sends the rover to its destination and has it execute its instructions.
+        '''
+        raise NotImplementedError
+
+
+class ReferenceEngine(Engine):
+    '''
+    This class represents the reference engine, that is the Rover and Mars objects themselves.
+    '''
+    def run(self, rover):
+        rover.send()
+        rover.execute_instructions()
+
+
+class TableEngine(Engine):
+    '''
+    This class represents the engine running the table-driven kernel. Rovers driven by a policy
+    choose their instructions as they go, and rovers whose events are observed must report them,
+    so that both are delegated to the reference engine.
+    '''
+    def run(self, rover):
+        if not isinstance(rover._instructions, str) or rover._observe() is not None:
+            return ENGINES['reference'].run(rover)
+        destination = rover._destination
+        landing_coords = rover._landing_coords
+        instructions, exhausted = truncate(rover._instructions, rover._budget)
+        result = simulate(
+                            destination._width,
+                            destination._height,
+                            landing_coords['x'],
+                            landing_coords['y'],
+                            landing_coords['facing'],
+                            instructions,
+                            destination._occupancy,
+                            destination._coverage is not None,
+                            destination._terrain,
+                            )
+        apply_result(rover, *result, exhausted=exhausted)
+
+
+class NumpyEngine(TableEngine):
+    '''
+    This class represents the engine running a kernel vectorized through NumPy. The heading after
+    each instruction is the cumulative sum of the rotations, and the position after each
+    instruction the cumulative sum of the moves, so that the whole program is executed through a
+    handful of array operations. Collisions depend on the other objects, and blocked cells on the
+    terrain, so that both are delegated to the table-driven kernel, as are rovers exceeding their
+    budget.
+    '''
+    def __init__(self):
+        self._tables = None
+
+    def run(self, rover):
+        destination = rover._destination
+        if destination._occupancy is not None or destination._terrain is not None or not isinstance(rover._instructions, str) or rover._observe() is not None or rover._budget is not None and len(rover._instructions) > rover._budget:
+            return super(NumpyEngine, self).run(rover)
+
+        import numpy
+        if self._tables is None:
+            rotations = numpy.zeros(256, dtype=numpy.int64)
+            rotations[ord('R')], rotations[ord('L')] = 1, 3
+            self._tables = rotations, numpy.array(DELTA_X, dtype=numpy.int64), numpy.array(DELTA_Y, dtype=numpy.int64)
+        rotations, delta_x, delta_y = self._tables
+
+        width, height = destination._width, destination._height
+        x, y, facing = rover._landing_coords['x'], rover._landing_coords['y'], rover._landing_coords['facing']
+        if x < 0 or y < 0 or x >= width or y >= height or not rover._instructions:
+            return super(NumpyEngine, self).run(rover)
+
+        codes = numpy.frombuffer(rover._instructions.encode('ascii'), dtype=numpy.uint8)
+        headings = (HEADINGS[facing] + numpy.cumsum(rotations[codes])) & 3
+        moves = codes == ord('M')
+        xs = x + numpy.cumsum(delta_x[headings] * moves)
+        ys = y + numpy.cumsum(delta_y[headings] * moves)
+        out_of_bounds = (xs < 0) | (ys < 0) | (xs >= width) | (ys >= height)
+
+        if out_of_bounds.any():
+            # the first position out of bounds is reached through a move, the last known position
+            # is the one before it
+            first = int(numpy.argmax(out_of_bounds))
+            status = 'LOST'
+            final_x, final_y = int(xs[first] - delta_x[headings[first]]), int(ys[first] - delta_y[headings[first]])
+            final_facing = CARDINAL_POINTS[int(headings[first])]
+            xs, ys = xs[:first], ys[:first]
+        else:
+            status = 'ALIVE'
+            final_x, final_y, final_facing = int(xs[-1]), int(ys[-1]), CARDINAL_POINTS[int(headings[-1])]
+
+        path = None
+        if destination._coverage is not None:
+            path = set(zip(xs.tolist(), ys.tolist()))
+            path.add((x, y))
+        apply_result(rover, status, final_x, final_y, final_facing, path)
+
+
+class CompiledEngine(TableEngine):
+    '''
+    This class represents the engine running the functions the compiler generates for each program
+    and landing heading, which only check the boundaries of the plateau. Collisions, blocked cells
+    and coverage depend on each cell the rover visits, so that they are delegated to the
+    table-driven kernel, as are rovers landing out of the plateau and programs too large to be
+    compiled.
+
+    Compiling a program costs far more than executing it once, so that a program is only compiled
+    once it is executed again, and executed by the table-driven kernel until then. Programs are
+    told apart by the hash of their text and their landing heading.
+    '''
+    # the programs seen once are forgotten once there are this many of them
+    MAX_SEEN = 65536
+
+    def __init__(self):
+        self._seen = set()
+
+    def run(self, rover):
+        destination = rover._destination
+        if destination._occupancy is not None or destination._terrain is not None or destination._coverage is not None or not isinstance(rover._instructions, str) or rover._observe() is not None:
+            return super(CompiledEngine, self).run(rover)
+
+        from pyrover.compiler import compile_program
+        x, y, facing = rover._landing_coords['x'], rover._landing_coords['y'], rover._landing_coords['facing']
+        if x < 0 or y < 0 or x >= destination._width or y >= destination._height:
+            return super(CompiledEngine, self).run(rover)
+        instructions, exhausted = truncate(rover._instructions, rover._budget)
+        key = (hash(instructions), facing)
+        if key not in self._seen:
+            if len(self._seen) >= self.MAX_SEEN:
+                self._seen.clear()
+            self._seen.add(key)
+            return super(CompiledEngine, self).run(rover)
+        program = compile_program(instructions, facing)
+        if program is None:
+            return super(CompiledEngine, self).run(rover)
+        apply_result(rover, *program(destination._width, destination._height, x, y), exhausted=exhausted)
+
+
+register_engine('reference', ReferenceEngine())
+register_engine('table', TableEngine())
+register_engine('numpy', NumpyEngine())
+register_engine('compiled', CompiledEngine())
+
+
+def verify(engine, rover):
+    '''
+    Runs the rover through the given engine and, on a copy of its destination, through the
+    reference loop, one instruction at a time. Returns None if both agree on the final state of
+    the rover, otherwise a dictionary describing the divergence. The rover must be given its
+    instructions as a string: a policy would drive the copy of the rover on its own, and possibly
+    differently.
+    '''
+    from pyrover.rover import Rover
+
+    shadow_rover = Rover(rover._landing_coords, rover._destination._shadow(), rover._instructions, budget=rover._budget)
+    shadow_rover.send()
+    shadow_rover.execute_instructions(stepwise=True)
+    engine.run(rover)
+
+    expected = (shadow_rover._status, shadow_rover._current_position, shadow_rover._last_known_position)
+    actual = (rover._status, rover._current_position, rover._last_known_position)
+    if expected == actual:
+        return None
+    return {'rover' : rover._id, 'expected' : expected, 'actual' : actual}
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module represent the events a rover emits during a mission, and the subscribers observing
+them. The events, and the arguments their callbacks are given, are:
+
+ - on_land(rover), once the rover safely landed.
+ - on_move(rover, x, y), each time the rover moves to a new position.
+ - on_rotate(rover, facing), each time the rover rotates.
+ - on_lost(rover), once the rover is lost, either while landing or while moving.
+ - on_crash(rover), once the rover crashed into another object.
+ - on_blocked(rover), once the rover was stopped by a cell blocked by the terrain.
+ - on_complete(rover), once the rover is done with its instructions, whatever its status.
+
+Rovers nobody subscribed to execute exactly as they would without an event bus. Rovers whose moves
+or rotations are observed execute their instructions one at a time, so that each step can be
+reported, while the other events cost nothing more than a lookup once per rover.
+'''
+
+
+EVENTS = ('on_land', 'on_move', 'on_rotate', 'on_lost', 'on_crash', 'on_blocked', 'on_complete')
+
+
+class EventBus(object):
+    '''
+    This class represents the subscribers to the events of the rovers of a mission.
+    '''
+    def __init__(self):
+        self._subscriptions = []
+
+    def __bool__(self):
+        return bool(self._subscriptions)
+
+    def __len__(self):
+        '''
+        Returns the number of subscriptions.
+        '''
+        return len(self._subscriptions)
+
+    def subscribe(self, event, callback, accepts=None):
+        '''
+        Subscribes the given callback to an event. If accepts is given, it is called with each
+        rover before it is sent, and the callback only observes the rovers it returns True for.
+        '''
+        if event not in EVENTS:
+            raise ValueError("%s is not a valid event! Valid events are %s." % (event, ', '.join(EVENTS)))
+        if not callable(callback):
+            raise TypeError("A subscriber to %s must be callable, not %s." % (event, type(callback)))
+        self._subscriptions.append((event, callback, accepts))
+
+    def unsubscribe(self, event, callback):
+        '''
+        Removes every subscription of the given callback to an event.
+        '''
+        self._subscriptions = [subscription for subscription in self._subscriptions if subscription[:2] != (event, callback)]
+
+    def register(self, subscriber):
+        '''
+        Subscribes each method of the given object named after an event to it. If the object has
+        an accepts method, it selects the rovers the object observes.
+        '''
+        accepts = getattr(subscriber, 'accepts', None)
+        for event in EVENTS:
+            callback = getattr(subscriber, event, None)
+            if callback is not None:
+                self.subscribe(event, callback, accepts)
+
+    def listeners(self, rover):
+        '''
+        Returns the callbacks observing the given rover, as a dictionary mapping each event to
+        its callbacks, or None if nobody observes the rover.
+        '''
+        listeners = {}
+        # each subscriber decides once per rover, however many events it subscribed to
+        decisions = {None : True}
+        for event, callback, accepts in self._subscriptions:
+            if accepts not in decisions:
+                decisions[accepts] = accepts(rover)
+            if decisions[accepts]:
+                listeners.setdefault(event, []).append(callback)
+        return listeners or None
+
+
+class SamplingSubscriber(object):
+    '''
+    This class represents a subscriber observing only one rover out of every given number, on
+    behalf of another subscriber. The rovers left out are not observed at all, and are executed
+    as if nobody had subscribed.
+    '''
+    def __init__(self, subscriber, every):
+        if not isinstance(every, int) or every < 1:
+            raise ValueError("A sampling subscriber must observe one rover every positive number of rovers, not %s." % (every))
+        self._every = every
+        self._seen = 0
+        self._subscriber = subscriber
+
+    def __getattr__(self, name):
+        if name in EVENTS:
+            return getattr(self._subscriber, name)
+        raise AttributeError(name)
+
+    def accepts(self, rover):
+        '''
+        Returns True for the first rover out of every sampled number of rovers.
+        '''
+        accepts = self._seen % self._every == 0
+        self._seen += 1
+        inner = getattr(self._subscriber, 'accepts', None)
+        return accepts and (inner is None or inner(rover))
+
+
+class BatchingSubscriber(object):
+    '''
+    This class represents a subscriber recording the events of the rovers as (event, rover id,
+    arguments) tuples, and handing them over to a flush callback in batches, rather than one at a
+    time.
+    '''
+    def __init__(self, flush, size=1024, events=EVENTS):
+        if not isinstance(size, int) or size < 1:
+            raise ValueError("The size of a batch must be a positive integer, not %s." % (size))
+        self._batch = []
+        self._flush = flush
+        self._size = size
+        for event in events:
+            setattr(self, event, self._recorder(event))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+    def _recorder(self, event):
+        '''
+        Returns the callback recording the given event.
+        '''
+        def record(rover, *arguments):
+            self._batch.append((event, rover._id, arguments))
+            if len(self._batch) >= self._size:
+                self.flush()
+        return record
+
+    def flush(self):
+        '''
+        Hands over the events recorded so far, if any, to the flush callback.
+        '''
+        if self._batch:
+            batch, self._batch = self._batch, []
+            self._flush(batch)
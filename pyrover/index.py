@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module represent the offset index of a blueprint file, that is a sidecar file mapping rover
+numbers to the byte offset of their landing line, so that a single rover, or a range of them, can
+be read and parsed without reading the rovers before it. Rovers are numbered from 0, in the order
+of the file.
+
+The index is built in a single streaming pass over the file, one block at a time, and only keeps
+the offset of one rover every STRIDE rovers: a rover is reached by seeking to the closest indexed
+rover before it and skipping the lines in between. The index of a file of a hundred million rovers
+is therefore about 3MB, rather than 800MB.
+
+The sidecar is stored next to the blueprint file, under the same name followed by INDEX_SUFFIX. It
+starts with a header made of a magic string, the size and the modification time, in nanoseconds,
+of the blueprint file it indexes, the stride and the number of rovers, as unsigned 64-bit
+little-endian integers, followed by the offsets themselves. An index whose size or modification
+time no longer match those of the blueprint file, or that holds fewer offsets than its header
+announces, is built again.
+'''
+
+from array import array
+from itertools import accumulate
+from os import remove, replace, stat
+from os.path import abspath, basename, dirname
+from struct import error as StructError, Struct
+
+from pyrover.parsing import _split_lines, BlueprintError, parse_plateau, parse_rovers
+
+
+INDEX_SUFFIX = '.idx'
+MAGIC = b'PYRVIDX1'
+HEADER = Struct('<8sQQQQ')
+# one rover every this many is indexed
+STRIDE = 256
+
+
+def index_path(path):
+    '''
+    Returns the path of the sidecar index of the given blueprint file.
+    '''
+    return path + INDEX_SUFFIX
+
+
+def scan_offsets(f, start, every, block=2 ** 20):
+    '''
+    Reads the file f from the given offset to its end, one block at a time, and returns the offset
+    of one line every given number of lines, starting with the line at start, along with the number
+    of lines read. A last line without a newline is counted too.
+    '''
+    offsets = array('Q')
+    f.seek(start)
+    # base is the offset of the first line of the block, and following the number, counted from
+    # it, of the next line whose offset is kept
+    base, lines, following, pending = start, 0, 0, b''
+    while True:
+        chunk = f.read(block)
+        if not chunk:
+            break
+        # the whole lines of the block, the last one being completed by the next block
+        chunk_lines = (pending + chunk).split(b'\n')
+        pending = chunk_lines.pop()
+        # the offset of each line within the block is the length of the lines before it, plus
+        # their newlines, summed without a Python loop
+        starts = list(accumulate(map(len, chunk_lines), initial=0))
+        count = len(chunk_lines)
+        for index in range(following, count, every):
+            offsets.append(base + starts[index] + index)
+        following = following - count if following >= count else (following - count) % every
+        lines += count
+        base += starts[count] + count
+    if pending:
+        if following == 0:
+            offsets.append(base)
+        lines += 1
+    return offsets, lines
+
+
+class BlueprintIndex(object):
+    '''
+    This class represents the offset index of a blueprint file.
+    '''
+    def __init__(self, path, stride=STRIDE):
+        '''
+        Opens the index of the blueprint file at the given path, building it, and storing it next
+        to the file, if it does not exist yet, or no longer matches the file. If the index cannot be
+        stored, it is only kept in memory.
+        '''
+        if not isinstance(stride, int) or stride < 1:
+            raise ValueError("An index must index one rover every positive number of rovers, not %s." % (stride))
+        self._path = path
+        self._stride = stride
+        self._rovers = 0
+        self._offsets = array('Q')
+
+        status = stat(path)
+        if not self._load(status.st_size, status.st_mtime_ns):
+            self._build()
+            try:
+                self._store(status.st_size, status.st_mtime_ns)
+            except OSError:
+                pass
+
+        with open(path, 'rb') as f:
+            self._plateau = parse_plateau(_split_lines(f.readline().decode('utf-8'))[0])
+
+    def __len__(self):
+        '''
+        Returns the number of rovers of the blueprint file.
+        '''
+        return self._rovers
+
+    @property
+    def plateau(self):
+        '''
+        Returns the width and the height of the plateau, as written in the blueprint file.
+        '''
+        return self._plateau
+
+    def rovers(self, start, stop=None):
+        '''
+        Reads, parses and validates the rovers numbered from start to stop, excluded, the rover
+        numbered start only if stop is None. Returns an (x, y, facing, instructions) tuple per
+        rover, as parse_rovers does, errors being reported against the lines of the file.
+        '''
+        if stop is None:
+            stop = start + 1
+        if not 0 <= start <= stop <= self._rovers:
+            raise IndexError("The blueprints hold rovers 0 to %s, not %s to %s." % (self._rovers - 1, start, stop - 1))
+        if start == stop:
+            return []
+        with open(self._path, 'rb') as f:
+            f.seek(self._offsets[start // self._stride])
+            for _ in range(2 * (start % self._stride)):
+                f.readline()
+            text = b''.join(f.readline() for _ in range(2 * (stop - start))).decode('utf-8')
+        return parse_rovers(_split_lines(text), 2 + 2 * start)
+
+    def _build(self):
+        '''
+        Builds the index in a single streaming pass over the blueprint file.
+        '''
+        with open(self._path, 'rb') as f:
+            header = f.readline()
+            if not header.endswith(b'\n'):
+                lines = 1 if header else 0
+            else:
+                self._offsets, lines = scan_offsets(f, len(header), 2 * self._stride)
+                lines += 1
+        if lines % 2 == 0:
+            raise BlueprintError(lines, "the mission's blueprints must contain an odd number of lines.")
+        self._rovers = (lines - 1) // 2
+
+    def _load(self, size, mtime):
+        '''
+        Loads the index stored next to the blueprint file, if it matches the file. Returns False if
+        the index must be built again.
+        '''
+        try:
+            with open(index_path(self._path), 'rb') as f:
+                magic, indexed_size, indexed_mtime, stride, rovers = HEADER.unpack(f.read(HEADER.size))
+                if (magic, indexed_size, indexed_mtime, stride) != (MAGIC, size, mtime, self._stride):
+                    return False
+                offsets = array('Q')
+                offsets.frombytes(f.read())
+        except (OSError, ValueError, StructError):
+            return False
+        # an index cut short, by a write that was interrupted for instance, is built again
+        if len(offsets) != -(-rovers // stride):
+            return False
+        self._offsets, self._rovers = offsets, rovers
+        return True
+
+    def _store(self, size, mtime):
+        '''
+        Stores the index next to the blueprint file. The index is written to a temporary file first,
+        then moved in place, so that an interrupted write never leaves a truncated index behind.
+        '''
+        from tempfile import mkstemp
+
+        path = index_path(self._path)
+        descriptor, temporary_path = mkstemp(prefix=basename(path) + '.', suffix='.tmp', dir=dirname(abspath(path)))
+        try:
+            with open(descriptor, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, size, mtime, self._stride, self._rovers))
+                self._offsets.tofile(f)
+            replace(temporary_path, path)
+        except BaseException:
+            remove(temporary_path)
+            raise
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module represent the execution kernel of a rover, that is a table-driven, pure function
+reproducing what Rover.send and Rover.execute_instructions do on a Mars, without the objects.
+Being pure, it can be run in other processes or threads, and its results applied afterwards.
+'''
+
+# headings are indexes in the clockwise list of cardinal points, so that rotations are additions
+CARDINAL_POINTS = 'NESW'
+HEADINGS = {'N' : 0, 'E' : 1, 'S' : 2, 'W' : 3}
+DELTA_X = (0, 1, 0, -1)
+DELTA_Y = (1, 0, -1, 0)
+ROTATIONS = {'L' : 3, 'R' : 1}
+
+
+def simulate(width, height, x, y, facing, instructions, occupied=None, record_path=False, terrain=None):
+    '''
+    Simulates a rover landing at x, y, facing the given cardinal point, on a plateau of the given
+    width and height (as stored by Mars, that is one more than the upper-right co-ordinates), and
+    executing the given instructions.
+
+    If occupied is given, it is a set of (x, y) positions holding other objects that the rover
+    crashes into. If terrain is given, it is a Terrain whose blocked cells stop the rover. If
+    record_path is True, the set of positions the rover occupied, from its landing onwards, is also
+    returned, otherwise None is.
+
+    Returns a (status, x, y, facing, path) tuple. For a rover that is alive, or that crashed after
+    landing, x, y and facing are its current position. For a lost rover they are its last known
+    position, or None if it never made it to the planet. A rover blocked by the terrain is stuck, as
+    a crashed one is.
+    '''
+    path = set() if record_path else None
+    if x < 0 or y < 0 or x >= width or y >= height:
+        return 'LOST', None, None, None, path
+    if terrain is not None and (x, y) in terrain:
+        return 'BLOCKED', None, None, None, path
+    if occupied and (x, y) in occupied:
+        return 'CRASHED', None, None, None, path
+    if record_path:
+        path.add((x, y))
+
+    heading = HEADINGS[facing]
+    status = 'ALIVE'
+    for instruction in instructions:
+        if instruction == 'M':
+            new_x = x + DELTA_X[heading]
+            new_y = y + DELTA_Y[heading]
+            if new_x < 0 or new_y < 0 or new_x >= width or new_y >= height:
+                status = 'LOST'
+                break
+            if terrain is not None and (new_x, new_y) in terrain:
+                status = 'BLOCKED'
+                break
+            if occupied and (new_x, new_y) in occupied:
+                status = 'CRASHED'
+                break
+            x, y = new_x, new_y
+            if record_path:
+                path.add((x, y))
+        else:
+            heading = (heading + ROTATIONS[instruction]) & 3
+    return status, x, y, CARDINAL_POINTS[heading], path
+
+
+def truncate(instructions, budget):
+    '''
+    Returns the instructions a rover given the budget executes, and True if it runs out of its
+    budget before executing all of them.
+    '''
+    if budget is None or len(instructions) <= budget:
+        return instructions, False
+    return instructions[:budget], True
+
+
+def apply_result(rover, status, x, y, facing, path=None, exhausted=False):
+    '''
+    Applies the result of a simulation to a rover that was not sent yet, and to its destination,
+    leaving both as if the rover had been sent and had executed its instructions. The path, if
+    given, is covered on the destination. If exhausted is True, the result is that of the
+    instructions within the budget of the rover, which ran out of it if it is still alive. The
+    rover is recorded into its heatmaps, if any.
+    '''
+    destination = rover._destination
+    if path and destination._coverage is not None:
+        for path_x, path_y in path:
+            destination._coverage.add(path_x, path_y)
+
+    rover._status = 'EXHAUSTED' if exhausted and status == 'ALIVE' else status
+    if x is None:
+        rover._current_position = None
+        rover._last_known_position = None
+    elif status == 'LOST':
+        rover._current_position = None
+        rover._last_known_position = {'x' : x, 'y' : y, 'facing' : facing}
+    else:
+        rover._current_position = {'x' : x, 'y' : y, 'facing' : facing}
+        rover._last_known_position = {'x' : x, 'y' : y, 'facing' : facing}
+        destination._place(rover._id, x, y)
+    if rover._heatmaps is not None:
+        rover._heatmaps.record(rover)
@@ -4,15 +4,36 @@
 This module represent the planet Mars, a possible destination of a NASA's mission.
 '''
 
+# returned by the batched moves when no step of the path is illegal
+MOVE_OK = -1
+
+
 class Mars(object):
     '''
     This class represent planet Mars and its properties.
     '''
 
-    def __init__(self, planet_width, planet_height):
+    def __init__(self, planet_width, planet_height, coverage=False, collisions=False, terrain=None):
+        '''
+        Initializes a Mars object. If coverage is True, the planet also keeps track of the cells
+        the objects moving over it visited, which are available through the coverage property.
+
+        If collisions is True, no two objects can occupy the same position: an object trying to
+        move onto an occupied position crashes. The planet then keeps, along with the position of
+        each object, the object occupying each position, so that collisions are found in O(1).
+
+        If terrain is given, either as the path of a terrain file or as an already loaded Terrain,
+        objects trying to move onto its blocked cells are stopped where they are, as they would be
+        by another object. A terrain loaded from a path is owned by the planet, which releases it
+        once closed or garbage collected.
+        '''
+        self._coverage = None
         self._height = planet_height
         self._name = 'Mars'
+        self._occupancy = {} if collisions else None
         self._plateau = {}
+        self._terrain = None
+        self._terrain_finalizer = None
         self._width = planet_width
         
         if not isinstance(self._width, int) or not isinstance(self._height, int):
@@ -24,7 +45,30 @@ class Mars(object):
         # increase _height and _width so that a planet with dimension 5,5 has _height, _width both equal to 5
         self._height += 1
         self._width += 1
-        
+
+        if coverage:
+            from pyrover.coverage import create_coverage
+            self._coverage = create_coverage(self._width, self._height)
+
+        if terrain is not None:
+            owned = not hasattr(terrain, 'width')
+            if owned:
+                from pyrover.terrain import load_terrain
+                terrain = load_terrain(terrain)
+            if terrain.width is not None and (terrain.width, terrain.height) != (self._width, self._height):
+                if owned:
+                    terrain.close()
+                raise ValueError("The terrain has dimensions %s and %s, while the planet has %s and %s." % (terrain.width, terrain.height, self._width, self._height))
+            self._terrain = terrain
+            if owned:
+                from weakref import finalize
+                self._terrain_finalizer = finalize(self, terrain.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     def __str__(self):
         '''
@@ -33,6 +77,64 @@ class Mars(object):
         return "Planet %s has dimensions %s and %s." % (self._name, self._width, self._height)
 
 
+    def close(self):
+        '''
+        Releases the terrain the planet loaded from a path, if any. A terrain given already loaded
+        is left to whoever loaded it.
+        '''
+        if self._terrain_finalizer is not None:
+            self._terrain_finalizer()
+
+
+    @property
+    def collisions(self):
+        '''
+        Returns True if objects moving over the planet can collide with each others.
+        '''
+        return self._occupancy is not None
+
+
+    @property
+    def coverage(self):
+        '''
+        Returns the coverage of the plateau, or None if it is not tracked.
+        '''
+        return self._coverage
+
+
+    @property
+    def terrain(self):
+        '''
+        Returns the terrain of the plateau, or None if no cell is blocked.
+        '''
+        return self._terrain
+
+
+    def blocked(self, x, y):
+        '''
+        Returns True if the position x, y is blocked by the terrain of the plateau.
+        '''
+        return self._terrain is not None and (x, y) in self._terrain
+
+
+    def safe_landing_zones(self, instructions, mask=False):
+        '''
+        Returns the landing cells and headings from which a rover executing the given instructions
+        is never lost, as a dictionary mapping each cardinal point to an (x_min, y_min, x_max,
+        y_max) rectangle, or to None if there is no such cell. The cost only depends on the length
+        of the instructions, not on the size of the plateau. The plateau is considered empty, since
+        neither the terrain nor other objects lose rovers.
+
+        If mask is True, a NumPy array of booleans indexed by [heading, y, x] is returned instead,
+        which holds one cell per landing cell and heading.
+        '''
+        from pyrover.solver import safe_landing_mask, safe_landing_zones
+
+        if mask:
+            return safe_landing_mask(self._width, self._height, instructions)
+        return safe_landing_zones(self._width, self._height, instructions)
+
+
     def update_plateau(self, object_id, object_new_x, object_new_y):
         '''
         Validates and updates the new position of an object currently moving on the planet.
@@ -45,6 +147,8 @@ class Mars(object):
 
             # The object moved out of the plateau
             if object_id in self._plateau.keys():
+                if self._occupancy is not None:
+                    del self._occupancy[self._plateau[object_id]]
                 del self._plateau[object_id]
                 message = "%s was lost on %s moving towards %s, %s!" % (object_id, self._name, object_new_x, object_new_y)
 
@@ -57,9 +161,170 @@ class Mars(object):
 
             raise OutOfBounds("%s" % (message))
 
+        # Position blocked by the terrain
+        elif self._terrain is not None and (object_new_x, object_new_y) in self._terrain:
+            raise Blocked("%s was blocked by the terrain of %s at %s, %s!" % (object_id, self._name, object_new_x, object_new_y))
+
         # Valid position
         elif object_new_x < self._width and object_new_y < self._height:
+            if self._occupancy is not None:
+                new_position = (object_new_x, object_new_y)
+                occupant = self._occupancy.get(new_position)
+                if occupant is not None and occupant != object_id:
+                    raise Crashed("%s crashed into %s on %s at %s, %s!" % (object_id, occupant, self._name, object_new_x, object_new_y))
+                if object_id in self._plateau:
+                    del self._occupancy[self._plateau[object_id]]
+                self._occupancy[new_position] = object_id
             self._plateau[object_id] = (object_new_x, object_new_y)
+            if self._coverage is not None:
+                self._coverage.add(object_new_x, object_new_y)
+
+
+    def move_path(self, object_id, path, raise_errors=False):
+        '''
+        Moves an object along a whole path, that is a sequence of x, y positions visited in order,
+        validating it in a single pass. Only the last valid position of the path is committed:
+        every position before it is covered, but never stored.
+
+        Returns MOVE_OK if the whole path is valid, otherwise the index of its first illegal step.
+        If the step lies out of the plateau the object is lost, and removed from it, otherwise it
+        crashed and is stuck in its last valid position. No message is built and no exception is
+        raised, unless raise_errors is True, in which case the OutOfBounds, Crashed or Blocked
+        exception update_plateau would have raised is. An object blocked by the terrain is stuck
+        in its last valid position, as a crashed one is.
+        '''
+        occupancy, terrain, width, height = self._occupancy, self._terrain, self._width, self._height
+        start = self._plateau.get(object_id)
+        failed, crashed, valid = MOVE_OK, False, 0
+        for x, y in path:
+            if x < 0 or y < 0 or x >= width or y >= height:
+                failed = valid
+                break
+            if occupancy is not None and occupancy.get((x, y), object_id) != object_id or terrain is not None and (x, y) in terrain:
+                failed, crashed = valid, True
+                break
+            valid += 1
+
+        if valid and self._coverage is not None:
+            for x, y in path[:valid]:
+                self._coverage.add(x, y)
+        final = path[valid - 1] if valid else start
+        return self._commit(object_id, start, final, failed, path[failed] if failed != MOVE_OK else None, crashed, raise_errors)
+
+
+    def move_run(self, object_id, delta_x, delta_y, steps, raise_errors=False):
+        '''
+        Moves an object already on the plateau steps times by delta_x, delta_y, as a rover
+        executing a run of M instructions does. The number of steps that stay within the plateau
+        is computed at once, and only the positions it leaves are looked up for collisions and
+        blocked cells.
+
+        Returns MOVE_OK or the index of the first illegal step, as move_path does.
+        '''
+        start = x, y = self._plateau[object_id]
+        valid = steps
+        if delta_x > 0:
+            valid = min(valid, self._width - 1 - x)
+        elif delta_x < 0:
+            valid = min(valid, x)
+        if delta_y > 0:
+            valid = min(valid, self._height - 1 - y)
+        elif delta_y < 0:
+            valid = min(valid, y)
+
+        crashed = False
+        occupancy, terrain = self._occupancy, self._terrain
+        if occupancy is not None or terrain is not None:
+            for step in range(1, valid + 1):
+                position = (x + delta_x * step, y + delta_y * step)
+                if occupancy is not None and occupancy.get(position, object_id) != object_id or terrain is not None and position in terrain:
+                    valid, crashed = step - 1, True
+                    break
+
+        if valid and self._coverage is not None:
+            if delta_y == 0:
+                self._coverage.add_interval(y, min(x, x + delta_x * valid), max(x, x + delta_x * valid))
+            else:
+                for step in range(1, valid + 1):
+                    self._coverage.add(x + delta_x * step, y + delta_y * step)
+        failed = valid if valid < steps else MOVE_OK
+        failed_position = (x + delta_x * (valid + 1), y + delta_y * (valid + 1)) if failed != MOVE_OK else None
+        return self._commit(object_id, start, (x + delta_x * valid, y + delta_y * valid), failed, failed_position, crashed, raise_errors)
+
+
+    def _commit(self, object_id, start, final, failed, failed_position, crashed, raise_errors):
+        '''
+        Auxiliary method that commits the outcome of a batched move: the object either stands in
+        its final position, or is removed from the plateau if it was lost. crashed is True if the
+        object is stuck, either because of another object or of the terrain. Returns the index of
+        the first illegal step, or MOVE_OK.
+        '''
+        if failed != MOVE_OK and not crashed:
+            if start is not None:
+                if self._occupancy is not None:
+                    del self._occupancy[start]
+                del self._plateau[object_id]
+        elif final is not None and final != start:
+            if self._occupancy is not None:
+                if start is not None:
+                    del self._occupancy[start]
+                self._occupancy[final] = object_id
+            self._plateau[object_id] = final
+
+        if failed != MOVE_OK and raise_errors:
+            failed_x, failed_y = failed_position
+            if crashed and self._terrain is not None and failed_position in self._terrain:
+                raise Blocked("%s was blocked by the terrain of %s at %s, %s!" % (object_id, self._name, failed_x, failed_y))
+            if crashed:
+                raise Crashed("%s crashed into %s on %s at %s, %s!" % (object_id, self._occupancy[failed_position], self._name, failed_x, failed_y))
+            if start is None and final is None:
+                raise OutOfBounds("%s never made it to %s!" % (object_id, self._name))
+            raise OutOfBounds("%s was lost on %s moving towards %s, %s!" % (object_id, self._name, failed_x, failed_y))
+        return failed
+
+
+    def _shadow(self):
+        '''
+        Returns a copy of the planet that objects can move over without affecting it. The copy
+        knows the positions occupied on the planet, but does not track coverage.
+        '''
+        shadow = type(self).__new__(type(self))
+        shadow.__dict__.update(self.__dict__)
+        shadow._coverage = None
+        # the terrain is still owned by the planet
+        shadow._terrain_finalizer = None
+        shadow._plateau = dict(self._plateau)
+        if self._occupancy is not None:
+            shadow._occupancy = dict(self._occupancy)
+        return shadow
+
+
+    def _place(self, object_id, object_x, object_y):
+        '''
+        Places an object at a position that is already known to be valid, for instance because
+        the object moved there in another process.
+        '''
+        if self._occupancy is not None:
+            if object_id in self._plateau:
+                del self._occupancy[self._plateau[object_id]]
+            self._occupancy[(object_x, object_y)] = object_id
+        self._plateau[object_id] = (object_x, object_y)
+
+
+
+class Blocked(Exception):
+    '''
+    This class represents a position blocked by the terrain.
+    '''
+    pass
+
+
+
+class Crashed(Exception):
+    '''
+    This class represents a position already occupied by another object.
+    '''
+    pass
 
 
 
@@ -4,8 +4,7 @@
 This module represent a NASA mission.
 '''
 
-from pdb import set_trace
-from pprint import pprint
+from os.path import getsize, isfile
 
 from pyrover.mars import Mars, OutOfBounds
 from pyrover.rover import Rover
@@ -15,28 +14,77 @@ class Mission(object):
     '''
     This class represent a Mission and its properties.
     '''
-    def __init__(self, _mission_blueprints_input = None, destination = 'MARS'):
+    def __init__(self, _mission_blueprints_input = None, destination = 'MARS', coverage = False, collisions = False, engine = 'reference', verify = 0.0, verify_seed = None, cache = None, terrain = None, budget = None, heatmaps = False, heatmap_bins = None):
         '''
-        Initializes a Mission object.
+        Initializes a Mission object. If coverage is True, the destination keeps track of the
+        cells photographed by the rovers. If collisions is True, rovers crash when moving onto a
+        position occupied by another rover. If terrain is given, either as the path of a terrain
+        file or as an already loaded Terrain, rovers are stopped by its blocked cells.
+
+        Rovers are executed by the given engine, one of those registered in pyrover.engines. If
+        verify is given, that fraction of the rovers, sampled at random, is also executed by the
+        reference engine, and any divergence is reported through the divergences property.
+
+        If cache is given, either as the path of a cache or as an already opened ResultCache, the
+        results of the rovers are looked up in it, and only the rovers not found are executed. The
+        cache is bypassed when collisions, coverage or a terrain are enabled, since the result of a
+        rover then depends on more than its own blueprints.
+
+        If budget is given, each rover executes at most that many instructions, and one still
+        having instructions to execute once it spent its budget stops with the EXHAUSTED status.
+
+        If heatmaps is True, the histograms of the final positions and of the loss sites of the
+        rovers, and their headings, are kept as the rovers finish, heatmap_bins being the (bins_x,
+        bins_y) resolution of the histograms, 64 by 64 by default. They are available through the
+        heatmaps property, and require NumPy.
         '''
+        from pyrover.engines import get_engine
+        from pyrover.events import EventBus
+
         # mission_setup is the file
         self._available_destinations = {'MARS' : Mars}
+        self._budget = budget
+        self._cache = cache
+        self._cluster_stats = None
+        self._conflicts = None
         self._destination = destination
+        self._destination_options = {'coverage' : coverage, 'collisions' : collisions, 'terrain' : terrain}
+        self._divergences = []
+        self._engine = get_engine(engine)
+        self._events = EventBus()
+        self._heatmap_bins = heatmap_bins
+        self._heatmaps = None
+        self._keep_heatmaps = heatmaps
         self._mission_blueprints_input = _mission_blueprints_input
         self._mission_blueprints = None
         self._rovers = []
+        self._ticks = None
+        self._verified = 0
+        self._verify = verify
+        self._verify_seed = verify_seed
 
+        if budget is not None and (not isinstance(budget, int) or budget < 0):
+            raise ValueError("The budget of the rovers must be a non-negative number of instructions, not %s." % (budget))
+        if not 0 <= self._verify <= 1:
+            raise ValueError("The fraction of rovers to verify must be between 0 and 1, not %s." % (verify))
         if self._mission_blueprints_input is None:
             raise ValueError("A Mission requires _mission_blueprints_input to be given!")
         if self._destination not in self._available_destinations:
             raise ValueError("%s is not a valid destination! Valid destinations are %s." % (destination, ', '.join(self._available_destinations.keys())))
+        if self._cache is not None and not hasattr(self._cache, 'get'):
+            from pyrover.cache import ResultCache
+            self._cache = ResultCache(self._cache)
     
 
     def _get_input(self):
         '''
         Auxiliary method responsible of reading and parsing the input file containing the details
-        of the mission.
+        of the mission. The blueprints can either be the path to a file or an already opened
+        file-like object, such as a StringIO holding blueprints received over the network.
         '''
+        if hasattr(self._mission_blueprints_input, 'read'):
+            self._mission_blueprints = self._mission_blueprints_input.read().splitlines()
+            return
         try:
             with open(self._mission_blueprints_input, "r") as f:
                 self._mission_blueprints = f.read().splitlines()
@@ -44,60 +92,314 @@ class Mission(object):
             raise MissionFailed("The mission's blueprints, %s, were not found! Aborting mission!" % (self._mission_blueprints_input))
 
 
-    def setup(self):
+    def setup(self, workers = None, rovers = None):
         '''
         Sets up a NADA mission. The methods takes care of reading and validatin the mission's
         input and convert it into a Mission. The method does read the input file containing the
         mission's blueprints. It then parses this information, which is expected to contain from 1
         to N lines, with N odd. The first lines provides details about the destination target,
         while each following couple of lines represents a rover's landing position and
-        instructions, with the latter being, again, optional.
+        instructions, with the latter being, again, optional. Instead of its instructions, a rover
+        can be given an exploration policy, through a line such as '@sweep' or '@random_walk 1000'.
+
+        Blueprint files of at least PARALLEL_MIN_BYTES bytes are parsed and validated in chunks, on
+        workers processes, one per CPU by default. A single worker parses them in this process.
+
+        If rovers is given, either as the number of a rover or as a range of them, rovers being
+        numbered from 0 in the order of the file, only those rovers are set up. They are read
+        through the offset index of the blueprint file, built the first time and stored next to
+        it, without reading the rovers before them. The other rovers are never sent, so that the
+        selected ones cannot collide with them.
 
         If the blueprints are valid, mission's resources are created.
         '''
-        self._get_input()
+        from pyrover.parsing import BlueprintError, parse_plateau, parse_rovers, PARALLEL_MIN_BYTES
+        from pyrover.policies import policy_from_line
 
-        if len(self._mission_blueprints) % 2 == 0:
-            raise MissionFailed('The input file containing the mission\'s blueprints must contain an odd number of lines.')
+        try:
+            if rovers is not None:
+                planet_w, planet_h, rovers = self._select(rovers)
+            elif workers != 1 and isinstance(self._mission_blueprints_input, str) and isfile(self._mission_blueprints_input) and getsize(self._mission_blueprints_input) >= PARALLEL_MIN_BYTES:
+                from pyrover.parsing import parse_file
+                planet_w, planet_h, rovers = parse_file(self._mission_blueprints_input, workers)
+            else:
+                self._get_input()
+                if len(self._mission_blueprints) % 2 == 0:
+                    raise MissionFailed('The input file containing the mission\'s blueprints must contain an odd number of lines.')
+                planet_w, planet_h = parse_plateau(self._mission_blueprints[0])
+                rovers = parse_rovers(self._mission_blueprints[1:])
+        except BlueprintError as e:
+            raise MissionFailed("The mission's blueprints are invalid! %s" % (e))
 
         # setup the destination planet
-        planet_w, planet_h = self._mission_blueprints[0].split()
-        self._destination = self._available_destinations[self._destination](int(planet_w), int(planet_h))
+        self._destination = self._available_destinations[self._destination](planet_w, planet_h, **self._destination_options)
+
+        if self._keep_heatmaps:
+            from pyrover.analytics import DEFAULT_BINS, Heatmaps
+            self._heatmaps = Heatmaps(self._destination._width, self._destination._height, self._heatmap_bins or DEFAULT_BINS)
+
+        # setup rovers, if any, whose blueprints were already validated
+        for x, y, facing, rover_cmds in rovers:
 
-        # setup rovers, if any
-        for rover_lz, rover_cmds in zip(self._mission_blueprints[1::2], self._mission_blueprints[2::2]):
+            # the instructions can be replaced by a reference to an exploration policy
+            if rover_cmds.startswith('@'):
+                rover_cmds = policy_from_line(rover_cmds)
 
-            # prepare the landing co-ordinates
-            x, y, facing = rover_lz.split()
-            landing_coords = {'x' : int(x), 'y' : int(y), 'facing' : facing}
-            
-            new_rover = Rover(landing_coords, self._destination, rover_cmds)
+            new_rover = Rover({'x' : x, 'y' : y, 'facing' : facing}, self._destination, rover_cmds, self._events, validate=False, budget=self._budget, heatmaps=self._heatmaps)
             self._rovers.append(new_rover)
 
 
-    def start(self):
+    def _select(self, rovers):
+        '''
+        Auxiliary method that reads the given rovers, a number or a range of them, through the
+        offset index of the blueprint file. Returns the width and the height of the plateau, and an
+        (x, y, facing, instructions) tuple per rover.
+        '''
+        from pyrover.index import BlueprintIndex
+
+        if not isinstance(self._mission_blueprints_input, str):
+            raise ValueError("Rovers can only be selected out of a blueprint file, not %s." % (type(self._mission_blueprints_input)))
+        if isinstance(rovers, range) and rovers.step == 1:
+            start, stop = rovers.start, rovers.stop
+        elif isinstance(rovers, int) and not isinstance(rovers, bool):
+            start, stop = rovers, rovers + 1
+        else:
+            raise ValueError("Rovers must be selected by number or by a range with a step of 1, not %s." % (rovers,))
+        try:
+            index = BlueprintIndex(self._mission_blueprints_input)
+        except (FileNotFoundError, IOError) as e:
+            raise MissionFailed("The mission's blueprints, %s, were not found! Aborting mission!" % (self._mission_blueprints_input))
+        try:
+            return index.plateau + (index.rovers(start, stop),)
+        except IndexError as e:
+            raise ValueError(str(e))
+
+
+    def start(self, parallel = False, workers = None, simultaneous = False, max_ticks = None, nodes = None, deadline = None, threads = None):
         '''
         Starts the mission itself. Each rover is sent over to destination and told to execute the
         instructions it was assigned.
+
+        If parallel is True, rovers are executed speculatively on workers processes, one per CPU
+        by default, and only those whose path crossed the final position of a rover before them
+        are executed again. The outcome is the same as the sequential one.
+
+        If threads is given, rovers are executed speculatively as they are by a parallel start, but
+        on that many threads rather than processes. Threads never share the destination, whose
+        positions are merged in order once they are done, and they only run in parallel on
+        free-threaded builds of CPython.
+
+        If simultaneous is True, rovers move at the same time instead: at each tick every rover
+        still active executes one instruction, until all of them are done or max_ticks ticks have
+        elapsed. The number of ticks elapsed is available through the ticks property.
+
+        If nodes are given, that is the addresses of MissionServers possibly running on other
+        hosts, rovers are sent to them in batches instead, and batches from nodes that die or stall
+        are handed to the others. How the batches were run is available through the cluster_stats
+        property. The outcome is the same as the sequential one.
+
+        If deadline is given, the mission stops once that many seconds have elapsed: rovers still
+        executing their instructions stop where they are, and rovers not sent yet are never sent,
+        all of them with the TIMED_OUT status, so that the outcome holds the partial results. The
+        clock is only read once every so many instructions, and a mission started sequentially
+        with a deadline is executed by the reference engine, the only one that can be interrupted.
         '''
-        for rover in self._rovers:
-            rover.send()
-            rover.execute_instructions()
+        if sum(1 for mode in (parallel, simultaneous, nodes, threads) if mode) > 1:
+            raise ValueError("A mission can only be started in one of parallel, simultaneously, on nodes and on threads.")
+        if deadline is not None and (parallel or nodes or threads):
+            raise ValueError("Only a mission started sequentially or simultaneously can be given a deadline.")
+        from pyrover.engines import ReferenceEngine
+
+        if deadline is not None:
+            from pyrover.deadline import Deadline
+            deadline = Deadline(deadline)
+
+        rovers, pending = self._rovers, []
+        # subscribers decide once per rover, in the order of the rovers, so that the engines and the
+        # starts only fall back to the reference loop for the rovers actually observed
+        if self._events:
+            for rover in rovers:
+                rover._observe()
+        # rovers stopped after max_ticks ticks, their deadline or their budget did not finish, and
+        # their results must not be cached
+        if self._cache is not None and self._destination._occupancy is None and self._destination._coverage is None and self._destination._terrain is None and max_ticks is None and deadline is None and self._budget is None:
+            rovers, pending = self._lookup()
+
+        if nodes:
+            from pyrover.cluster import cluster_start
+            self._cluster_stats = cluster_start(rovers, self._destination, nodes).stats
+        elif parallel:
+            from pyrover.parallel import speculative_start
+            self._conflicts = speculative_start(rovers, self._destination, workers)
+        elif threads:
+            from pyrover.parallel import threaded_start
+            self._conflicts = threaded_start(rovers, self._destination, threads)
+        elif simultaneous:
+            from pyrover.scheduler import TickScheduler
+            self._ticks = TickScheduler(rovers).run(max_ticks, deadline)
+        elif deadline is not None:
+            for index, rover in enumerate(rovers):
+                if deadline.spend():
+                    for late_rover in rovers[index:]:
+                        late_rover._status = 'TIMED_OUT'
+                        late_rover._complete()
+                    break
+                rover.send()
+                rover.execute_instructions(deadline)
+        elif self._verify:
+            from pyrover.engines import verify
+            from random import Random
+            sampler = Random(self._verify_seed)
+            for rover in rovers:
+                # rovers driven by a policy cannot be replayed, the policy being shared
+                if isinstance(rover._instructions, str) and sampler.random() < self._verify:
+                    self._verified += 1
+                    divergence = verify(self._engine, rover)
+                    if divergence is not None:
+                        self._divergences.append(divergence)
+                else:
+                    self._engine.run(rover)
+        elif type(self._engine) is not ReferenceEngine:
+            for rover in rovers:
+                self._engine.run(rover)
+        else:
+            for rover in rovers:
+                rover.send()
+                rover.execute_instructions()
+
+        if pending:
+            from pyrover.cache import result_of
+            self._cache.put_many((key, result_of(rover)) for rover, key in pending)
+
+    def _lookup(self):
+        '''
+        Auxiliary method that applies the results found in the cache to their rovers. Returns the
+        rovers that must still be executed, and the keys their results must be stored under.
+        '''
+        from pyrover.kernel import apply_result
+
+        width, height = self._destination._width - 1, self._destination._height - 1
+        # policies may depend on a random seed, and observed rovers must report their events, so
+        # that both are always executed
+        keys = [
+                    self._cache.key(width, height, rover._landing_coords, rover._instructions)
+                    if isinstance(rover._instructions, str) and rover._observe() is None else None
+                    for rover in self._rovers
+                    ]
+        results = iter(self._cache.get_many([key for key in keys if key is not None]))
+
+        rovers, pending = [], []
+        for rover, key in zip(self._rovers, keys):
+            result = None if key is None else next(results)
+            if result is not None:
+                apply_result(rover, *result)
+                continue
+            rovers.append(rover)
+            if key is not None:
+                pending.append((rover, key))
+        return rovers, pending
+
+    def render(self, rect = None, overview = False, columns = 80, rows = 24):
+        '''
+        Returns the given rectangle of the destination's plateau as text, the whole plateau by
+        default, with each rover marked by its heading. If overview is True, the rectangle is
+        downsampled into at most columns by rows density buckets instead, as plateaus can be far too
+        large to be drawn cell by cell.
+        '''
+        from pyrover.render import render_overview, render_viewport
+
+        if overview:
+            return render_overview(self._destination, columns, rows, rect)
+        return render_viewport(self._destination, rect, {rover._id : rover for rover in self._rovers})
+
+    @property
+    def cache_stats(self):
+        '''
+        Returns the number of hits and misses of the cache of the mission, and its hit rate, or None
+        if the mission has no cache.
+        '''
+        return self._cache.stats if self._cache is not None else None
+
+    @property
+    def cluster_stats(self):
+        '''
+        Returns the number of batches a mission started on nodes was split into, the number of
+        times a batch was handed to another node, and the nodes given up, or None.
+        '''
+        return self._cluster_stats
+
+    @property
+    def conflicts(self):
+        '''
+        Returns the number of rovers that were executed again after a parallel start, because
+        their speculative execution conflicted with another rover, or None after a start that was
+        neither parallel nor on threads.
+        '''
+        return self._conflicts
+
+    @property
+    def coverage(self):
+        '''
+        Returns the coverage of the destination, or None if it is not tracked or the mission has
+        not been setup yet.
+        '''
+        return getattr(self._destination, 'coverage', None)
+
+    @property
+    def divergences(self):
+        '''
+        Returns the divergences found between the engine of the mission and the reference engine
+        on the verified rovers. Each divergence tells the rover's id and its expected and actual
+        final state.
+        '''
+        return list(self._divergences)
+
+    @property
+    def heatmaps(self):
+        '''
+        Returns the Heatmaps of the rovers that finished, or None if they are not kept or the
+        mission has not been setup yet.
+        '''
+        return self._heatmaps
+
+    @property
+    def ticks(self):
+        '''
+        Returns the number of ticks elapsed during a simultaneous start, or None after any other.
+        '''
+        return self._ticks
+
+    @property
+    def verified(self):
+        '''
+        Returns the number of rovers that were also executed by the reference engine.
+        '''
+        return self._verified
+
+    @property
+    def events(self):
+        '''
+        Returns the EventBus of the mission, through which the events of its rovers are observed.
+        '''
+        return self._events
 
     @property
     def outcome(self):
         '''
         Returns the outcome of a mission, that is the final position of the rovers sent to the
-        destination target.
+        destination target. Rovers that crashed, or were blocked by the terrain, after landing are
+        stuck in their final position, as are those that ran out of budget or time, while lost
+        rovers, those that crashed or were blocked while landing, and those never sent because the
+        mission ran out of time, have none.
         '''
         response = ''
         for rover in self._rovers:
-            if rover._status is 'ALIVE':
+            if rover._status in ('ALIVE', 'BLOCKED', 'CRASHED', 'EXHAUSTED', 'TIMED_OUT') and rover._current_position is not None:
                 rover_x = rover._current_position['x']
                 rover_y = rover._current_position['y']
                 rover_facing = rover._current_position['facing']
                 response += "%s %s %s\n" % (rover_x, rover_y, rover_facing)
-            elif rover._status is 'LOST':
+            elif rover._status == 'LOST':
                 pass
         return response
 
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module represent the speculative parallel execution of a mission.
+
+Rovers are finished sequentially: rover k only starts once rover k-1 has finished. When collisions
+are enforced, rover k depends on the final positions of the rovers before it, and on nothing else,
+since rovers that are lost leave the plateau and those that are alive, or crashed, stay where they
+finished. Rovers are therefore simulated in parallel against the plateau as it is when the mission
+starts. Then, in order, the path each rover walked is validated against the final positions of the
+rovers before it: if the path does not cross any of them, the speculative result is exactly what
+the sequential execution would produce, otherwise the rover is executed again against the actual
+plateau. The outcome always equals the sequential one, and only conflicting rovers pay twice.
+
+Simulations can also be run on threads rather than processes, which spares pickling the batches and
+starting the workers. Mars is not thread-safe, and threads never share it: each of them simulates
+its batch against the frozen snapshot of the plateau, and its results are staged until they are
+merged, in order, by the calling thread. Threads only run in parallel on free-threaded builds of
+CPython, on others the global interpreter lock runs them one at a time.
+'''
+
+from os import cpu_count
+
+from pyrover.kernel import apply_result, simulate, truncate
+
+
+def _simulate_batch(width, height, occupied, record_path, batch, terrain=None):
+    '''
+    Simulates a batch of rovers, each represented by an (x, y, facing, instructions) tuple.
+    '''
+    return [simulate(width, height, x, y, facing, instructions, occupied, record_path, terrain) for x, y, facing, instructions in batch]
+
+
+def speculative_start(rovers, destination, workers=None, executor=None, batches_per_worker=4):
+    '''
+    Sends the given rovers, which must not have been sent yet, to their destination and has them
+    execute their instructions, as Mission.start would, running them on workers processes. An
+    already running concurrent.futures executor can be given instead, in which case workers is
+    only used to size the batches.
+
+    Returns the number of rovers whose speculative execution conflicted with the final position of
+    a rover before them and that were executed again.
+    '''
+    if workers is None:
+        workers = cpu_count() or 1
+    if not isinstance(workers, int) or workers < 1:
+        raise ValueError("A speculative execution requires at least one worker, not %s." % (workers))
+    if not rovers:
+        return 0
+    if any(not isinstance(rover._instructions, str) for rover in rovers):
+        raise ValueError("Rovers driven by a policy depend on the whole plateau and cannot be executed speculatively.")
+    if any(rover._observe() is not None for rover in rovers):
+        raise ValueError("Rovers whose events are observed cannot be executed speculatively.")
+
+    width, height = destination._width, destination._height
+    collisions = destination._occupancy is not None
+    snapshot = frozenset(destination._occupancy) if collisions else None
+    record_path = collisions or destination._coverage is not None
+
+    # rovers only execute the instructions within their budget
+    budgets = [truncate(rover._instructions, rover._budget) for rover in rovers]
+    programs = [(rover._landing_coords['x'], rover._landing_coords['y'], rover._landing_coords['facing'], instructions) for rover, (instructions, _) in zip(rovers, budgets)]
+    batch_size = max(1, -(-len(programs) // (workers * batches_per_worker)))
+    batches = [programs[i:i + batch_size] for i in range(0, len(programs), batch_size)]
+
+    own_executor = executor is None
+    if own_executor:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [executor.submit(_simulate_batch, width, height, snapshot, record_path, batch, destination._terrain) for batch in batches]
+        conflicts = 0
+        occupied = set(snapshot) if collisions else None
+        finals = set()
+        pending = iter(zip(rovers, programs, budgets))
+        for future in futures:
+            for result, (rover, program, (_, exhausted)) in zip(future.result(), pending):
+                status, x, y, facing, path = result
+                if collisions and not finals.isdisjoint(path):
+                    conflicts += 1
+                    status, x, y, facing, path = simulate(width, height, *program, occupied=occupied, record_path=True, terrain=destination._terrain)
+                apply_result(rover, status, x, y, facing, path, exhausted)
+                if collisions and status != 'LOST' and x is not None:
+                    finals.add((x, y))
+                    occupied.add((x, y))
+    finally:
+        if own_executor:
+            executor.shutdown()
+    return conflicts
+
+
+def threaded_start(rovers, destination, threads=None):
+    '''
+    Sends the given rovers, which must not have been sent yet, to their destination and has them
+    execute their instructions, as speculative_start does, running them on threads threads, one
+    per CPU by default.
+
+    Returns the number of rovers that were executed again.
+    '''
+    from concurrent.futures import ThreadPoolExecutor
+
+    if threads is None:
+        threads = cpu_count() or 1
+    if not isinstance(threads, int) or threads < 1:
+        raise ValueError("A threaded execution requires at least one thread, not %s." % (threads))
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return speculative_start(rovers, destination, threads, executor)
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module represent the parsing and validation of the mission's blueprints. The first line of
+the blueprints describes the plateau, and each following pair of lines a rover: its landing
+position and its instructions.
+
+Large blueprint files are split into byte ranges, each made of whole rovers: a range starts right
+after a newline, on a line holding a landing position, that is an even line since the plateau
+takes the first one. Ranges are parsed and validated on worker processes, which read them from
+the file themselves, and the rovers are reassembled in order. Each range knows the number of its
+first line, so that errors are reported against the line of the original file.
+'''
+
+from os import cpu_count
+from os.path import getsize
+
+from pyrover.kernel import CARDINAL_POINTS, HEADINGS
+from pyrover.policies import policy_from_line
+
+
+# blueprint files of at least this many bytes are parsed on worker processes
+PARALLEL_MIN_BYTES = 2 ** 23
+
+# deletes the valid instructions, leaving only the invalid ones
+_INVALID_INSTRUCTIONS = str.maketrans('', '', 'LRM')
+
+
+class BlueprintError(ValueError):
+    '''
+    This class represents an invalid line of the mission's blueprints.
+    '''
+    def __init__(self, line, message):
+        # both are kept as arguments, so that the exception can be raised back from a worker
+        super(BlueprintError, self).__init__(line, message)
+        self.line = line
+
+    def __str__(self):
+        return "Line %s: %s" % self.args
+
+
+def parse_plateau(line):
+    '''
+    Parses the first line of the blueprints, returning the width and the height of the plateau.
+    '''
+    tokens = line.split()
+    try:
+        if len(tokens) != 2:
+            raise ValueError
+        return int(tokens[0]), int(tokens[1])
+    except ValueError:
+        raise BlueprintError(1, "the plateau must be described by its width and height, not %r." % (line))
+
+
+def parse_rovers(lines, first_line=2):
+    '''
+    Parses and validates the given lines, which must be an even number, as pairs of landing
+    position and instructions. first_line is the number, in the blueprints, of the first of them.
+    Returns an (x, y, facing, instructions) tuple per rover. The instructions are returned as
+    they are written, even if they reference a policy.
+    '''
+    rovers = []
+    for index in range(0, len(lines), 2):
+        landing, instructions = lines[index], lines[index + 1]
+        tokens = landing.split()
+        if len(tokens) != 3 or tokens[2] not in HEADINGS:
+            raise BlueprintError(first_line + index, "a landing position must be made of x, y and one of %s, not %r." % (', '.join(CARDINAL_POINTS), landing))
+        try:
+            x, y = int(tokens[0]), int(tokens[1])
+        except ValueError:
+            raise BlueprintError(first_line + index, "the co-ordinates of a landing position must be integers, not %r." % (landing))
+
+        if instructions.startswith('@'):
+            try:
+                policy_from_line(instructions)
+            except ValueError as e:
+                raise BlueprintError(first_line + index + 1, str(e))
+        elif instructions.translate(_INVALID_INSTRUCTIONS):
+            raise BlueprintError(first_line + index + 1, "instructions can only contain L, R and M, not %r." % (instructions))
+        rovers.append((x, y, tokens[2], instructions))
+    return rovers
+
+
+def _split_lines(text):
+    '''
+    Splits text into lines as str.splitlines would for blueprints, that is on newlines, dropping
+    the carriage returns of files written on Windows.
+    '''
+    lines = text.split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    return [line[:-1] if line.endswith('\r') else line for line in lines]
+
+
+def _parse_range(path, start, end, first_line):
+    '''
+    Reads the given byte range of a blueprint file and parses the rovers it holds.
+    '''
+    with open(path, 'rb') as f:
+        f.seek(start)
+        lines = _split_lines(f.read(end - start).decode('utf-8'))
+    if len(lines) % 2:
+        raise BlueprintError(first_line + len(lines) - 1, "the last rover has no instructions line.")
+    return parse_rovers(lines, first_line)
+
+
+def _count_lines(data, start, end, block=2 ** 20):
+    '''
+    Returns the number of newlines of data between start and end. Memory maps cannot count, so
+    that data is counted one block at a time.
+    '''
+    return sum(data[offset:min(offset + block, end)].count(b'\n') for offset in range(start, end, block))
+
+
+def plan_ranges(data, chunks):
+    '''
+    Splits the blueprints held by data, a bytes-like object, into about the given number of byte
+    ranges made of whole rovers. Returns the end of the first line, and a (start, end, first line)
+    tuple per range.
+    '''
+    header_end = data.find(b'\n') + 1
+    if header_end == 0:
+        return len(data), []
+
+    size = len(data)
+    ranges = []
+    start, line = header_end, 2
+    step = max((size - header_end) // chunks, 1)
+    while start < size:
+        end = data.find(b'\n', min(start + step, size - 1))
+        end = size if end == -1 else end + 1
+        lines = _count_lines(data, start, end)
+        # a range must end on an instructions line, and the next one start on a landing line
+        if lines % 2:
+            next_end = data.find(b'\n', end)
+            end = size if next_end == -1 else next_end + 1
+            lines += 1
+        ranges.append((start, end, line))
+        start, line = end, line + lines
+    return header_end, ranges
+
+
+def parse_file(path, workers=None, executor=None, ranges_per_worker=4):
+    '''
+    Parses and validates a blueprint file on workers processes, one per CPU by default, or on an
+    already running concurrent.futures executor. Returns the width and the height of the plateau,
+    and an (x, y, facing, instructions) tuple per rover, in the order of the file.
+    '''
+    from mmap import mmap, ACCESS_READ
+
+    if workers is None:
+        workers = cpu_count() or 1
+    if not isinstance(workers, int) or workers < 1:
+        raise ValueError("A parallel parsing requires at least one worker, not %s." % (workers))
+
+    if getsize(path) == 0:
+        raise BlueprintError(1, "the mission's blueprints must contain an odd number of lines.")
+    with open(path, 'rb') as f, mmap(f.fileno(), 0, access=ACCESS_READ) as data:
+        lines = _count_lines(data, 0, len(data)) + (0 if data[-1:] == b'\n' else 1)
+        header_end, ranges = plan_ranges(data, workers * ranges_per_worker)
+        header = _split_lines(data[:header_end].decode('utf-8'))[0]
+    if lines % 2 == 0:
+        raise BlueprintError(lines, "the mission's blueprints must contain an odd number of lines.")
+    width, height = parse_plateau(header)
+
+    if executor is not None:
+        return width, height, _gather(executor, path, ranges)
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(workers) as executor:
+        return width, height, _gather(executor, path, ranges)
+
+
+def _gather(executor, path, ranges):
+    '''
+    Parses the given ranges of a blueprint file on an executor, and reassembles their rovers in
+    order.
+    '''
+    futures = [executor.submit(_parse_range, path, start, end, line) for start, end, line in ranges]
+    return [rover for future in futures for rover in future.result()]
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module represent the exploration policies of a rover. A policy drives a rover by choosing its
+next instruction out of the rover's current position and what it knows about its destination: the
+boundaries of the plateau and the positions occupied on it. Instructions are generated on the fly,
+one at a time, so that a rover can explore for as long as its step budget allows without any stored
+program.
+
+Policies can be given to a Rover instead of its instructions, or referenced from the mission's
+blueprints through an instructions line made of an @ followed by the name of a registered policy
+and, optionally, its step budget:
+
+    5 5
+    0 0 N
+    @sweep
+    3 3 E
+    @random_walk 1000
+'''
+
+from itertools import islice
+
+from pyrover.kernel import DELTA_X, DELTA_Y, HEADINGS
+
+
+class Policy(object):
+    '''
+    This class represents the interface of an exploration policy.
+    '''
+    def __init__(self, steps=None):
+        '''
+        Initializes a Policy. Rovers driven by the policy execute at most steps instructions, or as
+        many as the policy generates if steps is None.
+        '''
+        if steps is not None and (not isinstance(steps, int) or steps < 0):
+            raise ValueError("The step budget of a policy must be a non negative integer, not %s." % (steps))
+        self._steps = steps
+
+    def __str__(self):
+        return "%s(steps=%s)" % (type(self).__name__, self._steps)
+
+    def instructions(self, rover):
+        '''
+        Returns an iterator over the instructions the given rover, which has safely landed, must
+        execute. Each instruction is generated right before being executed, so that the policy
+        always sees the rover in its current position.
+        '''
+        if self._steps is None:
+            return self._generate(rover)
+        return islice(self._generate(rover), self._steps)
+
+    def _generate(self, rover):
+        '''
+        Yields the instructions of the rover, one at a time.
+        '''
+        raise NotImplementedError
+
+    @staticmethod
+    def _ahead(rover):
+        '''
+        Returns the position right in front of the rover.
+        '''
+        position = rover._current_position
+        heading = HEADINGS[position['facing']]
+        return position['x'] + DELTA_X[heading], position['y'] + DELTA_Y[heading]
+
+    @staticmethod
+    def _is_free(destination, x, y):
+        '''
+        Returns True if an object can safely move to the position x, y of the destination.
+        '''
+        if x < 0 or y < 0 or x >= destination._width or y >= destination._height:
+            return False
+        if destination._terrain is not None and (x, y) in destination._terrain:
+            return False
+        return destination._occupancy is None or (x, y) not in destination._occupancy
+
+
+class RandomWalkPolicy(Policy):
+    '''
+    This class represents a random walk bounded to the plateau: the rover moves forward at random,
+    but never towards a position out of bounds, blocked by the terrain or occupied by another
+    object, turning instead.
+    '''
+    def __init__(self, steps=1000, seed=None, move_probability=0.5):
+        '''
+        Initializes a RandomWalkPolicy. Given the same seed, each rover driven by the policy walks
+        the same way from the same landing position. A random walk never ends on its own, so that
+        its step budget cannot be None.
+        '''
+        if steps is None:
+            raise ValueError("The step budget of a random walk must be given, a random walk never ends on its own.")
+        super(RandomWalkPolicy, self).__init__(steps)
+        if not 0 < move_probability <= 1:
+            raise ValueError("The probability of moving forward must be between 0 and 1, not %s." % (move_probability))
+        self._move_probability = move_probability
+        self._seed = seed
+
+    def _generate(self, rover):
+        from random import Random
+
+        generator = Random(self._seed)
+        destination = rover._destination
+        while True:
+            if generator.random() < self._move_probability and self._is_free(destination, *self._ahead(rover)):
+                yield 'M'
+            else:
+                yield generator.choice('LR')
+
+
+class BoustrophedonPolicy(Policy):
+    '''
+    This class represents a boustrophedon sweep of the plateau: the rover reaches the lower-left
+    corner, then sweeps each row in turn, alternating directions, up to the top one. The sweep stops
+    early if the rover finds its way blocked by another object.
+    '''
+    def __init__(self, steps=None):
+        super(BoustrophedonPolicy, self).__init__(steps)
+
+    @staticmethod
+    def _face(rover, facing):
+        '''
+        Yields the rotations that turn the rover towards the given cardinal point.
+        '''
+        while rover._current_position['facing'] != facing:
+            turns = (HEADINGS[facing] - HEADINGS[rover._current_position['facing']]) & 3
+            yield 'L' if turns == 3 else 'R'
+
+    def _walk(self, rover, facing, until):
+        '''
+        Yields the instructions that turn the rover towards the given cardinal point and move it
+        forward until the given condition holds. Returns False if the rover was blocked.
+        '''
+        yield from self._face(rover, facing)
+        while not until(rover._current_position):
+            if not self._is_free(rover._destination, *self._ahead(rover)):
+                return False
+            yield 'M'
+        return True
+
+    def _generate(self, rover):
+        destination = rover._destination
+        last_column, last_row = destination._width - 1, destination._height - 1
+
+        # reach the lower-left corner
+        if not (yield from self._walk(rover, 'S', lambda position: position['y'] == 0)):
+            return
+        if not (yield from self._walk(rover, 'W', lambda position: position['x'] == 0)):
+            return
+
+        facing = 'E'
+        while True:
+            last = last_column if facing == 'E' else 0
+            if not (yield from self._walk(rover, facing, lambda position: position['x'] == last)):
+                return
+            row = rover._current_position['y']
+            if row == last_row:
+                return
+            if not (yield from self._walk(rover, 'N', lambda position: position['y'] == row + 1)):
+                return
+            facing = 'W' if facing == 'E' else 'E'
+
+
+POLICIES = {'random_walk' : RandomWalkPolicy, 'sweep' : BoustrophedonPolicy}
+
+
+def policy_from_line(line):
+    '''
+    Returns the policy referenced by an instructions line of the mission's blueprints, that is an @
+    followed by the name of a registered policy and, optionally, its step budget.
+    '''
+    tokens = line[1:].split()
+    if not line.startswith('@') or not 1 <= len(tokens) <= 2 or tokens[0] not in POLICIES:
+        raise ValueError("%s does not reference a valid policy! Valid policies are %s." % (line, ', '.join(sorted(POLICIES))))
+    if len(tokens) == 2:
+        return POLICIES[tokens[0]](steps=int(tokens[1]))
+    return POLICIES[tokens[0]]()
+
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module represent the rendering of a plateau as text. Plateaus can be far too large to be drawn
+cell by cell, so that two views are available, neither of which visits the whole plateau:
+
+ - A viewport, that is a rectangle of the plateau drawn cell by cell, each object marked by its
+   heading if it is a rover. It costs time proportional to the size of the viewport plus the
+   number of objects inside it, when the planet keeps its occupancy, or on the plateau otherwise.
+ - An overview, that is a rectangle of the plateau, the whole of it by default, downsampled into a
+   fixed number of buckets, each drawn according to the number of objects inside it. It costs time
+   proportional to the number of buckets plus the number of objects, found as for a viewport.
+
+Rectangles are expressed as (x_min, y_min, x_max, y_max) tuples, with both corners included. Rows
+are drawn from north to south, so that the view matches the plateau as it is usually pictured.
+'''
+
+
+EMPTY = '.'
+HEADINGS = {'N' : '^', 'E' : '>', 'S' : 'v', 'W' : '<'}
+OBJECT = 'o'
+# from the emptiest to the densest bucket
+DENSITIES = ' .:-=+*#%@'
+
+
+def _clip(destination, rect):
+    '''
+    Clips a rectangle to the plateau of the destination, which is the whole plateau if rect is
+    None.
+    '''
+    if rect is None:
+        return 0, 0, destination._width - 1, destination._height - 1
+    x_min, y_min, x_max, y_max = rect
+    return max(x_min, 0), max(y_min, 0), min(x_max, destination._width - 1), min(y_max, destination._height - 1)
+
+
+def _objects_in(destination, x_min, y_min, x_max, y_max):
+    '''
+    Yields the (object id, x, y) of the objects inside an already clipped rectangle, probing its
+    cells if the destination keeps its occupancy and the rectangle holds fewer cells than there are
+    objects on the plateau, scanning the objects otherwise.
+    '''
+    occupancy = destination._occupancy
+    if occupancy is not None and (x_max - x_min + 1) * (y_max - y_min + 1) < len(destination._plateau):
+        for y in range(y_min, y_max + 1):
+            for x in range(x_min, x_max + 1):
+                object_id = occupancy.get((x, y))
+                if object_id is not None:
+                    yield object_id, x, y
+        return
+    for object_id, (x, y) in destination._plateau.items():
+        if x_min <= x <= x_max and y_min <= y <= y_max:
+            yield object_id, x, y
+
+
+def render_viewport(destination, rect=None, rovers=None):
+    '''
+    Returns the given rectangle of the plateau of a destination, the whole plateau by default,
+    drawn cell by cell. rovers maps the ids of the rovers to the rovers themselves, so that each is
+    marked by its heading, while other objects are marked as such.
+    '''
+    x_min, y_min, x_max, y_max = _clip(destination, rect)
+    if x_min > x_max or y_min > y_max:
+        return ''
+    rows = [[EMPTY] * (x_max - x_min + 1) for _ in range(y_max - y_min + 1)]
+    for object_id, x, y in _objects_in(destination, x_min, y_min, x_max, y_max):
+        rover = rovers.get(object_id) if rovers is not None else None
+        position = rover._current_position if rover is not None else None
+        rows[y - y_min][x - x_min] = HEADINGS[position['facing']] if position is not None else OBJECT
+    return '\n'.join(''.join(row) for row in reversed(rows)) + '\n'
+
+
+def render_overview(destination, columns=80, rows=24, rect=None):
+    '''
+    Returns the given rectangle of the plateau of a destination, the whole plateau by default,
+    downsampled into at most columns by rows buckets. Each bucket is drawn according to the number
+    of objects inside it, relative to the densest bucket: blank if it holds none, @ for the densest.
+    '''
+    if not isinstance(columns, int) or not isinstance(rows, int) or columns < 1 or rows < 1:
+        raise ValueError("An overview must have a positive number of columns and rows, not %s and %s." % (columns, rows))
+    x_min, y_min, x_max, y_max = _clip(destination, rect)
+    if x_min > x_max or y_min > y_max:
+        return ''
+
+    width, height = x_max - x_min + 1, y_max - y_min + 1
+    columns, rows = min(columns, width), min(rows, height)
+    counts = [[0] * columns for _ in range(rows)]
+    for _, x, y in _objects_in(destination, x_min, y_min, x_max, y_max):
+        counts[(y - y_min) * rows // height][(x - x_min) * columns // width] += 1
+
+    densest = max(max(row) for row in counts)
+    levels = len(DENSITIES) - 1
+    lines = []
+    for row in reversed(counts):
+        lines.append(''.join(DENSITIES[-(-count * levels // densest)] if count else DENSITIES[0] for count in row))
+    return '\n'.join(lines) + '\n'
+
+
+class LiveView(object):
+    '''
+    This class represents a subscriber drawing an overview of the plateau of a mission on a stream
+    every given number of rovers completing their instructions, so that long missions can be
+    followed while they run.
+    '''
+    def __init__(self, stream, every=1000, columns=80, rows=24):
+        if not isinstance(every, int) or every < 1:
+            raise ValueError("A live view must be drawn every positive number of rovers, not %s." % (every))
+        self._columns = columns
+        self._completed = 0
+        self._every = every
+        self._rows = rows
+        self._stream = stream
+
+    def on_complete(self, rover):
+        self._completed += 1
+        if self._completed % self._every == 0:
+            self._stream.write("%s rovers completed\n" % (self._completed))
+            self._stream.write(render_overview(rover._destination, self._columns, self._rows))
+            self._stream.flush()
@@ -4,19 +4,52 @@
 This module represent a Rover, a possible crew member of a NASA's expedition.
 '''
 
-from copy import deepcopy
-from pdb import set_trace
-from pprint import pprint
-from uuid import uuid4
+from itertools import islice
+from os import urandom
 
-from pyrover.mars import Mars, OutOfBounds
+from pyrover.kernel import CARDINAL_POINTS, DELTA_X, DELTA_Y, HEADINGS, ROTATIONS
+from pyrover.mars import Blocked, Crashed, Mars, MOVE_OK, OutOfBounds
+from pyrover.policies import Policy
+
+
+# runs of at least this many M instructions are validated by the destination in a single call,
+# shorter ones one step at a time, which is cheaper for them
+LONG_RUN_MOVES = 8
+# the event emitted when a rover stops because of its status
+STATUS_EVENTS = {'BLOCKED' : 'on_blocked', 'CRASHED' : 'on_crash', 'LOST' : 'on_lost'}
+
+
+def long_run_spans(instructions):
+    '''
+    Returns the (start, end) spans of the long runs of M instructions of the given instructions.
+    '''
+    if 'M' * LONG_RUN_MOVES not in instructions:
+        return []
+    from re import finditer
+
+    return [match.span() for match in finditer('M{%d,}' % (LONG_RUN_MOVES), instructions)]
+
+
+def long_runs(instructions):
+    '''
+    Yields the given instructions as (instruction, count) tuples, one per instruction, except for
+    long runs of M instructions, each yielded as a single tuple.
+    '''
+    start = 0
+    for run_start, run_end in long_run_spans(instructions):
+        for instruction in instructions[start:run_start]:
+            yield instruction, 1
+        yield 'M', run_end - run_start
+        start = run_end
+    for instruction in instructions[start:]:
+        yield instruction, 1
 
 
 class Rover(object):
     '''
     This class represent a Rover bot and its properties.
     '''
-    def __init__(self, landing_coords, destination, instructions=''):
+    def __init__(self, landing_coords, destination, instructions='', events=None, validate=True, budget=None, heatmaps=None):
         '''
         This methods takes care of initializing a new Rover. A rover must be at least assigned the
         landing co-ordinates where it will try to touch the alien surface. The landing zone is a
@@ -28,20 +61,42 @@ class Rover(object):
 
         A rover is supposed to execute instructions upon arrival, but this is not mandatory. For
         this reason, if a rover is not given any instruction, it will simply stay where it landed,
-        if it safely did.
+        if it safely did. Instead of a string of instructions, a rover can also be given a Policy,
+        which then chooses each instruction while the rover explores.
+
+        If an EventBus is given, its subscribers are told when the rover lands, moves, rotates, is
+        lost, crashes, is blocked by the terrain and completes its instructions.
+
+        If Heatmaps are given, the rover is recorded into them once it is done with its
+        instructions.
+
+        If a budget is given, the rover executes at most that many instructions: one still having
+        instructions to execute once it spent its budget stops with the EXHAUSTED status.
+
+        If validate is False, the landing co-ordinates and the instructions are trusted, because
+        they were already validated, for instance while parsing the mission's blueprints.
         '''
+        self._budget = budget
         self._current_position = None
         self._destination = destination
-        self._id = "rover_%s" % uuid4()
+        self._events = events
+        self._heatmaps = heatmaps
+        self._id = "rover_%s" % urandom(16).hex()
         self._instructions = instructions
         self._landing_coords = landing_coords
         self._last_known_position = None
+        self._listeners = None
+        self._observed = False
         self._status = 'ALIVE'
         self._valid_cardinal_point = ['N', 'E', 'S', 'W']
         self._valid_movements = ['M']
         self._valid_rotations = ['L', 'R']
-        self._valid_statuses = ['ALIVE', 'LOST']
+        self._valid_statuses = ['ALIVE', 'BLOCKED', 'CRASHED', 'EXHAUSTED', 'LOST', 'TIMED_OUT']
 
+        if not validate:
+            return
+        if budget is not None and (not isinstance(budget, int) or budget < 0):
+            raise ValueError("The budget of a rover must be a non-negative number of instructions, not %s." % (budget))
         if not isinstance(self._landing_coords, dict):
             raise TypeError("The landing_coords are expected as a dictionary, not %s." % (type(self._landing_coords)))
         if any([expected_key not in self._landing_coords.keys() for expected_key in ('x', 'y', 'facing')]):
@@ -52,8 +107,10 @@ class Rover(object):
         if not isinstance(self._destination, Mars):
             raise TypeError("The target destination must be Mars, not %s!" % (type(self._destination)))
 
+        if isinstance(self._instructions, Policy):
+            return
         if not isinstance(self._instructions, str):
-            raise TypeError("The instructions a rover must execute are expected as a string, not %s." % (type(self._instructions)))
+            raise TypeError("The instructions a rover must execute are expected as a string or a Policy, not %s." % (type(self._instructions)))
         if any([i not in self._valid_movements + self._valid_rotations for i in self._instructions]):
             raise ValueError("The instructions a rover must execute can contain only the following values: %s" % ', '.join(self._valid_movements + self._valid_rotations))
 
@@ -62,13 +119,30 @@ class Rover(object):
         '''
         Returns a user-friendly representation of a Rover.
         '''
-        if self._status is 'ALIVE':
+        if self._status == 'ALIVE':
             message = "Rover %s is in position %s, %s, facing %s." % (self._id, self._current_position['x'], self._current_position['y'], self._current_position['facing'])
-        elif self._status is 'LOST':
+        elif self._status == 'LOST':
             if self._last_known_position is None:
                 message = "Rover %s was lost. It never made it to the planet." % (self._id)
             elif isinstance(self._last_known_position, dict):
                 message = "Rover %s was lost. Its last known position was %s, %s, facing %s." % (self._id, self._last_known_position['x'], self._last_known_position['y'], self._last_known_position['facing'])
+        elif self._status == 'CRASHED':
+            if self._current_position is None:
+                message = "Rover %s crashed. It never made it to the planet." % (self._id)
+            else:
+                message = "Rover %s crashed. It is stuck in position %s, %s, facing %s." % (self._id, self._current_position['x'], self._current_position['y'], self._current_position['facing'])
+        elif self._status == 'BLOCKED':
+            if self._current_position is None:
+                message = "Rover %s was blocked by the terrain. It never made it to the planet." % (self._id)
+            else:
+                message = "Rover %s was blocked by the terrain. It is stuck in position %s, %s, facing %s." % (self._id, self._current_position['x'], self._current_position['y'], self._current_position['facing'])
+        elif self._status == 'EXHAUSTED':
+            message = "Rover %s ran out of instructions budget. It stopped in position %s, %s, facing %s." % (self._id, self._current_position['x'], self._current_position['y'], self._current_position['facing'])
+        elif self._status == 'TIMED_OUT':
+            if self._current_position is None:
+                message = "Rover %s ran out of time. It was never sent to the planet." % (self._id)
+            else:
+                message = "Rover %s ran out of time. It stopped in position %s, %s, facing %s." % (self._id, self._current_position['x'], self._current_position['y'], self._current_position['facing'])
         return message
 
 
@@ -76,52 +150,187 @@ class Rover(object):
         '''
         This method is responsible of the landing of the rover on the target destination. It does
         take care of updating the rover's position and status, making sure to handle the case that
-        it never makes it to the surface.
+        it never makes it to the surface, or that it crashes onto another object while landing.
         '''
+        self._observe()
+
         try:
             self._destination.update_plateau(self._id, self._landing_coords['x'], self._landing_coords['y'])
-            self._current_position = deepcopy(self._landing_coords)
-            self._last_known_position = deepcopy(self._landing_coords)
+            self._current_position = dict(self._landing_coords)
+            self._last_known_position = dict(self._landing_coords)
         except OutOfBounds as e:
             self._status = 'LOST'
+        except Crashed as e:
+            self._status = 'CRASHED'
+        except Blocked as e:
+            self._status = 'BLOCKED'
+
+        if self._listeners is not None:
+            self._emit(STATUS_EVENTS.get(self._status, 'on_land'))
 
 
-    def execute_instructions(self):
+    def execute_instructions(self, deadline=None, stepwise=False):
         '''
         Executes the instructions assigned, as long as the rover has safely landed and is alive.
+        If a Deadline is given, the rover stops with the TIMED_OUT status once it expired, the
+        clock being only read once every so many instructions. If stepwise is True, long runs of M
+        instructions are executed one step at a time too, as the reference loop always did.
         '''
-        for instruction in self._instructions:
-            if self._status is 'ALIVE':
+        listeners = self._listeners
+        if self._status != 'ALIVE':
+            if listeners is not None:
+                self._emit('on_complete')
+            if self._heatmaps is not None:
+                self._heatmaps.record(self)
+            return
 
-                current_facing = self._current_position['facing']
-                self._last_known_position['facing'] = current_facing
+        # each instruction is executed on its own, as the reference loop always did, except for long
+        # runs of M instructions, which are validated by the destination in a single call. Steps
+        # are only reported one by one if a subscriber observes them
+        report = listeners is not None and ('on_move' in listeners or 'on_rotate' in listeners)
+        instructions, budget, exhausted = self._instructions, self._budget, False
+        if isinstance(instructions, str):
+            # the instructions beyond the budget are never executed
+            if budget is not None and len(instructions) > budget:
+                instructions, exhausted = instructions[:budget], True
+            if deadline is None and not report:
+                if stepwise:
+                    self._execute_steps(instructions)
+                else:
+                    self._execute_program(instructions)
+                if exhausted and self._status == 'ALIVE':
+                    self._status = 'EXHAUSTED'
+                self._complete()
+                return
+            runs = ((instruction, 1) for instruction in instructions) if report or stepwise else long_runs(instructions)
+        else:
+            # a policy chooses its instructions as it goes, so that one more is asked for to tell
+            # whether the budget was enough
+            instructions = instructions.instructions(self)
+            if budget is not None:
+                instructions = islice(instructions, budget + 1)
+            runs = ((instruction, 1) for instruction in instructions)
 
-                if instruction is 'M':
-                    new_position_x, new_position_y = self._calculate_new_position()
-                    try:
-                        self._destination.update_plateau(self._id, new_position_x, new_position_y)
-                        self._last_known_position['x'], self._last_known_position['y'] = new_position_x, new_position_y
-                        self._current_position['x'], self._current_position['y'] = new_position_x, new_position_y
-                    except OutOfBounds as e:
-                        self._status = 'LOST'
-                        self._current_position = None
+        executed = 0
+        for instruction, count in runs:
+            if executed == budget:
+                exhausted = True
+                break
+            if deadline is not None and deadline.spend(count):
+                self._status = 'TIMED_OUT'
+                break
+            if not (self._execute_steps(instruction, report) if count == 1 else self._execute_run(count)):
+                break
+            executed += count
+        if exhausted and self._status == 'ALIVE':
+            self._status = 'EXHAUSTED'
+        self._complete()
 
-                elif instruction in ['L', 'R']:
 
-                    if instruction is 'L':
-                        try:
-                            self._current_position['facing'] = self._valid_cardinal_point[self._valid_cardinal_point.index(current_facing) - 1]
-                        except IndexError:
-                            self._current_position['facing'] = self._valid_cardinal_point[-1]
+    def _execute_program(self, instructions):
+        '''
+        Executes a whole program, the long runs of M instructions at once, and the instructions in
+        between one at a time.
+        '''
+        start = 0
+        for run_start, run_end in long_run_spans(instructions):
+            if not self._execute_steps(instructions[start:run_start]) or not self._execute_run(run_end - run_start):
+                return
+            start = run_end
+        self._execute_steps(instructions[start:])
 
-                    elif instruction is 'R':
-                        try:
-                            self._current_position['facing'] = self._valid_cardinal_point[self._valid_cardinal_point.index(current_facing) + 1]
-                        except IndexError:
-                            self._current_position['facing'] = self._valid_cardinal_point[0]
 
-                    self._last_known_position['facing'] = self._current_position['facing']
-                    
+    def _execute_steps(self, instructions, report=False):
+        '''
+        Executes the given instructions one at a time, each move being validated by the destination
+        on its own, which is cheaper than a batched move for short runs. Each step is reported to
+        the subscribers if report is True. Returns False if the rover is no longer alive.
+        '''
+        destination, object_id = self._destination, self._id
+        current_position, last_known_position = self._current_position, self._last_known_position
+        for instruction in instructions:
+            heading = HEADINGS[current_position['facing']]
+            if instruction == 'M':
+                new_position_x, new_position_y = current_position['x'] + DELTA_X[heading], current_position['y'] + DELTA_Y[heading]
+                try:
+                    destination.update_plateau(object_id, new_position_x, new_position_y)
+                except OutOfBounds as e:
+                    self._status = 'LOST'
+                    self._current_position = None
+                    return False
+                except Crashed as e:
+                    # the rover stays where it was, blocking the position it occupies
+                    self._status = 'CRASHED'
+                    return False
+                except Blocked as e:
+                    self._status = 'BLOCKED'
+                    return False
+                last_known_position['x'] = current_position['x'] = new_position_x
+                last_known_position['y'] = current_position['y'] = new_position_y
+                if report:
+                    self._emit('on_move', new_position_x, new_position_y)
+            else:
+                last_known_position['facing'] = current_position['facing'] = CARDINAL_POINTS[(heading + ROTATIONS[instruction]) & 3]
+                if report:
+                    self._emit('on_rotate', current_position['facing'])
+        return True
+
+
+    def _execute_run(self, count):
+        '''
+        Executes a run of count M instructions, validated by the destination in a single call.
+        Returns False if the rover is no longer alive.
+        '''
+        heading = HEADINGS[self._current_position['facing']]
+        delta_x, delta_y = DELTA_X[heading], DELTA_Y[heading]
+        failed = self._destination.move_run(self._id, delta_x, delta_y, count)
+        moved = count if failed == MOVE_OK else failed
+        new_position_x, new_position_y = self._current_position['x'] + delta_x * moved, self._current_position['y'] + delta_y * moved
+        self._last_known_position['x'], self._last_known_position['y'] = new_position_x, new_position_y
+        self._current_position['x'], self._current_position['y'] = new_position_x, new_position_y
+        if failed != MOVE_OK:
+            if self._id in self._destination._plateau:
+                # the rover stays where it was, blocking the position it occupies
+                self._status = 'BLOCKED' if self._destination.blocked(new_position_x + delta_x, new_position_y + delta_y) else 'CRASHED'
+            else:
+                self._status = 'LOST'
+                self._current_position = None
+            return False
+        return True
+
+
+    def _observe(self):
+        '''
+        Asks the subscribers whether they observe the rover, only once since they may decide as
+        they go, and returns the callbacks observing it, or None if nobody does.
+        '''
+        if not self._observed:
+            self._observed = True
+            if self._events:
+                self._listeners = self._events.listeners(self)
+        return self._listeners
+
+
+    def _complete(self):
+        '''
+        Tells the subscribers that the rover is done with its instructions, and why, and records it
+        into the heatmaps.
+        '''
+        if self._heatmaps is not None:
+            self._heatmaps.record(self)
+        if self._listeners is not None:
+            if self._status in STATUS_EVENTS:
+                self._emit(STATUS_EVENTS[self._status])
+            self._emit('on_complete')
+
+
+    def _emit(self, event, *arguments):
+        '''
+        Tells the subscribers observing the rover about an event.
+        '''
+        for callback in self._listeners.get(event, ()):
+            callback(self, *arguments)
+
 
     def _calculate_new_position(self, squares=1, x=None, y=None, facing=None):
         '''
@@ -137,13 +346,13 @@ class Rover(object):
         if y is None:
             y = self._current_position['y']
 
-        if facing is 'N':
+        if facing == 'N':
             return x, y + squares
-        elif facing is 'E':
+        elif facing == 'E':
             return x + squares, y
-        elif facing is 'S':
+        elif facing == 'S':
             return x, y - squares
-        elif facing is 'W':
+        elif facing == 'W':
             return x - squares, y
         else:
             raise Exception('This should never happen.')
\ No newline at end of file
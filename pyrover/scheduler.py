@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module represent the simultaneous execution of the rovers of a mission. Instead of running
+each rover to completion before the next, time advances in ticks: all the rovers land at the first
+tick, then at each tick every active rover executes one instruction, in the order of the mission.
+
+Rovers interact through their destination only. When collisions are enforced, a rover moving onto
+a position another rover occupies at that moment of the tick crashes, through the same occupancy
+the destination keeps for a sequential mission, so that checking a move costs O(1) and a tick
+O(active rovers). Rovers that finished their instructions, were lost or crashed leave the active
+set in O(1), so that late ticks, when few rovers are still moving, stay cheap. Rovers that never
+interact finish exactly as they would in a sequential mission.
+
+Each active rover also counts down its instruction budget, if it has one, and a mission deadline
+is accounted for once per tick, as that many instructions as there are active rovers.
+'''
+
+
+class TickScheduler(object):
+    '''
+    This class represents the scheduler moving the rovers of a mission simultaneously.
+    '''
+    def __init__(self, rovers):
+        '''
+        Initializes a TickScheduler over the given rovers, which must not have been sent yet.
+        '''
+        self._active = {}
+        self._rovers = list(rovers)
+        self._tick = 0
+
+    def __len__(self):
+        '''
+        Returns the number of rovers still executing their instructions.
+        '''
+        return len(self._active)
+
+    @property
+    def tick(self):
+        '''
+        Returns the number of ticks elapsed so far.
+        '''
+        return self._tick
+
+    def land(self):
+        '''
+        Sends every rover to its destination, as the first tick. Rovers that safely landed become
+        active.
+        '''
+        for rover in self._rovers:
+            rover.send()
+            if rover._status != 'ALIVE':
+                rover.execute_instructions()
+                continue
+            instructions = rover._instructions
+            if not isinstance(instructions, str):
+                instructions = instructions.instructions(rover)
+            listeners = rover._listeners
+            stepwise = listeners is not None and ('on_move' in listeners or 'on_rotate' in listeners)
+            self._active[rover._id] = (rover, iter(instructions), stepwise, rover._budget)
+        self._tick = 1
+
+    def step(self):
+        '''
+        Executes one tick: every active rover executes its next instruction. Returns the number of
+        rovers still active.
+        '''
+        done = []
+        for rover_id, (rover, instructions, stepwise, budget) in list(self._active.items()):
+            instruction = next(instructions, None)
+            if instruction is not None and budget == 0:
+                # the rover still had instructions to execute once it spent its budget
+                rover._status = 'EXHAUSTED'
+            elif instruction is not None and rover._execute_steps(instruction, stepwise):
+                if budget is not None:
+                    self._active[rover_id] = (rover, instructions, stepwise, budget - 1)
+                continue
+            done.append(rover_id)
+            rover._complete()
+        for rover_id in done:
+            del self._active[rover_id]
+        self._tick += 1
+        return len(self._active)
+
+    def run(self, max_ticks=None, deadline=None):
+        '''
+        Lands the rovers, then executes ticks until every rover is done, max_ticks ticks have
+        elapsed, or the given Deadline expired, in which case the rovers still active stop with the
+        TIMED_OUT status. Rovers still active after max_ticks ticks stop where they are, still
+        ALIVE. Either way, every rover is done once the scheduler returns. Returns the number of
+        ticks elapsed.
+        '''
+        if max_ticks is not None and (not isinstance(max_ticks, int) or max_ticks < 1):
+            raise ValueError("A mission must be given at least one tick, not %s." % (max_ticks))
+        if self._tick == 0:
+            self.land()
+        while self._active and (max_ticks is None or self._tick < max_ticks):
+            if deadline is not None and deadline.spend(len(self._active)):
+                for rover, _, _, _ in self._active.values():
+                    rover._status = 'TIMED_OUT'
+                    rover._complete()
+                self._active.clear()
+                break
+            self.step()
+        for rover, _, _, _ in self._active.values():
+            rover._complete()
+        self._active.clear()
+        return self._tick
@@ -0,0 +1,483 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module represent a long-running mission server. Starting a Python process for each mission
+costs far more than the simulation itself, so the server keeps a pool of warm worker processes
+and runs the mission's blueprints it receives over a local TCP or Unix socket.
+
+The protocol is line based: each request and each response is a JSON object on its own line.
+
+    {"id": 1, "op": "run", "blueprints": "5 5\\n1 2 N\\nLMLMLMLMM\\n"}
+    {"id": 1, "status": "OK", "outcome": "1 3 N\\n", "rovers": [["ALIVE", 1, 3, "N"]]}
+
+    {"id": 2, "op": "batch", "blueprints": "5 5\n1 2 N\nLMLMLMLMM\n3 3 E\nMMMMM\n"}
+    {"id": 2, "status": "OK", "rovers": [["ALIVE", 1, 3, "N"], ["LOST", 5, 3, "E"]]}
+
+    {"id": 3, "op": "stats"}
+    {"id": 3, "status": "OK", "stats": {"completed": 1, ...}}
+
+A batch is a mission like any other, but its response only holds the result of each rover, lost
+ones included along with their last known position, so that a coordinator can apply it to its own
+rovers: see pyrover.cluster.
+
+A response status is one of OK, ERROR, BUSY (the queue is full and the request was rejected) or
+TIMEOUT (the worker did not complete the mission in time and was replaced). A request whose worker
+died is answered with an ERROR status and the WORKER_DIED error, the worker being replaced too.
+'''
+
+import json
+import queue
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+from itertools import count
+from multiprocessing import Pipe, Process
+
+
+# the error of a request whose worker died while running it
+WORKER_DIED = "The worker running the mission died."
+
+
+def run_blueprints(blueprints):
+    '''
+    Runs a whole mission out of its blueprints, given as a string, and returns its outcome along
+    with the final state of each rover, in the same order they appear in the blueprints.
+    '''
+    from io import StringIO
+    from pyrover.mission import Mission
+
+    handle_mission = Mission(StringIO(blueprints))
+    handle_mission.setup()
+    handle_mission.start()
+    rovers = []
+    for rover in handle_mission._rovers:
+        position = rover._current_position or {'x' : None, 'y' : None, 'facing' : None}
+        rovers.append([rover._status, position['x'], position['y'], position['facing']])
+    return handle_mission.outcome, rovers
+
+
+def run_batch(blueprints):
+    '''
+    Runs a batch of rovers, given as the blueprints of a mission, and returns the result of each
+    rover as a [status, x, y, facing] list, in the same order they appear in the blueprints. The
+    co-ordinates of a lost rover are its last known position.
+    '''
+    from io import StringIO
+    from pyrover.cache import result_of
+    from pyrover.mission import Mission
+
+    handle_mission = Mission(StringIO(blueprints))
+    handle_mission.setup()
+    handle_mission.start()
+    return [list(result_of(rover)) for rover in handle_mission._rovers]
+
+
+def _worker_main(conn):
+    '''
+    Main loop of a worker process. The mission modules are imported once, when the worker is
+    forked, so that each request only pays for the simulation itself.
+    '''
+    import pyrover.mission
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if job is None:
+            break
+        op, blueprints = job
+        try:
+            if op == 'batch':
+                conn.send(('OK', None, run_batch(blueprints)))
+            else:
+                outcome, rovers = run_blueprints(blueprints)
+                conn.send(('OK', outcome, rovers))
+        except Exception as e:
+            conn.send(('ERROR', "%s: %s" % (type(e).__name__, e), None))
+
+
+class _Job(object):
+    '''
+    This class represents a request waiting for, or being processed by, a worker.
+    '''
+    __slots__ = ('request_id', 'op', 'blueprints', 'submitted', 'done', 'response')
+
+    def __init__(self, request_id, op, blueprints):
+        self.request_id = request_id
+        self.op = op
+        self.blueprints = blueprints
+        self.submitted = time.monotonic()
+        self.done = threading.Event()
+        self.response = None
+
+
+class _Worker(object):
+    '''
+    This class represents a warm worker process, along with the thread that feeds it jobs taken
+    from the server's queue. A worker that exceeds the timeout, or dies, is replaced by a fresh one.
+    '''
+    def __init__(self, server):
+        self._server = server
+        self._conn = None
+        self._process = None
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def _spawn(self):
+        '''
+        Forks a new worker process.
+        '''
+        parent_conn, child_conn = Pipe()
+        self._process = Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+
+    def _kill(self):
+        '''
+        Terminates the current worker process, if any.
+        '''
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._conn.close()
+            self._process = None
+
+    def start(self):
+        self._spawn()
+        self._thread.start()
+
+    def stop(self):
+        self._thread.join()
+        if self._process is not None:
+            try:
+                self._conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self._process.join(1)
+            self._kill()
+
+    def _loop(self):
+        '''
+        Takes jobs from the queue until the server shuts down.
+        '''
+        while True:
+            job = self._server._queue.get()
+            if job is None:
+                break
+            response = {'id' : job.request_id}
+            try:
+                self._conn.send((job.op, job.blueprints))
+                if self._conn.poll(self._server._timeout):
+                    status, outcome, rovers = self._conn.recv()
+                    response['status'] = status
+                    if status == 'OK' and job.op == 'batch':
+                        response['rovers'] = rovers
+                    elif status == 'OK':
+                        response['outcome'], response['rovers'] = outcome, rovers
+                    else:
+                        response['error'] = outcome
+                else:
+                    self._kill()
+                    self._spawn()
+                    response['status'] = 'TIMEOUT'
+                    response['error'] = "The mission did not complete within %s seconds." % (self._server._timeout)
+            except (EOFError, BrokenPipeError, OSError):
+                self._kill()
+                self._spawn()
+                response['status'] = 'ERROR'
+                response['error'] = WORKER_DIED
+            self._server._finish(job, response)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    '''
+    Handles a client connection, reading one JSON request per line and answering each in turn.
+    '''
+    def handle(self):
+        for line in self.rfile:
+            line = line.strip()
+            if not line:
+                continue
+            response = self.server.mission_server._dispatch(line)
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+if hasattr(socketserver, 'ThreadingUnixStreamServer'):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+else:
+    _UnixServer = None
+
+
+class MissionServer(object):
+    '''
+    This class represents a mission server and its properties.
+    '''
+    def __init__(self, address, workers=2, queue_size=64, timeout=10.0, latency_window=1024):
+        '''
+        Initializes a MissionServer. The address is either a (host, port) tuple, to listen on TCP,
+        or a string, the path of the Unix socket to listen on. A port of 0 picks a free port, which
+        is then available through the address property once the server is started.
+
+        At most queue_size requests wait for a worker: requests received when the queue is full
+        are rejected with a BUSY status. Each mission is given timeout seconds to complete once a
+        worker picks it up.
+        '''
+        if not isinstance(workers, int) or workers < 1:
+            raise ValueError("A MissionServer requires at least one worker, not %s." % (workers))
+        if not isinstance(queue_size, int) or queue_size < 1:
+            raise ValueError("The queue of a MissionServer must hold at least one request, not %s." % (queue_size))
+        if timeout is None or timeout <= 0:
+            raise ValueError("The timeout of a MissionServer must be a positive number, not %s." % (timeout))
+        if isinstance(address, str) and _UnixServer is None:
+            raise ValueError("Unix sockets are not available on this platform.")
+
+        self._address = address
+        self._latencies = deque(maxlen=latency_window)
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._request_ids = count(1)
+        self._server = None
+        self._started = None
+        self._stopping = False
+        self._stats = {'received' : 0, 'completed' : 0, 'failed' : 0, 'rejected' : 0, 'timed_out' : 0}
+        self._thread = None
+        self._timeout = timeout
+        self._workers = [_Worker(self) for _ in range(workers)]
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def address(self):
+        '''
+        Returns the address the server is listening on.
+        '''
+        if self._server is None:
+            return self._address
+        return self._server.server_address
+
+    def start(self):
+        '''
+        Forks the workers and starts listening in a background thread.
+        '''
+        for worker in self._workers:
+            worker.start()
+        if isinstance(self._address, str):
+            self._server = _UnixServer(self._address, _RequestHandler)
+        else:
+            self._server = _TCPServer(tuple(self._address), _RequestHandler)
+        self._server.mission_server = self
+        self._started = time.monotonic()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def serve_forever(self):
+        '''
+        Starts the server and blocks until it is interrupted.
+        '''
+        self.start()
+        try:
+            while self._thread.is_alive():
+                self._thread.join(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        '''
+        Stops listening, lets the workers complete the requests they are running and shuts them
+        down. Requests still waiting in the queue, and those received afterwards on connections
+        that are still open, are rejected.
+        '''
+        # no job is queued once the flag is set, so that draining the queue leaves none behind
+        with self._lock:
+            self._stopping = True
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            if isinstance(self._address, str):
+                from os import unlink
+                try:
+                    unlink(self._address)
+                except OSError:
+                    pass
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                self._finish(job, {'id' : job.request_id, 'status' : 'BUSY', 'error' : "The server is shutting down."})
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.stop()
+
+    @property
+    def stats(self):
+        '''
+        Returns the throughput and latency statistics of the server. Latencies are measured from
+        the moment a request is received to the moment its response is ready, over the most
+        recent requests, and are expressed in milliseconds.
+        '''
+        with self._lock:
+            stats = dict(self._stats)
+            latencies = sorted(self._latencies)
+        uptime = time.monotonic() - self._started if self._started is not None else 0.0
+        stats['queued'] = self._queue.qsize()
+        stats['uptime'] = uptime
+        stats['throughput'] = stats['completed'] / uptime if uptime > 0 else 0.0
+        for name, quantile in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+            if latencies:
+                stats['latency_%s' % (name)] = latencies[min(len(latencies) - 1, int(quantile * len(latencies)))] * 1000
+            else:
+                stats['latency_%s' % (name)] = None
+        return stats
+
+    def _dispatch(self, line):
+        '''
+        Decodes a request and returns its response, once available.
+        '''
+        try:
+            request = json.loads(line.decode('utf-8'))
+            if not isinstance(request, dict):
+                raise ValueError("A request must be a JSON object.")
+        except ValueError as e:
+            return {'id' : None, 'status' : 'ERROR', 'error' : "Malformed request: %s" % (e)}
+
+        request_id = request.get('id')
+        if request_id is None:
+            request_id = next(self._request_ids)
+        op = request.get('op', 'run')
+
+        if op == 'stats':
+            return {'id' : request_id, 'status' : 'OK', 'stats' : self.stats}
+        if op not in ('run', 'batch') or not isinstance(request.get('blueprints'), str):
+            return {'id' : request_id, 'status' : 'ERROR', 'error' : "A request must either be a stats request or carry blueprints."}
+
+        job = _Job(request_id, op, request['blueprints'])
+        with self._lock:
+            self._stats['received'] += 1
+            if self._stopping:
+                self._stats['rejected'] += 1
+                return {'id' : request_id, 'status' : 'BUSY', 'error' : "The server is shutting down."}
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self._stats['rejected'] += 1
+                return {'id' : request_id, 'status' : 'BUSY', 'error' : "The server is busy, try again later."}
+        job.done.wait()
+        return job.response
+
+    def _finish(self, job, response):
+        '''
+        Records the outcome of a job and wakes up the connection waiting for it.
+        '''
+        with self._lock:
+            status = response['status']
+            if status == 'OK':
+                self._stats['completed'] += 1
+                self._latencies.append(time.monotonic() - job.submitted)
+            elif status == 'TIMEOUT':
+                self._stats['timed_out'] += 1
+            elif status == 'BUSY':
+                self._stats['rejected'] += 1
+            else:
+                self._stats['failed'] += 1
+        job.response = response
+        job.done.set()
+
+
+class MissionClient(object):
+    '''
+    This class represents a client of a MissionServer.
+    '''
+    def __init__(self, address, timeout=None):
+        '''
+        Connects to the MissionServer listening at the given address.
+        '''
+        if isinstance(address, str):
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(address if isinstance(address, str) else tuple(address))
+        self._file = self._socket.makefile('rwb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+    def request(self, request):
+        '''
+        Sends a request to the server and returns its response.
+        '''
+        self._file.write(json.dumps(request).encode('utf-8') + b'\n')
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("The mission server closed the connection.")
+        return json.loads(line.decode('utf-8'))
+
+    def run(self, blueprints, request_id=None):
+        '''
+        Runs the mission described by the given blueprints and returns the server's response.
+        '''
+        return self.request({'id' : request_id, 'op' : 'run', 'blueprints' : blueprints})
+
+    def batch(self, blueprints, request_id=None):
+        '''
+        Runs a batch of rovers, given as the blueprints of a mission, and returns the server's
+        response, holding the result of each rover.
+        '''
+        return self.request({'id' : request_id, 'op' : 'batch', 'blueprints' : blueprints})
+
+    def stats(self):
+        '''
+        Returns the statistics of the server.
+        '''
+        return self.request({'op' : 'stats'})['stats']
+
+
+def main(argv=None):
+    '''
+    Runs a MissionServer from the command line.
+    '''
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(prog='python -m pyrover.server', description="Runs a pyrover mission server.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', default=None, help="listen on this Unix socket instead of TCP")
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--queue-size', type=int, default=64)
+    parser.add_argument('--timeout', type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    address = args.unix if args.unix is not None else (args.host, args.port)
+    MissionServer(address, workers=args.workers, queue_size=args.queue_size, timeout=args.timeout).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
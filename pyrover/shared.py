@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module represent a Mars whose plateau lives in shared memory, so that objects moving over it
+from several processes see each others without any state being pickled and shipped around.
+
+The plateau is a single multiprocessing.shared_memory segment with a fixed layout:
+
+ - A header of int64 values: a magic number, the width and the height of the plateau, the number
+   of slots of the position table, the next free slot and whether coverage is tracked.
+ - An occupancy grid of int32 values, one per cell in row-major order, holding 0 for a free cell
+   or the slot of the object occupying it plus one.
+ - A position table of int32 triples, one per slot: the x and y co-ordinates of the object and its
+   state, 0 if the slot is unused, 1 if the object is on the plateau, 2 if it left it.
+ - If coverage is tracked, a byte per cell, set to 1 once the cell has been visited.
+
+Each cell is guarded by one of a small array of locks (lock striping), so that checking that a cell
+is free and occupying it is atomic across processes, while objects moving on distant cells rarely
+contend. Since no two objects can share a cell of the grid, collisions are always enforced.
+
+The process creating the plateau owns the segment: it is unlinked when the owner closes it, when
+the owner is garbage collected, or, should the owner crash, by the multiprocessing resource tracker
+once the processes sharing it are gone. Worker processes attach to it by name, through the handle
+of the plateau, which must be given to them when they are started, since the locks it holds can
+only be inherited.
+'''
+
+from multiprocessing import Lock
+from multiprocessing.shared_memory import SharedMemory
+from weakref import finalize
+
+from pyrover.coverage import Coverage
+from pyrover.mars import Crashed, Mars, MOVE_OK, OutOfBounds
+
+
+MAGIC = 0x50595256
+HEADER_FIELDS = 6
+FREE, ON_PLATEAU, GONE = 0, 1, 2
+
+
+def _release(segment, views, unlink):
+    '''
+    Releases the views over a segment, closes it and, if requested, unlinks it.
+    '''
+    for view in views:
+        view.release()
+    segment.close()
+    if unlink:
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedOccupancy(object):
+    '''
+    This class represents a read-only view of the occupancy grid, mapping each occupied (x, y)
+    position to the slot of the object occupying it, as the occupancy of a Mars does.
+    '''
+    def __init__(self, grid, width, height):
+        self._grid = grid
+        self._height = height
+        self._width = width
+
+    def __bool__(self):
+        return True
+
+    def __contains__(self, position):
+        x, y = position
+        return 0 <= x < self._width and 0 <= y < self._height and self._grid[y * self._width + x] != 0
+
+    def __getitem__(self, position):
+        occupant = self.get(position)
+        if occupant is None:
+            raise KeyError(position)
+        return occupant
+
+    def __iter__(self):
+        grid, width = self._grid, self._width
+        for index in range(self._width * self._height):
+            if grid[index]:
+                yield index % width, index // width
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def get(self, position, default=None):
+        x, y = position
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            return default
+        slot = self._grid[y * self._width + x]
+        return "slot_%s" % (slot - 1) if slot else default
+
+    def keys(self):
+        return iter(self)
+
+
+class SharedCoverage(Coverage):
+    '''
+    This class represents a coverage held in shared memory, as one byte per cell. Writing a single
+    byte is atomic, so that processes can cover cells without locking.
+    '''
+    def __init__(self, cells, width, height):
+        super(SharedCoverage, self).__init__(width, height)
+        self._cells = cells
+
+    def __len__(self):
+        return bytes(self._cells).count(1)
+
+    def add(self, x, y):
+        self._cells[y * self._width + x] = 1
+
+    def add_interval(self, y, x_min, x_max):
+        start = y * self._width
+        self._cells[start + x_min:start + x_max + 1] = b'\x01' * (x_max - x_min + 1)
+
+    def covered_in_row(self, y, x_min, x_max):
+        start = y * self._width
+        return bytes(self._cells[start + x_min:start + x_max + 1]).count(1)
+
+    def intervals(self):
+        for y in range(self._height):
+            row = bytes(self._cells[y * self._width:(y + 1) * self._width])
+            x = row.find(1)
+            while x != -1:
+                end = row.find(0, x)
+                end = self._width if end == -1 else end
+                yield y, x, end - 1
+                x = row.find(1, end)
+
+
+class SharedMars(Mars):
+    '''
+    This class represent planet Mars, with its plateau in shared memory.
+    '''
+    def __init__(self, planet_width, planet_height, slots=1024, stripes=64, coverage=False):
+        '''
+        Creates a plateau in shared memory, able to track up to slots objects, with stripes locks
+        guarding its cells.
+        '''
+        super(SharedMars, self).__init__(planet_width, planet_height)
+        if not isinstance(slots, int) or slots < 1:
+            raise ValueError("A shared plateau requires at least one slot, not %s." % (slots))
+        if not isinstance(stripes, int) or stripes < 1:
+            raise ValueError("A shared plateau requires at least one lock, not %s." % (stripes))
+
+        cells = self._width * self._height
+        size = HEADER_FIELDS * 8 + cells * 4 + slots * 12 + (cells if coverage else 0)
+        segment = SharedMemory(create=True, size=size)
+        header = segment.buf[:HEADER_FIELDS * 8].cast('q')
+        header[0], header[1], header[2], header[3], header[4], header[5] = MAGIC, self._width, self._height, slots, 0, int(coverage)
+        header.release()
+        self._setup(segment, [Lock() for _ in range(stripes)], Lock(), owner=True)
+
+    @classmethod
+    def attach(cls, handle):
+        '''
+        Attaches to the plateau described by the given handle, as returned by the handle property
+        of the plateau that created it.
+        '''
+        name, locks, allocation_lock = handle
+        try:
+            segment = SharedMemory(name=name, track=False)
+        except TypeError:
+            # before Python 3.13, attaching registers the segment with the resource tracker the
+            # process shares with the owner, which is harmless since the owner unlinks it anyway
+            segment = SharedMemory(name=name)
+
+        header = segment.buf[:HEADER_FIELDS * 8].cast('q')
+        magic, width, height = header[0], header[1], header[2]
+        header.release()
+        if magic != MAGIC:
+            segment.close()
+            raise ValueError("The shared memory segment %s does not hold a plateau." % (name))
+
+        shared_mars = cls.__new__(cls)
+        Mars.__init__(shared_mars, width - 1, height - 1)
+        shared_mars._setup(segment, locks, allocation_lock, owner=False)
+        return shared_mars
+
+    def _setup(self, segment, locks, allocation_lock, owner):
+        '''
+        Maps the views over the segment and registers its cleanup.
+        '''
+        cells = self._width * self._height
+        self._allocation_lock = allocation_lock
+        self._locks = locks
+        self._segment = segment
+        self._slots = {}
+
+        self._header = segment.buf[:HEADER_FIELDS * 8].cast('q')
+        offset = HEADER_FIELDS * 8
+        self._grid = segment.buf[offset:offset + cells * 4].cast('i')
+        offset += cells * 4
+        self._table = segment.buf[offset:offset + self._header[3] * 12].cast('i')
+        offset += self._header[3] * 12
+        views = [self._header, self._grid, self._table]
+        if self._header[5]:
+            cells_view = segment.buf[offset:offset + cells]
+            views.append(cells_view)
+            self._coverage = SharedCoverage(cells_view, self._width, self._height)
+
+        self._occupancy = SharedOccupancy(self._grid, self._width, self._height)
+        self._finalizer = finalize(self, _release, segment, views, owner)
+
+    def close(self):
+        '''
+        Detaches from the plateau. If this process created it, the plateau is also destroyed.
+        '''
+        self._occupancy = None
+        self._coverage = None
+        self._finalizer()
+
+    @property
+    def handle(self):
+        '''
+        Returns the handle worker processes attach to the plateau with. It can only be given to a
+        process as it is started.
+        '''
+        return self._segment.name, self._locks, self._allocation_lock
+
+    @property
+    def name(self):
+        '''
+        Returns the name of the shared memory segment holding the plateau.
+        '''
+        return self._segment.name
+
+    def positions(self):
+        '''
+        Returns the position of every object on the plateau, whichever process moved it, as a
+        dictionary mapping slots to (x, y) co-ordinates.
+        '''
+        table = self._table
+        return dict((slot, (table[slot * 3], table[slot * 3 + 1])) for slot in range(self._header[4]) if table[slot * 3 + 2] == ON_PLATEAU)
+
+    def _slot(self, object_id):
+        '''
+        Returns the slot of the position table assigned to the given object, assigning it one if
+        it has none yet.
+        '''
+        slot = self._slots.get(object_id)
+        if slot is None:
+            with self._allocation_lock:
+                slot = self._header[4]
+                if slot >= self._header[3]:
+                    raise ValueError("The position table of the plateau is full, it has %s slots." % (self._header[3]))
+                self._header[4] = slot + 1
+            self._slots[object_id] = slot
+        return slot
+
+    def _stripes(self, *indexes):
+        '''
+        Returns the locks guarding the given cells, in a consistent order so that processes
+        acquiring several of them never deadlock.
+        '''
+        return [self._locks[stripe] for stripe in sorted(set(index % len(self._locks) for index in indexes))]
+
+    def update_plateau(self, object_id, object_new_x, object_new_y):
+        '''
+        Validates and updates the new position of an object currently moving on the planet,
+        atomically with respect to the other processes sharing the plateau.
+        '''
+        if not isinstance(object_new_x, int) or not isinstance(object_new_y, int):
+            raise ValueError("The new position of an object must be represented by two integers, not %s and %s." % (object_new_x, object_new_y))
+        self._move(object_id, object_new_x, object_new_y, check=True)
+
+    def move_path(self, object_id, path, raise_errors=False):
+        '''
+        Moves an object along a whole path, as Mars.move_path does. Other processes may move their
+        objects in the meanwhile, so each step is validated and committed atomically on its own.
+        '''
+        for index, (x, y) in enumerate(path):
+            try:
+                self._move(object_id, x, y, check=True)
+            except (Crashed, OutOfBounds):
+                if raise_errors:
+                    raise
+                return index
+        return MOVE_OK
+
+    def move_run(self, object_id, delta_x, delta_y, steps, raise_errors=False):
+        x, y = self._plateau[object_id]
+        return self.move_path(object_id, [(x + delta_x * step, y + delta_y * step) for step in range(1, steps + 1)], raise_errors)
+
+    def _place(self, object_id, object_x, object_y):
+        self._move(object_id, object_x, object_y, check=False)
+
+    def _move(self, object_id, new_x, new_y, check):
+        '''
+        Moves an object to a new position, raising OutOfBounds if it lies out of the plateau and,
+        if check is True, Crashed if it is occupied by another object. Objects are only assigned a
+        slot once they are placed, so that those never making it to the plateau take up none.
+        '''
+        slot = self._slots.get(object_id)
+        table, grid, width = self._table, self._grid, self._width
+        on_plateau = slot is not None and table[slot * 3 + 2] == ON_PLATEAU
+        old_index = table[slot * 3 + 1] * width + table[slot * 3] if on_plateau else None
+
+        if new_x >= width or new_y >= self._height or new_x < 0 or new_y < 0:
+            if not on_plateau:
+                raise OutOfBounds("%s never made it to %s!" % (object_id, self._name))
+            locks = self._stripes(old_index)
+            for lock in locks:
+                lock.acquire()
+            try:
+                grid[old_index] = 0
+                table[slot * 3 + 2] = GONE
+            finally:
+                for lock in reversed(locks):
+                    lock.release()
+            self._plateau.pop(object_id, None)
+            raise OutOfBounds("%s was lost on %s moving towards %s, %s!" % (object_id, self._name, new_x, new_y))
+
+        new_index = new_y * width + new_x
+        locks = self._stripes(new_index) if old_index is None else self._stripes(old_index, new_index)
+        for lock in locks:
+            lock.acquire()
+        try:
+            occupant = grid[new_index]
+            if check and occupant and (slot is None or occupant != slot + 1):
+                raise Crashed("%s crashed into slot_%s on %s at %s, %s!" % (object_id, occupant - 1, self._name, new_x, new_y))
+            if slot is None:
+                slot = self._slot(object_id)
+            if old_index is not None and old_index != new_index:
+                grid[old_index] = 0
+            grid[new_index] = slot + 1
+            table[slot * 3], table[slot * 3 + 1], table[slot * 3 + 2] = new_x, new_y, ON_PLATEAU
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+        self._plateau[object_id] = (new_x, new_y)
+        if self._coverage is not None:
+            self._coverage.add(new_x, new_y)
+
+    def _shadow(self):
+        '''
+        Returns a private, in-process copy of the plateau.
+        '''
+        shadow = Mars(self._width - 1, self._height - 1, collisions=True)
+        shadow._occupancy = dict((position, self._occupancy.get(position)) for position in self._occupancy)
+        shadow._plateau = dict(self._plateau)
+        return shadow
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module represent the solver of the safe landing zones of a program, that is the landing cells
+and headings from which a rover executing the program is never lost.
+
+A rover is lost as soon as it leaves the plateau, so that it is safe if and only if every position
+it visits lies within the plateau. Relative to its landing cell, those positions only depend on the
+program and on the heading it lands with, and a rover landing facing E visits those a rover landing
+facing N does, rotated clockwise. The bounding box of the path is therefore computed once, in a
+single pass over the program, and the safe landing cells for each heading are the rectangle of the
+plateau the rotated bounding box fits in from, whatever the size of the plateau.
+
+Rectangles are expressed as (x_min, y_min, x_max, y_max) tuples, with both corners included. The
+plateau is considered empty: cells blocked by the terrain and other objects do not lose rovers.
+'''
+
+from itertools import groupby
+
+from pyrover.kernel import CARDINAL_POINTS, DELTA_X, DELTA_Y, ROTATIONS
+
+
+def path_bounds(instructions):
+    '''
+    Returns the (min_dx, min_dy, max_dx, max_dy) bounding box of the positions visited by a rover
+    landing at 0, 0 facing N and executing the given instructions on a boundless plateau.
+    '''
+    if not isinstance(instructions, str):
+        raise TypeError("The instructions to solve for are expected as a string, not %s." % (type(instructions)))
+    if not set(instructions) <= {'L', 'M', 'R'}:
+        raise ValueError("The instructions to solve for can contain only the following values: L, M, R")
+
+    x = y = min_x = min_y = max_x = max_y = heading = 0
+    # a run of moves only extends the bounding box by its last position
+    for instruction, run in groupby(instructions):
+        count = sum(1 for _ in run)
+        if instruction == 'M':
+            x += DELTA_X[heading] * count
+            y += DELTA_Y[heading] * count
+            min_x, max_x = min(min_x, x), max(max_x, x)
+            min_y, max_y = min(min_y, y), max(max_y, y)
+        else:
+            heading = (heading + ROTATIONS[instruction] * count) & 3
+    return min_x, min_y, max_x, max_y
+
+
+def safe_landing_zones(width, height, instructions):
+    '''
+    Returns a dictionary mapping each cardinal point to the rectangle of the landing cells from
+    which a rover facing it, executing the given instructions on a plateau of the given width and
+    height (as stored by Mars), is never lost, or to None if there is no such cell.
+    '''
+    min_dx, min_dy, max_dx, max_dy = path_bounds(instructions)
+    # the bounding box of the path of a rover landing facing N, E, S and W, each a clockwise
+    # rotation of the previous one
+    bounds = (
+                (min_dx, min_dy, max_dx, max_dy),
+                (min_dy, -max_dx, max_dy, -min_dx),
+                (-max_dx, -max_dy, -min_dx, -min_dy),
+                (-max_dy, min_dx, -min_dy, max_dx),
+                )
+    zones = {}
+    for facing, (low_x, low_y, high_x, high_y) in zip(CARDINAL_POINTS, bounds):
+        zone = (-low_x, -low_y, width - 1 - high_x, height - 1 - high_y)
+        zones[facing] = zone if zone[0] <= zone[2] and zone[1] <= zone[3] else None
+    return zones
+
+
+def safe_landing_mask(width, height, instructions):
+    '''
+    Returns the safe landing zones of the given instructions as a NumPy array of booleans, indexed
+    by [heading, y, x], headings being in the N, E, S, W order. NumPy must then be installed, and
+    the array holds one cell per landing cell and heading.
+    '''
+    import numpy
+
+    zones = safe_landing_zones(width, height, instructions)
+    mask = numpy.zeros((4, height, width), dtype=bool)
+    for heading, facing in enumerate(CARDINAL_POINTS):
+        zone = zones[facing]
+        if zone is not None:
+            x_min, y_min, x_max, y_max = zone
+            mask[heading, y_min:y_max + 1, x_min:x_max + 1] = True
+    return mask
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module represent the static terrain of a plateau, that is the cells no object can move onto,
+such as rocks and craters. Two representations are available, sharing the same interface, and
+both tell in O(1) whether a cell is blocked:
+
+ - A packed bitmap, with one bit per cell in row-major order, for large or densely blocked
+   plateaus. The file is memory-mapped rather than read, so that a multi-gigabyte map costs no
+   more memory than the pages of it actually visited.
+ - A sparse list of the blocked cells, one "x y" line each, for plateaus with few obstacles. The
+   file is read one line at a time, but every blocked cell is kept in memory, at the cost of a
+   tuple in a set each: a list of millions of cells should be written as a bitmap instead.
+
+A bitmap file starts with a header made of a magic string and the width and the height of the
+plateau, as stored by Mars, that is one more than the upper-right co-ordinates, as unsigned 64-bit
+little-endian integers. Any other file is read as a sparse list.
+'''
+
+from struct import Struct
+
+
+MAGIC = b'PYRVTERR'
+HEADER = Struct('<8sQQ')
+
+
+def load_terrain(path):
+    '''
+    Returns the terrain held by the file at the given path, as a BitmapTerrain if the file starts
+    with the bitmap header, as a SparseTerrain otherwise.
+    '''
+    with open(path, 'rb') as f:
+        magic = f.read(len(MAGIC))
+    if magic == MAGIC:
+        return BitmapTerrain(path)
+    return SparseTerrain(path)
+
+
+def write_bitmap(path, width, height, cells):
+    '''
+    Writes a bitmap file for a plateau of the given width and height, as stored by Mars, blocking
+    the given (x, y) cells. The file is extended rather than written in full, so that the pages
+    holding no blocked cell are never written either.
+    '''
+    from mmap import mmap
+
+    if not isinstance(width, int) or not isinstance(height, int) or width < 1 or height < 1:
+        raise ValueError("The dimensions of a terrain must be both positive integers, not %s and %s." % (width, height))
+    with open(path, 'wb+') as f:
+        f.write(HEADER.pack(MAGIC, width, height))
+        f.truncate(HEADER.size + -(-width * height // 8))
+        with mmap(f.fileno(), 0) as data:
+            for x, y in cells:
+                if x < 0 or y < 0 or x >= width or y >= height:
+                    raise ValueError("The cell %s, %s lies out of a terrain of %s by %s cells." % (x, y, width, height))
+                cell = y * width + x
+                data[HEADER.size + (cell >> 3)] |= 1 << (cell & 7)
+
+
+class Terrain(object):
+    '''
+    This class represents the interface common to the representations of a terrain. The width and
+    the height are None if the terrain does not know the size of the plateau.
+    '''
+    width = None
+    height = None
+
+    def __contains__(self, position):
+        '''
+        Returns True if the (x, y) position is blocked.
+        '''
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        '''
+        Releases the resources held by the terrain.
+        '''
+        pass
+
+
+class BitmapTerrain(Terrain):
+    '''
+    This class represents a terrain held by a memory-mapped bitmap file.
+    '''
+    def __init__(self, path):
+        from mmap import mmap, ACCESS_READ
+
+        self._path = path
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+                raise ValueError("%s is not a terrain bitmap." % (path))
+            _, self.width, self.height = HEADER.unpack(header)
+            self._data = mmap(f.fileno(), 0, access=ACCESS_READ)
+        if len(self._data) < HEADER.size + -(-self.width * self.height // 8):
+            self._data.close()
+            raise ValueError("The terrain bitmap %s is truncated." % (path))
+
+    def __contains__(self, position):
+        x, y = position
+        if x < 0 or y < 0 or x >= self.width or y >= self.height:
+            return False
+        cell = y * self.width + x
+        return bool(self._data[HEADER.size + (cell >> 3)] >> (cell & 7) & 1)
+
+    def __reduce__(self):
+        # the map is opened again, rather than copied, by the processes it is given to
+        return BitmapTerrain, (self._path,)
+
+    def close(self):
+        self._data.close()
+
+
+class SparseTerrain(Terrain):
+    '''
+    This class represents a terrain held by a list of blocked cells.
+    '''
+    def __init__(self, path):
+        self._blocked = set()
+        with open(path) as f:
+            for number, line in enumerate(f, 1):
+                tokens = line.split()
+                if not tokens:
+                    continue
+                try:
+                    if len(tokens) != 2:
+                        raise ValueError
+                    self._blocked.add((int(tokens[0]), int(tokens[1])))
+                except ValueError:
+                    raise ValueError("Line %s of the terrain %s must hold the x and y co-ordinates of a blocked cell, not %r." % (number, path, line.rstrip('\n')))
+
+    def __contains__(self, position):
+        return position in self._blocked
+
+    def __len__(self):
+        '''
+        Returns the number of blocked cells.
+        '''
+        return len(self._blocked)
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module tests the correct behaviour of the heatmaps of a mission.
+'''
+
+from io import StringIO
+from pickle import dumps, loads
+from unittest import main, skipUnless, TestCase
+from unittest.mock import patch
+
+from pyrover.mission import Mission
+from pyrover.tests.helpers import generate_blueprints, run_mission
+
+try:
+    import numpy
+    from pyrover.analytics import Heatmaps
+except ImportError:
+    numpy = None
+
+
+@skipUnless(numpy, "NumPy is not installed.")
+class TestAnalytics(TestCase):
+    '''
+    Instantiates a TestAnalytics object.
+    '''
+    def aux_run(self, blueprints, start_kwargs=None, **kwargs):
+        '''
+        Auxiliary method that runs a mission keeping its heatmaps out of the given blueprints and
+        returns it.
+        '''
+        return run_mission(blueprints, start_kwargs, heatmaps=True, heatmap_bins=self.valid_bins, **kwargs)
+
+    def aux_expected(self, handle_mission):
+        '''
+        Auxiliary method that computes the heatmaps of a mission out of the final state of its
+        rovers, cell by cell.
+        '''
+        final_positions = numpy.zeros((self.valid_bins[1], self.valid_bins[0]), dtype=numpy.int64)
+        loss_sites = numpy.zeros_like(final_positions)
+        headings = numpy.zeros((2, 4), dtype=numpy.int64)
+        for rover in handle_mission._rovers:
+            lost = rover._status == 'LOST'
+            position = rover._last_known_position if lost else rover._current_position
+            if position is None:
+                continue
+            histogram = loss_sites if lost else final_positions
+            histogram[position['y'] * self.valid_bins[1] // 20, position['x'] * self.valid_bins[0] // 30] += 1
+            headings[int(lost), 'NESW'.index(position['facing'])] += 1
+        return final_positions.tolist(), loss_sites.tolist(), headings.tolist()
+
+    def aux_actual(self, handle_heatmaps):
+        '''
+        Auxiliary method that returns the histograms and headings of the given heatmaps as lists.
+        '''
+        return handle_heatmaps.final_positions.tolist(), handle_heatmaps.loss_sites.tolist(), handle_heatmaps.headings.tolist()
+
+    def setUp(self):
+        '''
+        Initializes whatever is common to all tests.
+        '''
+        self.valid_bins = (6, 4)
+        self.valid_blueprints = generate_blueprints(400, 29, 19, 40, 2468, margins=(1, 0))
+
+    def tearDown(self):
+        '''
+        Instructions to execute at the end of each test method.
+        '''
+        pass
+
+    def test_record_correct(self):
+        '''
+        Tests that the heatmaps of a mission match the final state of its rovers, lost ones
+        included, whatever the engine and the execution mode, and however often they are flushed,
+        rovers stopped after the last tick of a simultaneous mission included.
+        '''
+        handle_mission = self.aux_run(self.valid_blueprints)
+        expected = self.aux_expected(handle_mission)
+        self.assertIn('LOST', [rover._status for rover in handle_mission._rovers])
+        self.assertEqual(self.aux_actual(handle_mission.heatmaps), expected)
+        self.assertEqual(len(handle_mission.heatmaps), len(handle_mission.outcome.splitlines()) + sum(map(sum, expected[1])))
+        for engine in ('table', 'numpy'):
+            self.assertEqual(self.aux_actual(self.aux_run(self.valid_blueprints, engine=engine).heatmaps), expected)
+        for start_kwargs in ({'parallel' : True, 'workers' : 1}, {'threads' : 2}, {'simultaneous' : True}):
+            self.assertEqual(self.aux_actual(self.aux_run(self.valid_blueprints, start_kwargs).heatmaps), expected)
+        with patch('pyrover.analytics.FLUSH_EVERY', 7):
+            self.assertEqual(self.aux_actual(self.aux_run(self.valid_blueprints).heatmaps), expected)
+        handle_mission = self.aux_run(self.valid_blueprints, {'simultaneous' : True, 'max_ticks' : 5})
+        self.assertEqual(self.aux_actual(handle_mission.heatmaps), self.aux_expected(handle_mission))
+        self.assertIsNone(Mission(StringIO(self.valid_blueprints)).heatmaps)
+
+    def test_merge_correct(self):
+        '''
+        Tests that the heatmaps of the shards of a mission, even once pickled, merge into those of
+        the whole mission.
+        '''
+        lines = self.valid_blueprints.splitlines()
+        shards = [self.aux_run('\n'.join(lines[:1] + lines[1:401])), self.aux_run('\n'.join(lines[:1] + lines[401:]))]
+        handle_heatmaps = loads(dumps(shards[0].heatmaps))
+        handle_heatmaps.merge(shards[1].heatmaps)
+        self.assertEqual(self.aux_actual(handle_heatmaps), self.aux_actual(self.aux_run(self.valid_blueprints).heatmaps))
+
+    def test_merge_wrong_bins(self):
+        '''
+        Tests that a ValueError exception is raised if heatmaps of different resolutions are
+        merged, or if illegal bins are given.
+        '''
+        self.assertRaises(
+                            ValueError,
+                            Heatmaps(30, 20, (6, 4)).merge,
+                            *[Heatmaps(30, 20, (4, 6))]
+                            )
+        for illegal_bins in ((0, 4), (6,), (6, 4.0)):
+            self.assertRaises(
+                                ValueError,
+                                Heatmaps,
+                                *[30, 20, illegal_bins]
+                                )
+
+
+if __name__ == '__main__':
+        main()
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module tests the correct behaviour of the cache of the results of rovers.
+'''
+
+from os.path import join
+from tempfile import TemporaryDirectory
+from unittest import main, TestCase
+from unittest.mock import patch
+
+from pyrover.cache import ResultCache
+from pyrover.tests.helpers import final_states, generate_blueprints, occupied_positions, run_mission
+
+
+class TestCache(TestCase):
+    '''
+    Instantiates a TestCache object.
+    '''
+    def setUp(self):
+        '''
+        Initializes whatever is common to all tests.
+        '''
+        self.directory = TemporaryDirectory()
+        self.path = join(self.directory.name, 'results.sqlite')
+        self.blueprints = generate_blueprints(100, 10, 10, 25, 1234, instructions='LRM').splitlines()
+
+    def tearDown(self):
+        '''
+        Instructions to execute at the end of each test method.
+        '''
+        self.directory.cleanup()
+
+    def test_start_correct(self):
+        '''
+        Tests that a mission whose blueprints were edited executes only the edited rovers, and that
+        its outcome is the same as without a cache.
+        '''
+        with ResultCache(self.path) as handle_cache:
+            run_mission('\n'.join(self.blueprints), cache=handle_cache)
+            self.assertEqual(len(handle_cache), len(set(zip(self.blueprints[1::2], self.blueprints[2::2]))))
+
+        edited = list(self.blueprints)
+        edited[2] += 'M'
+        edited[4] = 'LL'
+        expected = run_mission('\n'.join(edited))
+        with ResultCache(self.path) as handle_cache:
+            handle_mission = run_mission('\n'.join(edited), cache=handle_cache)
+            self.assertEqual(handle_mission.outcome, expected.outcome)
+            self.assertEqual(final_states(handle_mission), final_states(expected))
+            self.assertEqual(occupied_positions(handle_mission), occupied_positions(expected))
+            self.assertEqual(handle_mission.cache_stats['misses'], 2)
+            self.assertEqual(handle_mission.cache_stats['hits'], 98)
+            self.assertEqual(handle_mission.cache_stats['hit_rate'], 0.98)
+        self.assertIsNone(expected.cache_stats)
+
+    def test_start_correct_bypassed(self):
+        '''
+        Tests that the cache is bypassed when collisions or coverage are enabled.
+        '''
+        for options in ({'collisions' : True}, {'coverage' : True}):
+            handle_mission = run_mission('\n'.join(self.blueprints), cache=self.path, **options)
+            self.assertEqual(handle_mission.cache_stats, {'hits' : 0, 'misses' : 0, 'hit_rate' : 0.0})
+            self.assertEqual(len(handle_mission._cache), 0)
+            handle_mission._cache.close()
+
+    def test_put_correct_eviction(self):
+        '''
+        Tests that the least recently used entries are evicted once the cache is full.
+        '''
+        with ResultCache(self.path, max_entries=2) as handle_cache:
+            handle_cache.put(b'first', ('ALIVE', 1, 1, 'N'))
+            handle_cache.put(b'second', ('LOST', 2, 0, 'S'))
+            self.assertEqual(handle_cache.get(b'first'), ('ALIVE', 1, 1, 'N'))
+            handle_cache.put(b'third', ('ALIVE', None, None, None))
+            self.assertEqual(len(handle_cache), 2)
+            self.assertIsNone(handle_cache.get(b'second'))
+            self.assertEqual(handle_cache.get(b'third'), ('ALIVE', None, None, None))
+
+    def test_get_many_correct(self):
+        '''
+        Tests that results are looked up in batches, in the order of their keys, and that the
+        entries found are marked as used.
+        '''
+        with ResultCache(self.path, max_entries=3) as handle_cache:
+            handle_cache.put_many([(b'first', ('ALIVE', 1, 1, 'N')), (b'second', ('LOST', 2, 0, 'S')), (b'third', ('CRASHED', 0, 0, 'E'))])
+            with patch('pyrover.cache.LOOKUP_CHUNK', 2):
+                self.assertEqual(handle_cache.get_many([b'third', b'missing', b'first']), [('CRASHED', 0, 0, 'E'), None, ('ALIVE', 1, 1, 'N')])
+            self.assertEqual(handle_cache.stats, {'hits' : 2, 'misses' : 1, 'hit_rate' : 2 / 3})
+            handle_cache.put(b'fourth', ('ALIVE', 3, 3, 'W'))
+            self.assertIsNone(handle_cache.get(b'second'))
+            self.assertEqual(handle_cache.get_many([]), [])
+
+    def test_init_correct_versioning(self):
+        '''
+        Tests that the entries stored by another version of pyrover are dropped.
+        '''
+        landing_coords = {'x' : 1, 'y' : 1, 'facing' : 'N'}
+        key = ResultCache.key(5, 5, landing_coords, 'M')
+        with ResultCache(self.path) as handle_cache:
+            handle_cache.put(key, ('ALIVE', 1, 2, 'N'))
+        with patch('pyrover.cache.__version__', '0.0.0'):
+            self.assertNotEqual(ResultCache.key(5, 5, landing_coords, 'M'), key)
+            with ResultCache(self.path) as handle_cache:
+                self.assertEqual(len(handle_cache), 0)
+
+    def test_init_wrong_illegal_max_entries(self):
+        '''
+        Tests that a ValueError exception is raised if a cache cannot hold any entry.
+        '''
+        self.assertRaises(
+                            ValueError,
+                            ResultCache,
+                            *[self.path, 0]
+                            )
+
+
+if __name__ == '__main__':
+        main()
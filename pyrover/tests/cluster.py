@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module tests the correct behaviour of the execution of a mission sharded over several nodes.
+'''
+
+import json
+import socket
+import threading
+from io import StringIO
+from unittest import main, TestCase
+
+from pyrover.cluster import ClusterError, Coordinator
+from pyrover.mission import Mission
+from pyrover.server import MissionClient, MissionServer, WORKER_DIED
+from pyrover.tests.helpers import final_states, generate_blueprints, run_mission
+
+
+class TestCluster(TestCase):
+    '''
+    Instantiates a TestCluster object.
+    '''
+    def aux_stalled_node(self):
+        '''
+        Auxiliary method that returns a listening socket which never answers, as a stalled node
+        would, along with its address.
+        '''
+        stalled = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        stalled.bind(('127.0.0.1', 0))
+        stalled.listen(8)
+        return stalled, stalled.getsockname()
+
+    def aux_dead_node(self):
+        '''
+        Auxiliary method that returns the address of a port nobody listens on, as a dead node's.
+        '''
+        dead = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        dead.bind(('127.0.0.1', 0))
+        address = dead.getsockname()
+        dead.close()
+        return address
+
+    def aux_failing_node(self, error, response=None):
+        '''
+        Auxiliary method that returns a listening socket answering the first request it gets with
+        the given error, or the given response, then closing the connection, along with its address.
+        '''
+        failing = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        failing.bind(('127.0.0.1', 0))
+        failing.listen(8)
+
+        def answer():
+            connection, _ = failing.accept()
+            with connection, connection.makefile('rwb') as f:
+                request = json.loads(f.readline().decode('utf-8'))
+                reply = dict(response) if response is not None else {'status' : 'ERROR', 'error' : error}
+                reply['id'] = request['id']
+                f.write(json.dumps(reply).encode('utf-8') + b'\n')
+                f.flush()
+
+        threading.Thread(target=answer, daemon=True).start()
+        return failing, failing.getsockname()
+
+    def setUp(self):
+        '''
+        Initializes whatever is common to all tests.
+        '''
+        self.valid_blueprints = generate_blueprints(300, 40, 40, 80, 8642, margins=(2, 0))
+        self.servers = [MissionServer(('127.0.0.1', 0), workers=1) for _ in range(3)]
+        for server in self.servers:
+            server.start()
+        self.nodes = [server.address for server in self.servers]
+
+    def tearDown(self):
+        '''
+        Instructions to execute at the end of each test method.
+        '''
+        for server in self.servers:
+            server.stop()
+
+    def test_run_batch_correct(self):
+        '''
+        Tests that a node answers a batch with the result of each rover, lost ones included along
+        with their last known position.
+        '''
+        with MissionClient(self.nodes[0]) as client:
+            response = client.batch("5 5\n1 2 N\nLMLMLMLMM\n3 3 E\nMMMMM\n", 'batch')
+        self.assertEqual(response, {'id' : 'batch', 'status' : 'OK', 'rovers' : [['ALIVE', 1, 3, 'N'], ['LOST', 5, 3, 'E']]})
+
+    def test_start_correct_nodes(self):
+        '''
+        Tests that a mission started on several nodes has the same outcome, and leaves its rovers
+        in the same state, as a sequential one.
+        '''
+        expected = run_mission(self.valid_blueprints)
+        handle_mission = Mission(StringIO(self.valid_blueprints))
+        handle_mission.setup()
+        handle_mission.start(nodes=self.nodes)
+        self.assertEqual(handle_mission.outcome, expected.outcome)
+        self.assertEqual(final_states(handle_mission), final_states(expected))
+        self.assertEqual(handle_mission.cluster_stats, {'batches' : 1, 'reassigned' : 0, 'failed_nodes' : []})
+        programs = [(rover._landing_coords['x'], rover._landing_coords['y'], rover._landing_coords['facing'], rover._instructions) for rover in expected._rovers]
+        handle_coordinator = Coordinator(self.nodes, batch_size=7, connections=2)
+        results = handle_coordinator.run(41, 41, programs)
+        self.assertEqual(len(results), 300)
+        self.assertEqual(handle_coordinator.stats['batches'], 43)
+
+    def test_run_correct_failing_nodes(self):
+        '''
+        Tests that the batches of nodes that are dead, or that stall, are handed to the others, and
+        that the results still come out in order.
+        '''
+        stalled, stalled_address = self.aux_stalled_node()
+        expected = run_mission(self.valid_blueprints)
+        programs = [(rover._landing_coords['x'], rover._landing_coords['y'], rover._landing_coords['facing'], rover._instructions) for rover in expected._rovers]
+        handle_coordinator = Coordinator([self.aux_dead_node(), stalled_address] + self.nodes, batch_size=11, timeout=0.5)
+        results = handle_coordinator.run(41, 41, programs)
+        stalled.close()
+        self.assertEqual([result[0] for result in results], [rover._status for rover in expected._rovers])
+        self.assertIn(stalled_address, handle_coordinator.stats['failed_nodes'])
+        self.assertEqual(handle_coordinator.stats['reassigned'], len(handle_coordinator.stats['failed_nodes']))
+
+    def test_run_correct_worker_died(self):
+        '''
+        Tests that a batch whose worker died is handed out again, rather than failing the mission.
+        '''
+        failing, failing_address = self.aux_failing_node(WORKER_DIED)
+        expected = run_mission(self.valid_blueprints)
+        programs = [(rover._landing_coords['x'], rover._landing_coords['y'], rover._landing_coords['facing'], rover._instructions) for rover in expected._rovers]
+        handle_coordinator = Coordinator([failing_address] + self.nodes, batch_size=11)
+        results = handle_coordinator.run(41, 41, programs)
+        failing.close()
+        self.assertEqual([result[0] for result in results], [rover._status for rover in expected._rovers])
+        self.assertGreaterEqual(handle_coordinator.stats['reassigned'], 1)
+
+    def test_run_correct_malformed_results(self):
+        '''
+        Tests that the batch of a node answering with malformed results is handed to the others,
+        and that the node is given up.
+        '''
+        failing, failing_address = self.aux_failing_node(None, {'status' : 'OK', 'rovers' : None})
+        expected = run_mission(self.valid_blueprints)
+        programs = [(rover._landing_coords['x'], rover._landing_coords['y'], rover._landing_coords['facing'], rover._instructions) for rover in expected._rovers]
+        handle_coordinator = Coordinator([failing_address] + self.nodes, batch_size=11)
+        results = handle_coordinator.run(41, 41, programs)
+        failing.close()
+        self.assertEqual([result[0] for result in results], [rover._status for rover in expected._rovers])
+        self.assertEqual(handle_coordinator.stats['failed_nodes'], [failing_address])
+
+        failing, failing_address = self.aux_failing_node(None, {'status' : 'OK', 'rovers' : None})
+        handle_coordinator = Coordinator([failing_address])
+        self.assertRaises(
+                            ClusterError,
+                            handle_coordinator.run,
+                            *[6, 6, [(1, 2, 'N', 'M')]]
+                            )
+        failing.close()
+
+    def test_run_wrong_invalid_batch(self):
+        '''
+        Tests that a ClusterError exception is raised as soon as a node fails to run a batch for
+        any other reason than its worker dying, since the batch would fail again.
+        '''
+        failing, failing_address = self.aux_failing_node("BlueprintError: the batch is invalid.")
+        handle_coordinator = Coordinator([failing_address])
+        self.assertRaises(
+                            ClusterError,
+                            handle_coordinator.run,
+                            *[6, 6, [(1, 2, 'N', 'M')]]
+                            )
+        failing.close()
+        self.assertEqual(handle_coordinator.stats['reassigned'], 0)
+
+    def test_run_wrong_no_node_left(self):
+        '''
+        Tests that a ClusterError exception is raised if every node is dead.
+        '''
+        handle_coordinator = Coordinator([self.aux_dead_node(), self.aux_dead_node()])
+        self.assertRaises(
+                            ClusterError,
+                            handle_coordinator.run,
+                            *[6, 6, [(1, 2, 'N', 'M')]]
+                            )
+
+    def test_start_wrong_collisions(self):
+        '''
+        Tests that a ValueError exception is raised if a mission whose rovers can collide is
+        started on nodes, or if it is also started in parallel.
+        '''
+        handle_mission = Mission(StringIO("5 5\n1 1 N\nM\n"), collisions=True)
+        handle_mission.setup()
+        self.assertRaises(
+                            ValueError,
+                            handle_mission.start,
+                            **{'nodes' : self.nodes}
+                            )
+        self.assertRaises(
+                            ValueError,
+                            handle_mission.start,
+                            **{'nodes' : self.nodes, 'parallel' : True}
+                            )
+
+
+if __name__ == '__main__':
+        main()
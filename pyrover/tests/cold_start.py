@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module tests that importing pyrover.mission stays cheap, which matters to every short-lived
+process, such as a serverless invocation, that runs a mission.
+'''
+
+from os import environ
+from os.path import abspath, dirname
+from statistics import median
+from subprocess import run, PIPE
+from sys import executable
+from unittest import main, TestCase
+
+
+class TestColdStart(TestCase):
+    '''
+    Instantiates a TestColdStart object.
+    '''
+    def aux_run(self, *args):
+        '''
+        Auxiliary method that runs a fresh interpreter from the root of the repository and returns
+        its standard output and error.
+        '''
+        process = run(
+                        [executable] + list(args),
+                        cwd=dirname(dirname(dirname(abspath(__file__)))),
+                        stdout=PIPE,
+                        stderr=PIPE,
+                        universal_newlines=True,
+                        check=True,
+                        )
+        return process.stdout, process.stderr
+
+    def setUp(self):
+        '''
+        Initializes whatever is common to all tests. The budget, in microseconds, can be tuned
+        through the PYROVER_IMPORT_BUDGET_US environment variable on slow machines.
+        '''
+        self.budget = int(environ.get('PYROVER_IMPORT_BUDGET_US', 20000))
+        self.runs = 5
+        self.debug_only_modules = ['copy', 'pdb', 'pprint', 'uuid']
+        self.on_demand_modules = ['json', 'multiprocessing', 'socket', 'pyrover.server']
+
+    def tearDown(self):
+        '''
+        Instructions to execute at the end of each test method.
+        '''
+        pass
+
+    def test_import_correct_no_debug_modules(self):
+        '''
+        Tests that importing pyrover.mission does not import any debug-only module, nor any module
+        that only some execution modes need.
+        '''
+        stdout, _ = self.aux_run('-c', 'import sys; before = set(sys.modules); import pyrover.mission; print("\\n".join(set(sys.modules) - before))')
+        imported = stdout.split()
+        for module in self.debug_only_modules + self.on_demand_modules:
+            self.assertNotIn(module, imported)
+
+    def test_import_correct_within_budget(self):
+        '''
+        Tests that the median cumulative import time of pyrover.mission, as reported by
+        python -X importtime, is within budget.
+        '''
+        timings = []
+        for _ in range(self.runs):
+            _, stderr = self.aux_run('-X', 'importtime', '-c', 'import pyrover.mission')
+            for line in stderr.splitlines():
+                if line.startswith('import time:') and line.rstrip().endswith('| pyrover.mission'):
+                    timings.append(int(line.split('|')[1]))
+        self.assertEqual(len(timings), self.runs)
+        self.assertLessEqual(median(timings), self.budget)
+
+
+if __name__ == '__main__':
+        main()
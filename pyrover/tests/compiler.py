@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module tests the correct behaviour of the compiler of the instructions of a rover.
+'''
+
+from random import Random
+from unittest import main, TestCase
+from unittest.mock import patch
+
+from pyrover.compiler import compile_program, generate_source, straight_runs
+from pyrover.kernel import simulate
+
+
+class TestCompiler(TestCase):
+    '''
+    Instantiates a TestCompiler object.
+    '''
+    def setUp(self):
+        '''
+        Initializes whatever is common to all tests.
+        '''
+        generator = Random(97531)
+        self.random_programs = [''.join(generator.choice('LRMMM') for _ in range(generator.randint(0, 30))) for _ in range(60)]
+
+    def tearDown(self):
+        '''
+        Instructions to execute at the end of each test method.
+        '''
+        compile_program.cache_clear()
+
+    def test_straight_runs_correct(self):
+        '''
+        Tests that rotations are folded and that runs with the same heading are merged, even
+        across rotations cancelling each other out.
+        '''
+        self.assertEqual(straight_runs('MMRMMLLRLMMLRM', 'N'), ([(0, 2), (1, 2), (3, 3)], 3))
+        self.assertEqual(straight_runs('LRLLRRRL', 'E'), ([], 1))
+        self.assertEqual(generate_source('RRLL', 'S').count('\n'), 2)
+
+    def test_compile_program_correct(self):
+        '''
+        Tests that compiled programs reproduce the kernel, lost rovers and their last known
+        position included, from every landing cell and heading.
+        '''
+        for instructions in self.random_programs + ['M' * 9, 'LMMMMMMMM']:
+            for facing in 'NESW':
+                program = compile_program(instructions, facing)
+                for y in range(5):
+                    for x in range(7):
+                        expected = simulate(7, 5, x, y, facing, instructions)[:4]
+                        self.assertEqual(program(7, 5, x, y), expected)
+
+    def test_compile_program_correct_cache(self):
+        '''
+        Tests that compiled programs are cached by program text and landing heading, and that
+        programs with too many straight runs are not compiled.
+        '''
+        self.assertIs(compile_program('MMRM', 'N'), compile_program('MMR' + 'M', 'N'))
+        self.assertIsNot(compile_program('MMRM', 'N'), compile_program('MMRM', 'E'))
+        with patch('pyrover.compiler.MAX_RUNS', 2):
+            self.assertIsNone(compile_program('MRMRM', 'N'))
+            self.assertIsNotNone(compile_program('MRRLM', 'N'))
+
+
+if __name__ == '__main__':
+        main()
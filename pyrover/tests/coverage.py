@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module tests the correct behaviour of the coverage of a plateau.
+'''
+
+from random import Random
+from unittest import main, TestCase
+
+from pyrover.coverage import BitsetCoverage, create_coverage, IntervalCoverage
+
+
+class TestCoverage(TestCase):
+    '''
+    Instantiates a TestCoverage object.
+    '''
+    def aux_generate_handle_coverages(self):
+        '''
+        Auxiliary method that creates a coverage of each representation over the same plateau.
+        '''
+        return [BitsetCoverage(self.valid_width, self.valid_height), IntervalCoverage(self.valid_width, self.valid_height)]
+
+    def aux_covered_cells(self, handle_coverage):
+        '''
+        Auxiliary method that returns the set of cells covered by the given coverage.
+        '''
+        return set((x, y) for y, x_min, x_max in handle_coverage.intervals() for x in range(x_min, x_max + 1))
+
+    def setUp(self):
+        '''
+        Initializes whatever is common to all tests.
+        '''
+        self.valid_width = 13
+        self.valid_height = 7
+        generator = Random(42)
+        self.random_cells = [(generator.randrange(self.valid_width), generator.randrange(self.valid_height)) for _ in range(60)]
+
+    def tearDown(self):
+        '''
+        Instructions to execute at the end of each test method.
+        '''
+        pass
+
+    def test_create_coverage_correct(self):
+        '''
+        Tests that a bitset is used for modest plateaus, intervals for the others.
+        '''
+        self.assertIsInstance(create_coverage(100, 100), BitsetCoverage)
+        self.assertIsInstance(create_coverage(10 ** 9, 10 ** 9), IntervalCoverage)
+        self.assertIsInstance(create_coverage(100, 100, max_bitset_cells=100), IntervalCoverage)
+
+    def test_init_wrong_illegal_args(self):
+        '''
+        Tests that a ValueError exception is raised if a coverage is given illegal dimensions.
+        '''
+        for cls in (BitsetCoverage, IntervalCoverage):
+            for illegal_args in ([0, 1], [1, -1], ['1', 1]):
+                self.assertRaises(
+                                    ValueError,
+                                    cls,
+                                    *illegal_args
+                                    )
+
+    def test_add_correct(self):
+        '''
+        Tests that both representations agree on the cells covered, however they are added.
+        '''
+        for handle_coverage in self.aux_generate_handle_coverages():
+            for x, y in self.random_cells:
+                handle_coverage.add(x, y)
+            handle_coverage.add_interval(3, 2, 9)
+            expected = set(self.random_cells) | set((x, 3) for x in range(2, 10))
+            self.assertEqual(self.aux_covered_cells(handle_coverage), expected)
+            self.assertEqual(len(handle_coverage), len(expected))
+            self.assertAlmostEqual(handle_coverage.coverage_ratio(), len(expected) / (self.valid_width * self.valid_height))
+
+    def test_add_correct_intervals_coalesced(self):
+        '''
+        Tests that walking a row, in any direction, grows a single interval.
+        '''
+        handle_coverage = IntervalCoverage(10 ** 9, 10 ** 9)
+        for x in list(range(500, 1000)) + list(range(499, 0, -1)):
+            handle_coverage.add(x, 123456789)
+        self.assertEqual(list(handle_coverage.intervals()), [(123456789, 1, 999)])
+        handle_coverage.add_interval(123456789, 1001, 2000)
+        handle_coverage.add(1000, 123456789)
+        self.assertEqual(list(handle_coverage.intervals()), [(123456789, 1, 2000)])
+        self.assertEqual(len(handle_coverage), 2000)
+
+    def test_uncovered_in_correct(self):
+        '''
+        Tests that the uncovered cells of a rectangle are correctly counted, and that the
+        rectangle is clipped to the plateau.
+        '''
+        for handle_coverage in self.aux_generate_handle_coverages():
+            for x, y in self.random_cells:
+                handle_coverage.add(x, y)
+            for rect in ((0, 0, 12, 6), (2, 1, 8, 5), (5, 5, 5, 5), (-10, -10, 100, 100), (20, 20, 30, 30)):
+                x_min, y_min = max(rect[0], 0), max(rect[1], 0)
+                x_max, y_max = min(rect[2], self.valid_width - 1), min(rect[3], self.valid_height - 1)
+                expected = sum(1 for x in range(x_min, x_max + 1) for y in range(y_min, y_max + 1) if (x, y) not in self.random_cells)
+                self.assertEqual(handle_coverage.uncovered_in(rect), expected)
+
+    def test_uncovered_in_correct_huge_plateau(self):
+        '''
+        Tests that the uncovered cells of a rectangle of a huge plateau are counted without
+        visiting each of its rows.
+        '''
+        handle_coverage = IntervalCoverage(10 ** 9, 10 ** 9)
+        handle_coverage.add_interval(10, 0, 99)
+        handle_coverage.add(5, 11)
+        self.assertEqual(handle_coverage.uncovered_in((0, 0, 10 ** 9 - 1, 10 ** 9 - 1)), 10 ** 18 - 101)
+        self.assertEqual(handle_coverage.uncovered_in((50, 0, 149, 10 ** 9 - 1)), 100 * 10 ** 9 - 50)
+
+    def test_merge_correct(self):
+        '''
+        Tests that coverages of shards, of any representation, merge into their union.
+        '''
+        for first in self.aux_generate_handle_coverages():
+            for second in self.aux_generate_handle_coverages():
+                for x, y in self.random_cells[:30]:
+                    first.add(x, y)
+                for x, y in self.random_cells[20:]:
+                    second.add(x, y)
+                first.merge(second)
+                self.assertEqual(self.aux_covered_cells(first), set(self.random_cells))
+                self.assertEqual(len(first), len(set(self.random_cells)))
+
+    def test_merge_wrong_different_plateaus(self):
+        '''
+        Tests that coverages of plateaus of different sizes cannot be merged.
+        '''
+        self.assertRaises(
+                            ValueError,
+                            BitsetCoverage(3, 3).merge,
+                            BitsetCoverage(3, 4)
+                            )
+        self.assertRaises(
+                            TypeError,
+                            IntervalCoverage(3, 3).merge,
+                            set()
+                            )
+
+
+if __name__ == '__main__':
+        main()
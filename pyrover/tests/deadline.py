@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module tests the correct behaviour of the instruction budgets and the deadlines of a mission.
+'''
+
+from io import StringIO
+from time import monotonic
+from unittest import main, TestCase
+from unittest.mock import patch
+
+from pyrover.deadline import Deadline
+from pyrover.engines import ENGINES
+from pyrover.mars import Mars
+from pyrover.mission import Mission
+from pyrover.policies import BoustrophedonPolicy
+from pyrover.rover import Rover
+from pyrover.tests.helpers import final_states, run_mission
+
+
+class TestDeadline(TestCase):
+    '''
+    Instantiates a TestDeadline object.
+    '''
+    def setUp(self):
+        '''
+        Initializes whatever is common to all tests.
+        '''
+        self.valid_blueprints = "5 5\n1 2 N\nLMLMLMLMM\n3 3 E\nMMRMMRMRRM\n0 0 N\nMM\n4 4 N\nMMMMMM\n"
+        self.slow_blueprints = "5 5\n1 1 N\nM\n2 2 E\n%s\n3 3 S\nM\n" % ('LR' * 2000000)
+
+    def tearDown(self):
+        '''
+        Instructions to execute at the end of each test method.
+        '''
+        pass
+
+    def test_spend_correct(self):
+        '''
+        Tests that a deadline reads the clock only once every given amount of work.
+        '''
+        with patch('pyrover.deadline.monotonic', side_effect=[0.0, 0.5, 1.5]) as clock:
+            handle_deadline = Deadline(1.0, every=10)
+            self.assertFalse(handle_deadline.spend())
+            for _ in range(9):
+                self.assertFalse(handle_deadline.spend())
+            self.assertEqual(clock.call_count, 2)
+            self.assertTrue(handle_deadline.spend(10))
+            self.assertTrue(handle_deadline.spend())
+            self.assertTrue(handle_deadline.expired)
+            self.assertEqual(clock.call_count, 3)
+
+    def test_start_correct_budget(self):
+        '''
+        Tests that rovers stop once they spent their budget, with the EXHAUSTED status unless they
+        were done by then, and that every engine and execution mode agrees.
+        '''
+        handle_mission = run_mission(self.valid_blueprints, budget=8)
+        self.assertEqual([rover._status for rover in handle_mission._rovers], ['EXHAUSTED', 'EXHAUSTED', 'ALIVE', 'LOST'])
+        self.assertEqual(handle_mission.outcome, "1 2 N\n4 1 N\n0 2 N\n")
+        expected = final_states(handle_mission)
+        for engine in ENGINES:
+            self.assertEqual(final_states(run_mission(self.valid_blueprints, engine=engine, budget=8)), expected)
+        for start_kwargs in ({'parallel' : True, 'workers' : 1}, {'simultaneous' : True}):
+            self.assertEqual(final_states(run_mission(self.valid_blueprints, start_kwargs, budget=8)), expected)
+
+    def test_verify_correct_budget(self):
+        '''
+        Tests that rovers which spent their budget are verified against a reference execution
+        bound by the same budget, so that they are not reported as divergences.
+        '''
+        for engine in ENGINES:
+            handle_mission = run_mission(self.valid_blueprints, engine=engine, verify=1, budget=8)
+            self.assertEqual([rover._status for rover in handle_mission._rovers], ['EXHAUSTED', 'EXHAUSTED', 'ALIVE', 'LOST'])
+            self.assertEqual(handle_mission.verified, 4)
+            self.assertEqual(handle_mission.divergences, [])
+
+    def test_execute_instructions_correct_policy_budget(self):
+        '''
+        Tests that a rover driven by a policy is told apart when it runs out of its budget from
+        when its policy is done.
+        '''
+        for budget, status in ((3, 'EXHAUSTED'), (100, 'ALIVE')):
+            handle_rover = Rover({'x' : 0, 'y' : 0, 'facing' : 'N'}, Mars(2, 2), BoustrophedonPolicy(), budget=budget)
+            handle_rover.send()
+            handle_rover.execute_instructions()
+            self.assertEqual(handle_rover._status, status)
+
+    def test_start_correct_deadline(self):
+        '''
+        Tests that a mission stops soon after its deadline, and that its outcome holds the partial
+        results: the rover running when it expired stops where it is, and those not sent yet are
+        never sent.
+        '''
+        for start_kwargs in ({'deadline' : 0.2}, {'deadline' : 0.2, 'simultaneous' : True}):
+            started = monotonic()
+            handle_mission = run_mission(self.slow_blueprints, start_kwargs)
+            self.assertLess(monotonic() - started, 2.0)
+            self.assertEqual(handle_mission._rovers[1]._status, 'TIMED_OUT')
+            self.assertEqual(handle_mission._rovers[1]._current_position['x'], 2)
+            self.assertTrue(handle_mission.outcome.startswith("1 2 N\n2 2 "))
+        self.assertEqual([rover._status for rover in handle_mission._rovers], ['ALIVE', 'TIMED_OUT', 'ALIVE'])
+        handle_mission = run_mission(self.slow_blueprints, {'deadline' : 0})
+        self.assertEqual([rover._status for rover in handle_mission._rovers], ['TIMED_OUT'] * 3)
+        self.assertEqual(handle_mission.outcome, '')
+        self.assertIn("never sent", str(handle_mission._rovers[0]))
+
+    def test_start_correct_deadline_events(self):
+        '''
+        Tests that every rover of a mission stopped by its deadline is reported as complete to the
+        subscribers, those never sent included, whether it was started sequentially or not.
+        '''
+        for start_kwargs in ({'deadline' : 0}, {'deadline' : 0, 'simultaneous' : True}, {'deadline' : 0.2}):
+            completed = []
+            handle_mission = Mission(StringIO(self.slow_blueprints))
+            handle_mission.events.subscribe('on_complete', lambda rover: completed.append(rover._status))
+            handle_mission.setup()
+            handle_mission.start(**start_kwargs)
+            self.assertEqual(len(completed), 3)
+            self.assertEqual(sorted(completed), sorted(rover._status for rover in handle_mission._rovers))
+
+    def test_start_wrong_deadline(self):
+        '''
+        Tests that a ValueError exception is raised if a mission started in parallel is given a
+        deadline, or if a mission is given an illegal budget or deadline.
+        '''
+        handle_mission = Mission(StringIO(self.valid_blueprints))
+        handle_mission.setup()
+        for illegal_kwargs in ({'deadline' : 1, 'parallel' : True}, {'deadline' : -1}, {'deadline' : '1'}):
+            self.assertRaises(
+                                ValueError,
+                                handle_mission.start,
+                                **illegal_kwargs
+                                )
+        self.assertRaises(
+                            ValueError,
+                            Mission,
+                            *[StringIO(self.valid_blueprints)],
+                            **{'budget' : -1}
+                            )
+
+
+if __name__ == '__main__':
+        main()
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module tests the correct behaviour of the execution engines.
+'''
+
+from io import StringIO
+from unittest import main, skipUnless, TestCase
+
+from pyrover.engines import Engine, ENGINES, get_engine, register_engine, TableEngine
+from pyrover.mission import Mission
+from pyrover.tests.helpers import final_states, generate_blueprints, occupied_positions, run_mission
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class SkippingEngine(TableEngine):
+    '''
+    This class represents a faulty engine, that ignores the last instruction of each rover.
+    '''
+    def run(self, rover):
+        rover._instructions = rover._instructions[:-1]
+        super(SkippingEngine, self).run(rover)
+
+
+class TestEngines(TestCase):
+    '''
+    Instantiates a TestEngines object.
+    '''
+    def aux_run(self, blueprints, **kwargs):
+        '''
+        Auxiliary method that runs a mission out of the given blueprints and returns the final
+        state of its rovers and of its destination.
+        '''
+        handle_mission = run_mission(blueprints, **kwargs)
+        coverage = list(handle_mission.coverage.intervals()) if handle_mission.coverage is not None else None
+        return handle_mission, final_states(handle_mission), occupied_positions(handle_mission), coverage
+
+    def setUp(self):
+        '''
+        Initializes whatever is common to all tests.
+        '''
+        self.blueprints = generate_blueprints(300, 10, 10, 40, 99, margins=(1, 1), instructions='LRMMM')
+        self.original_engines = dict(ENGINES)
+
+    def tearDown(self):
+        '''
+        Instructions to execute at the end of each test method.
+        '''
+        ENGINES.clear()
+        ENGINES.update(self.original_engines)
+
+    def aux_assert_matches_reference(self, engine):
+        '''
+        Auxiliary method that asserts that the given engine matches the reference one, with and
+        without collisions and coverage.
+        '''
+        for options in ({}, {'collisions' : True}, {'coverage' : True}, {'collisions' : True, 'coverage' : True}):
+            _, *expected = self.aux_run(self.blueprints, **options)
+            handle_mission, *actual = self.aux_run(self.blueprints, engine=engine, verify=0.5, verify_seed=1, **options)
+            self.assertEqual(actual, expected)
+            self.assertEqual(handle_mission.divergences, [])
+            self.assertTrue(0 < handle_mission.verified < 300)
+
+    def test_table_engine_correct(self):
+        '''
+        Tests that the table-driven engine matches the reference one.
+        '''
+        self.aux_assert_matches_reference('table')
+
+    @skipUnless(numpy, "NumPy is not installed.")
+    def test_numpy_engine_correct(self):
+        '''
+        Tests that the vectorized engine matches the reference one.
+        '''
+        self.aux_assert_matches_reference('numpy')
+
+    def test_compiled_engine_correct(self):
+        '''
+        Tests that the compiled engine matches the reference one, both before and after the
+        programs executed again are compiled.
+        '''
+        self.aux_assert_matches_reference('compiled')
+        self.aux_assert_matches_reference('compiled')
+
+    def test_verify_correct_divergences_reported(self):
+        '''
+        Tests that the divergences of a faulty engine are reported, when all rovers are verified.
+        '''
+        register_engine('skipping', SkippingEngine())
+        handle_mission, *_ = self.aux_run(self.blueprints, engine='skipping', verify=1)
+        self.assertEqual(handle_mission.verified, 300)
+        self.assertTrue(handle_mission.divergences)
+        for divergence in handle_mission.divergences:
+            self.assertNotEqual(divergence['expected'], divergence['actual'])
+
+    def test_verify_correct_policies_skipped(self):
+        '''
+        Tests that rovers driven by a policy, which cannot be replayed, are not verified.
+        '''
+        blueprints = "20 20\n5 5 N\n@random_walk 200\n1 2 N\nLMLMLMLMM\n15 15 S\n@random_walk 200\n"
+        handle_mission = run_mission(blueprints, engine='table', verify=1)
+        self.assertEqual(handle_mission.verified, 1)
+        self.assertEqual(handle_mission.divergences, [])
+
+    def test_register_engine_wrong_no_run(self):
+        '''
+        Tests that a TypeError exception is raised if an engine without a run method is registered,
+        and a ValueError exception if an unknown engine is requested.
+        '''
+        self.assertRaises(
+                            TypeError,
+                            register_engine,
+                            *['broken', object()]
+                            )
+        self.assertRaises(
+                            ValueError,
+                            get_engine,
+                            'warp'
+                            )
+        self.assertRaises(
+                            NotImplementedError,
+                            Engine().run,
+                            None
+                            )
+
+    def test_init_wrong_illegal_verify(self):
+        '''
+        Tests that a ValueError exception is raised if a Mission is asked to verify a fraction of
+        rovers that is not between 0 and 1, or to use an unknown engine.
+        '''
+        for illegal_kwargs in ({'verify' : -0.1}, {'verify' : 1.5}, {'engine' : 'warp'}):
+            self.assertRaises(
+                                ValueError,
+                                Mission,
+                                StringIO(self.blueprints),
+                                **illegal_kwargs
+                                )
+
+
+if __name__ == '__main__':
+        main()
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module tests the correct behaviour of the events emitted by the rovers.
+'''
+
+from io import StringIO
+from unittest import main, TestCase
+
+from pyrover.engines import ENGINES
+from pyrover.events import BatchingSubscriber, EventBus, SamplingSubscriber
+from pyrover.mars import Mars
+from pyrover.mission import Mission
+from pyrover.rover import Rover
+
+
+class Recorder(object):
+    '''
+    A subscriber recording every event it observes.
+    '''
+    def __init__(self):
+        self.events = []
+
+    def on_land(self, rover):
+        self.events.append(('on_land', rover._id))
+
+    def on_move(self, rover, x, y):
+        self.events.append(('on_move', rover._id, x, y))
+
+    def on_rotate(self, rover, facing):
+        self.events.append(('on_rotate', rover._id, facing))
+
+    def on_lost(self, rover):
+        self.events.append(('on_lost', rover._id))
+
+    def on_crash(self, rover):
+        self.events.append(('on_crash', rover._id))
+
+    def on_complete(self, rover):
+        self.events.append(('on_complete', rover._id, rover._status))
+
+
+class TestEvents(TestCase):
+    '''
+    Instantiates a TestEvents object.
+    '''
+    def aux_run(self, blueprints, subscriber=None, **kwargs):
+        '''
+        Auxiliary method that runs a mission out of the given blueprints, with the given subscriber
+        registered, and returns it.
+        '''
+        handle_mission = Mission(StringIO(blueprints), **kwargs)
+        if subscriber is not None:
+            handle_mission.events.register(subscriber)
+        handle_mission.setup()
+        handle_mission.start()
+        return handle_mission
+
+    def setUp(self):
+        '''
+        Initializes whatever is common to all tests.
+        '''
+        self.blueprints = "5 5\n1 2 N\nLMLMLMLMM\n3 3 E\nMMRMMRMRRM\n6 6 N\nMM\n1 2 S\nLLM\n0 0 W\nM\n"
+
+    def tearDown(self):
+        '''
+        Instructions to execute at the end of each test method.
+        '''
+        pass
+
+    def test_start_correct(self):
+        '''
+        Tests that the rovers of a mission emit each event, in order, and that the outcome is the
+        same as without subscribers.
+        '''
+        recorder = Recorder()
+        handle_mission = self.aux_run(self.blueprints, recorder, collisions=True)
+        self.assertEqual(handle_mission.outcome, self.aux_run(self.blueprints, collisions=True).outcome)
+
+        ids = [rover._id for rover in handle_mission._rovers]
+        events = [(event[0],) + event[2:] for event in recorder.events if event[1] == ids[0]]
+        self.assertEqual(events[0], ('on_land',))
+        self.assertEqual(events[1:5], [('on_rotate', 'W'), ('on_move', 0, 2), ('on_rotate', 'S'), ('on_move', 0, 1)])
+        self.assertEqual(events[-1], ('on_complete', 'ALIVE'))
+        self.assertEqual(len([event for event in events if event[0] == 'on_move']), 5)
+
+        self.assertEqual([event[0] for event in recorder.events if event[1] == ids[2]], ['on_lost', 'on_complete'])
+        self.assertEqual([event[0] for event in recorder.events if event[1] == ids[3]][-2:], ['on_crash', 'on_complete'])
+        self.assertEqual([event[0] for event in recorder.events if event[1] == ids[4]], ['on_land', 'on_lost', 'on_complete'])
+
+    def test_start_correct_fast_path(self):
+        '''
+        Tests that rovers whose steps are not observed execute their long runs of moves at once,
+        that every step of those observed is reported, and that faster engines are only used when
+        nobody subscribed.
+        '''
+        handle_mars = Mars(20, 20)
+        calls = []
+        move_run = handle_mars.move_run
+        handle_mars.move_run = lambda *args: calls.append(args) or move_run(*args)
+
+        handle_bus = EventBus()
+        handle_bus.subscribe('on_complete', lambda rover: None)
+        handle_rover = Rover({'x' : 0, 'y' : 0, 'facing' : 'N'}, handle_mars, 'MMMMMMMMMRMM', handle_bus)
+        handle_rover.send()
+        handle_rover.execute_instructions()
+        self.assertEqual(calls, [(handle_rover._id, 0, 1, 9)])
+        self.assertEqual(handle_rover._current_position, {'x' : 2, 'y' : 9, 'facing' : 'E'})
+
+        moves = []
+        handle_bus.subscribe('on_move', lambda rover, x, y: moves.append((x, y)))
+        handle_rover = Rover({'x' : 0, 'y' : 0, 'facing' : 'N'}, handle_mars, 'MMMMMMMMMRMM', handle_bus)
+        handle_rover.send()
+        handle_rover.execute_instructions()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(moves, [(0, y) for y in range(1, 10)] + [(1, 9), (2, 9)])
+
+        recorder = Recorder()
+        handle_mission = self.aux_run(self.blueprints, recorder, engine='table')
+        self.assertIn(('on_move', handle_mission._rovers[0]._id, 0, 2), recorder.events)
+
+    def test_sampling_subscriber_correct(self):
+        '''
+        Tests that a sampling subscriber observes one rover out of every given number.
+        '''
+        recorder = Recorder()
+        blueprints = "9 9\n" + "1 1 N\nMMRM\n" * 10
+        handle_mission = self.aux_run(blueprints, SamplingSubscriber(recorder, 3))
+        observed = sorted(set(event[1] for event in recorder.events))
+        self.assertEqual(observed, sorted(handle_mission._rovers[i]._id for i in (0, 3, 6, 9)))
+        self.assertEqual(len([event for event in recorder.events if event[0] == 'on_complete']), 4)
+
+    def test_sampling_subscriber_correct_unsampled(self):
+        '''
+        Tests that only the sampled rovers fall back to the reference engine, each subscriber
+        deciding once per rover, and that a mission whose rovers are all left out can still be
+        started on threads.
+        '''
+        recorder = Recorder()
+        blueprints = "9 9\n" + "1 1 N\nMMRM\n" * 10
+        reference = ENGINES['reference']
+        calls = []
+        reference.run = lambda rover: calls.append(rover._id) or type(reference).run(reference, rover)
+        try:
+            handle_mission = self.aux_run(blueprints, SamplingSubscriber(recorder, 3), engine='table')
+        finally:
+            del reference.run
+        self.assertEqual(calls, [handle_mission._rovers[i]._id for i in (0, 3, 6, 9)])
+        self.assertEqual(len([event for event in recorder.events if event[0] == 'on_complete']), 4)
+
+        recorder, recorder.accepts = Recorder(), lambda rover: False
+        handle_mission = Mission(StringIO(blueprints))
+        handle_mission.events.register(recorder)
+        handle_mission.setup()
+        handle_mission.start(threads=2)
+        self.assertEqual(handle_mission.outcome, self.aux_run(blueprints).outcome)
+        self.assertEqual(recorder.events, [])
+
+    def test_batching_subscriber_correct(self):
+        '''
+        Tests that a batching subscriber hands over the events it records in batches.
+        '''
+        batches = []
+        with BatchingSubscriber(batches.append, size=4, events=('on_land', 'on_complete')) as subscriber:
+            handle_mission = self.aux_run(self.blueprints, subscriber)
+        self.assertEqual([len(batch) for batch in batches], [4, 4, 1])
+        self.assertEqual(batches[0][0], ('on_land', handle_mission._rovers[0]._id, ()))
+        self.assertEqual(batches[-1][-1], ('on_complete', handle_mission._rovers[-1]._id, ()))
+
+    def test_subscribe_wrong_illegal_event(self):
+        '''
+        Tests that a ValueError exception is raised if a callback subscribes to an unknown event.
+        '''
+        self.assertRaises(
+                            ValueError,
+                            EventBus().subscribe,
+                            *['on_explode', lambda rover: None]
+                            )
+
+
+if __name__ == '__main__':
+        main()
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module holds the auxiliary functions shared by the tests of the execution of whole missions.
+'''
+
+from io import StringIO
+from random import Random
+
+from pyrover.mission import Mission
+
+
+def generate_blueprints(rovers, width, height, length, seed, margins=(0, 0), instructions='LRMM'):
+    '''
+    Auxiliary function that generates the blueprints of a random mission. Rovers land up to the
+    given (x, y) margins out of the plateau, and execute up to length instructions drawn from the
+    given ones.
+    '''
+    generator = Random(seed)
+    lines = ["%s %s" % (width, height)]
+    for _ in range(rovers):
+        lines.append("%s %s %s" % (generator.randint(-margins[0], width + margins[0]), generator.randint(-margins[1], height + margins[1]), generator.choice('NESW')))
+        lines.append(''.join(generator.choice(instructions) for _ in range(generator.randint(0, length))))
+    return '\n'.join(lines) + '\n'
+
+
+def run_mission(blueprints, start_kwargs=None, **kwargs):
+    '''
+    Auxiliary function that runs a mission out of the given blueprints and returns it. kwargs are
+    passed to the mission, start_kwargs to its start.
+    '''
+    handle_mission = Mission(StringIO(blueprints), **kwargs)
+    handle_mission.setup()
+    handle_mission.start(**(start_kwargs or {}))
+    return handle_mission
+
+
+def final_states(handle_mission):
+    '''
+    Auxiliary function that returns the final state of each rover of a mission.
+    '''
+    return [(rover._status, rover._current_position, rover._last_known_position) for rover in handle_mission._rovers]
+
+
+def occupied_positions(handle_mission):
+    '''
+    Auxiliary function that returns the positions occupied on the destination of a mission.
+    '''
+    return sorted(handle_mission._destination._plateau.values())
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module tests the correct behaviour of the offset index of a blueprint file.
+'''
+
+from io import StringIO
+from os import listdir, utime
+from os.path import basename, exists, join
+from tempfile import TemporaryDirectory
+from unittest import main, TestCase
+from unittest.mock import patch
+
+from pyrover.index import BlueprintIndex, index_path, scan_offsets
+from pyrover.mission import Mission, MissionFailed
+from pyrover.parsing import parse_rovers
+from pyrover.tests.helpers import generate_blueprints
+
+
+class TestIndex(TestCase):
+    '''
+    Instantiates a TestIndex object.
+    '''
+    def aux_write_blueprints(self, rovers, seed=8080, ending='\n'):
+        '''
+        Auxiliary method that writes the blueprints of a random mission, with rovers of any length,
+        and returns their path and lines.
+        '''
+        lines = generate_blueprints(rovers, 20, 20, 50, seed).splitlines()
+        path = join(self.directory.name, 'blueprints-%s.in' % (seed))
+        with open(path, 'w', newline='') as f:
+            f.write(ending.join(lines) + ending)
+        return path, lines
+
+    def aux_run(self, blueprints, rovers=None):
+        '''
+        Auxiliary method that sets up and starts a mission out of the given blueprints, selecting
+        the given rovers, and returns it.
+        '''
+        handle_mission = Mission(blueprints)
+        handle_mission.setup(rovers=rovers)
+        handle_mission.start()
+        return handle_mission
+
+    def setUp(self):
+        '''
+        Initializes whatever is common to all tests.
+        '''
+        self.directory = TemporaryDirectory()
+
+    def tearDown(self):
+        '''
+        Instructions to execute at the end of each test method.
+        '''
+        self.directory.cleanup()
+
+    def test_rovers_correct(self):
+        '''
+        Tests that any rover, or range of them, read through the index is the one parsing the
+        whole file gives, whatever the stride and the line endings.
+        '''
+        for ending in ('\n', '\r\n'):
+            path, lines = self.aux_write_blueprints(100, ending=ending)
+            expected = parse_rovers(lines[1:])
+            for stride in (1, 3, 7, 256):
+                handle_index = BlueprintIndex(path, stride)
+                self.assertEqual((len(handle_index), handle_index.plateau), (100, (20, 20)))
+                for start, stop in ((0, 1), (99, 100), (5, 40), (0, 100), (21, 21)):
+                    self.assertEqual(handle_index.rovers(start, stop), expected[start:stop])
+        with open(path, 'rb') as f:
+            self.assertEqual(scan_offsets(f, 0, 1, block=5)[1], 201)
+
+    def test_init_correct_sidecar(self):
+        '''
+        Tests that the index is stored next to the blueprint file and reused, and that it is built
+        again once the size or the modification time of the file changed.
+        '''
+        path, lines = self.aux_write_blueprints(50)
+        BlueprintIndex(path, 4)
+        self.assertTrue(exists(index_path(path)))
+        with patch('pyrover.index.scan_offsets') as scan:
+            self.assertEqual(len(BlueprintIndex(path, 4)), 50)
+            self.assertFalse(scan.called)
+        with open(path, 'a') as f:
+            f.write("1 1 N\nMM\n")
+        self.assertEqual(BlueprintIndex(path, 4).rovers(50), [(1, 1, 'N', 'MM')])
+        utime(path, ns=(0, 0))
+        with patch('pyrover.index.scan_offsets', wraps=scan_offsets) as scan:
+            self.assertEqual(len(BlueprintIndex(path, 4)), 51)
+            self.assertTrue(scan.called)
+
+    def test_init_correct_truncated_sidecar(self):
+        '''
+        Tests that an index cut short is built again rather than trusted, and that storing an index
+        never leaves a truncated one behind when the write fails.
+        '''
+        path, lines = self.aux_write_blueprints(50)
+        BlueprintIndex(path, 4)
+        with open(index_path(path), 'rb') as f:
+            stored = f.read()
+        with open(index_path(path), 'wb') as f:
+            f.write(stored[:-8])
+        with patch('pyrover.index.scan_offsets', wraps=scan_offsets) as scan:
+            self.assertEqual(BlueprintIndex(path, 4).rovers(49), parse_rovers(lines[-2:]))
+            self.assertTrue(scan.called)
+        with open(index_path(path), 'rb') as f:
+            self.assertEqual(f.read(), stored)
+
+        utime(path, ns=(0, 0))
+        with patch('pyrover.index.replace', side_effect=OSError("interrupted")):
+            self.assertEqual(len(BlueprintIndex(path, 4)), 50)
+        with open(index_path(path), 'rb') as f:
+            self.assertEqual(f.read(), stored)
+        self.assertEqual(sorted(listdir(self.directory.name)), sorted([basename(path), basename(index_path(path))]))
+
+    def test_setup_correct_rovers(self):
+        '''
+        Tests that a mission set up with a selection of rovers runs just those, as the whole
+        mission would.
+        '''
+        path, _ = self.aux_write_blueprints(300)
+        expected = self.aux_run(path)
+        for rovers, selected in ((range(120, 180), slice(120, 180)), (299, slice(299, 300))):
+            handle_mission = self.aux_run(path, rovers)
+            actual = [(rover._status, rover._current_position, rover._last_known_position) for rover in handle_mission._rovers]
+            self.assertEqual(actual, [(rover._status, rover._current_position, rover._last_known_position) for rover in expected._rovers[selected]])
+
+    def test_setup_wrong_rovers(self):
+        '''
+        Tests that a ValueError exception is raised if the selected rovers do not exist, or are
+        selected out of blueprints that are not a file, and that a MissionFailed one is if the
+        file has an even number of lines.
+        '''
+        path, _ = self.aux_write_blueprints(10)
+        for illegal_rovers in (10, range(5, 11), range(0, 10, 2), -1, '3'):
+            self.assertRaises(
+                                ValueError,
+                                Mission(path).setup,
+                                **{'rovers' : illegal_rovers}
+                                )
+        self.assertRaises(
+                            ValueError,
+                            Mission(StringIO("5 5\n1 2 N\nM\n")).setup,
+                            **{'rovers' : 0}
+                            )
+        with open(path, 'a') as f:
+            f.write("1 1 N\n")
+        self.assertRaises(
+                            MissionFailed,
+                            Mission(path).setup,
+                            **{'rovers' : 0}
+                            )
+
+
+if __name__ == '__main__':
+        main()
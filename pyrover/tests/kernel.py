@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module tests the correct behaviour of the execution kernel.
+'''
+
+from random import Random
+from unittest import main, TestCase
+
+from pyrover.kernel import apply_result, simulate
+from pyrover.mars import Mars
+from pyrover.rover import Rover
+
+
+class TestKernel(TestCase):
+    '''
+    Instantiates a TestKernel object.
+    '''
+    def aux_generate_programs(self, count, width, height, length):
+        '''
+        Auxiliary method that generates random landing co-ordinates and instructions, some of
+        which lie out of the plateau.
+        '''
+        generator = Random(1234)
+        programs = []
+        for _ in range(count):
+            landing_coords = {'x' : generator.randint(-1, width + 1), 'y' : generator.randint(-1, height + 1), 'facing' : generator.choice('NESW')}
+            instructions = ''.join(generator.choice('LRMMM') for _ in range(generator.randint(0, length)))
+            programs.append((landing_coords, instructions))
+        return programs
+
+    def setUp(self):
+        '''
+        Initializes whatever is common to all tests.
+        '''
+        self.valid_width = 8
+        self.valid_height = 6
+
+    def tearDown(self):
+        '''
+        Instructions to execute at the end of each test method.
+        '''
+        pass
+
+    def test_simulate_correct_matches_rover(self):
+        '''
+        Tests that simulating a rover, and applying the result to a fresh one, leaves it exactly
+        as sending it and having it execute its instructions would.
+        '''
+        for landing_coords, instructions in self.aux_generate_programs(300, self.valid_width, self.valid_height, 40):
+            handle_mars = Mars(self.valid_width, self.valid_height)
+            expected_rover = Rover(landing_coords, handle_mars, instructions)
+            expected_rover.send()
+            expected_rover.execute_instructions()
+
+            handle_mars_simulated = Mars(self.valid_width, self.valid_height)
+            handle_rover = Rover(landing_coords, handle_mars_simulated, instructions)
+            result = simulate(handle_mars_simulated._width, handle_mars_simulated._height, landing_coords['x'], landing_coords['y'], landing_coords['facing'], instructions)
+            apply_result(handle_rover, *result)
+
+            self.assertEqual(handle_rover._status, expected_rover._status)
+            self.assertEqual(handle_rover._current_position, expected_rover._current_position)
+            self.assertEqual(handle_rover._last_known_position, expected_rover._last_known_position)
+            self.assertEqual(list(handle_mars_simulated._plateau.values()), list(handle_mars._plateau.values()))
+
+    def test_simulate_correct_path(self):
+        '''
+        Tests that the path of a rover holds each position it occupied, its landing included.
+        '''
+        status, x, y, facing, path = simulate(6, 6, 1, 2, 'N', 'MMRMMLLMMMM', record_path=True)
+        self.assertEqual((status, x, y, facing), ('LOST', 0, 4, 'W'))
+        self.assertEqual(path, set([(1, 2), (1, 3), (1, 4), (2, 4), (3, 4), (0, 4)]))
+
+    def test_simulate_correct_crashed(self):
+        '''
+        Tests that a rover crashes, and stays in its position, when moving onto an occupied one,
+        and never makes it to the planet when landing onto an occupied one.
+        '''
+        self.assertEqual(simulate(6, 6, 1, 2, 'N', 'MMM', occupied=set([(1, 4)]))[:4], ('CRASHED', 1, 3, 'N'))
+        self.assertEqual(simulate(6, 6, 1, 2, 'N', 'MMM', occupied=set([(1, 2)]))[:4], ('CRASHED', None, None, None))
+
+
+if __name__ == '__main__':
+        main()
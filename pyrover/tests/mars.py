@@ -6,7 +6,7 @@ This module tests the correct behaviour of planet Mars.
 
 from unittest import main, TestCase
 
-from pyrover.mars import Mars, OutOfBounds
+from pyrover.mars import Crashed, Mars, MOVE_OK, OutOfBounds
 
 
 class TestMars(TestCase):
@@ -204,6 +204,104 @@ class TestMars(TestCase):
                                 )
             del handle_mars
 
+    def test_update_plateau_correct_coverage(self):
+        '''
+        Tests that, if coverage is tracked, each valid position an object occupies is covered,
+        while out of bounds positions are not. Coverage is not tracked by default.
+        '''
+        self.assertIsNone(self.aux_generate_handle_mars().coverage)
+        handle_mars = Mars(self.valid_width, self.valid_height, coverage=True)
+        object_id = 'test_rover_1234'
+        for x, y in ((0, 0), (0, 1), (1, 1), (0, 1)):
+            handle_mars.update_plateau(object_id, x, y)
+        self.assertRaises(
+                            OutOfBounds,
+                            handle_mars.update_plateau,
+                            *[object_id, -1, 1]
+                            )
+        self.assertEqual(len(handle_mars.coverage), 3)
+        self.assertEqual(handle_mars.coverage.uncovered_in((0, 0, 1, 1)), 1)
+        self.assertAlmostEqual(handle_mars.coverage.coverage_ratio(), 3 / ((self.valid_width + 1) * (self.valid_height + 1)))
+
+    def test_update_plateau_wrong_collision(self):
+        '''
+        Tests that, if collisions are enforced, a Crashed exception is raised if an object tries
+        to move onto a position occupied by another object, and that positions left, either by
+        moving or by going out of bounds, are freed.
+        '''
+        handle_mars = Mars(self.valid_width, self.valid_height, collisions=True)
+        self.assertTrue(handle_mars.collisions)
+        self.assertFalse(self.aux_generate_handle_mars().collisions)
+        handle_mars.update_plateau('test_rover_1', 0, 0)
+        handle_mars.update_plateau('test_rover_2', 0, 1)
+        for position in ([0, 0], [0, 1]):
+            self.assertRaises(
+                                Crashed,
+                                handle_mars.update_plateau,
+                                *['test_rover_3'] + position
+                                )
+        handle_mars.update_plateau('test_rover_2', 0, 1)
+        handle_mars.update_plateau('test_rover_2', 1, 1)
+        handle_mars.update_plateau('test_rover_3', 0, 1)
+        self.assertRaises(
+                            OutOfBounds,
+                            handle_mars.update_plateau,
+                            *['test_rover_1', -1, 0]
+                            )
+        handle_mars.update_plateau('test_rover_4', 0, 0)
+        self.assertEqual(handle_mars._occupancy, {(0, 0) : 'test_rover_4', (1, 1) : 'test_rover_2', (0, 1) : 'test_rover_3'})
+
+
+    def test_move_path_correct(self):
+        '''
+        Tests that a whole path is validated at once, that only its last valid position is
+        committed, and that each of its valid positions is covered.
+        '''
+        handle_mars = Mars(self.valid_width, self.valid_height, coverage=True, collisions=True)
+        self.assertEqual(handle_mars.move_path('test_rover_1', [(0, 0), (0, 1), (1, 1)]), MOVE_OK)
+        self.assertEqual(handle_mars._plateau, {'test_rover_1' : (1, 1)})
+        self.assertEqual(handle_mars._occupancy, {(1, 1) : 'test_rover_1'})
+        self.assertEqual(len(handle_mars.coverage), 3)
+
+        handle_mars.update_plateau('test_rover_2', 3, 1)
+        self.assertEqual(handle_mars.move_path('test_rover_1', [(2, 1), (3, 1), (4, 1)]), 1)
+        self.assertEqual(handle_mars._plateau['test_rover_1'], (2, 1))
+        self.assertRaises(Crashed, handle_mars.move_path, *['test_rover_1', [(3, 1)], True])
+
+        self.assertEqual(handle_mars.move_path('test_rover_1', [(2, 0), (2, -1), (2, -2)]), 1)
+        self.assertNotIn('test_rover_1', handle_mars._plateau)
+        self.assertEqual(handle_mars._occupancy, {(3, 1) : 'test_rover_2'})
+        self.assertEqual(handle_mars.move_path('test_rover_3', [(-1, 0)]), 0)
+        self.assertRaises(OutOfBounds, handle_mars.move_path, *['test_rover_3', [(-1, 0)], True])
+
+    def test_move_run_correct(self):
+        '''
+        Tests that a run of moves has the same effect as moving one step at a time, whether it
+        ends within the plateau, out of it, or onto another object.
+        '''
+        for delta_x, delta_y in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            for steps in range(0, 14):
+                stepped_mars = Mars(self.valid_width, self.valid_height, coverage=True, collisions=True)
+                batched_mars = Mars(self.valid_width, self.valid_height, coverage=True, collisions=True)
+                for handle_mars in (stepped_mars, batched_mars):
+                    handle_mars.update_plateau('test_rover_1', 5, 5)
+                    if delta_x + delta_y > 0:
+                        handle_mars.update_plateau('test_rover_2', 5 + delta_x * 3, 5 + delta_y * 3)
+
+                expected = MOVE_OK
+                x, y = 5, 5
+                for step in range(steps):
+                    x, y = x + delta_x, y + delta_y
+                    try:
+                        stepped_mars.update_plateau('test_rover_1', x, y)
+                    except (Crashed, OutOfBounds):
+                        expected = step
+                        break
+                self.assertEqual(batched_mars.move_run('test_rover_1', delta_x, delta_y, steps), expected)
+                self.assertEqual(batched_mars._plateau, stepped_mars._plateau)
+                self.assertEqual(batched_mars._occupancy, stepped_mars._occupancy)
+                self.assertEqual(list(batched_mars.coverage.intervals()), list(stepped_mars.coverage.intervals()))
+
         
 if __name__ == '__main__':
         main()
\ No newline at end of file
@@ -5,6 +5,7 @@ This module tests the correct behaviour of Mission.
 '''
 
 from copy import deepcopy
+from io import StringIO
 from os.path import abspath, split
 from pdb import set_trace
 from pprint import pprint
@@ -85,6 +86,17 @@ class TestMission(TestCase):
         self.assertEqual(handle_mission._mission_blueprints, self._mission_blueprints_input)
         del handle_mission
 
+    def test__get_input_correct_file_like(self):
+        '''
+        Tests that the mission blueprints are correctly read if they are given as a file-like
+        object rather than as the path of a file.
+        '''
+        with open(self.mock_valid_mission_blueprints_file, "r") as f:
+            handle_mission = Mission(StringIO(f.read()))
+        handle_mission._get_input()
+        self.assertEqual(handle_mission._mission_blueprints, self._mission_blueprints_input)
+        del handle_mission
+
     def test__get_input_wrong_blueprints_not_found(self):
         '''
         Tests that a MissionFailed exception is raised if the mission's blueprints can't be found
@@ -139,5 +151,19 @@ class TestMission(TestCase):
         for rover, rover_expected_position in zip(handle_mission._rovers, rovers_expected_positions):
             self.assertEqual(rover._current_position, rover_expected_position)
 
+    def test_start_correct_coverage(self):
+        '''
+        Tests that, if coverage is tracked, the cells visited by the rovers are covered.
+        '''
+        handle_mission = Mission(self.mock_valid_mission_blueprints_file)
+        self.assertIsNone(handle_mission.coverage)
+        handle_mission = Mission(self.mock_valid_mission_blueprints_file, coverage=True)
+        handle_mission.setup()
+        handle_mission.start()
+        # the first rover loops around (1, 2), the second one walks 3,3 -> 5,3 -> 5,1 -> 4,1 -> 5,1
+        expected = set([(1, 2), (0, 2), (0, 1), (1, 1), (1, 3), (3, 3), (4, 3), (5, 3), (5, 2), (5, 1), (4, 1)])
+        self.assertEqual(len(handle_mission.coverage), len(expected))
+        self.assertEqual(handle_mission.coverage.uncovered_in((0, 0, 5, 5)), 36 - len(expected))
+
 if __name__ == '__main__':
         main()
\ No newline at end of file
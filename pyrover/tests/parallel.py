@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module tests the correct behaviour of the speculative parallel execution of a mission.
+'''
+
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import main, TestCase
+
+from pyrover.mars import Mars
+from pyrover.mission import Mission
+from pyrover.parallel import speculative_start, threaded_start
+from pyrover.rover import Rover
+from pyrover.tests.helpers import final_states, generate_blueprints, occupied_positions, run_mission
+
+
+class TestParallel(TestCase):
+    '''
+    Instantiates a TestParallel object.
+    '''
+    def setUp(self):
+        '''
+        Initializes whatever is common to all tests.
+        '''
+        self.sparse_blueprints = generate_blueprints(200, 60, 60, 30, 4321)
+        self.crowded_blueprints = generate_blueprints(200, 8, 8, 30, 4321)
+
+    def tearDown(self):
+        '''
+        Instructions to execute at the end of each test method.
+        '''
+        pass
+
+    def test_start_correct_without_collisions(self):
+        '''
+        Tests that a parallel start, on worker processes, has the same outcome as a sequential one.
+        '''
+        expected = run_mission(self.sparse_blueprints)
+        handle_mission = run_mission(self.sparse_blueprints, {'parallel' : True, 'workers' : 2})
+        self.assertEqual(handle_mission.outcome, expected.outcome)
+        self.assertEqual(final_states(handle_mission), final_states(expected))
+        self.assertEqual(occupied_positions(handle_mission), occupied_positions(expected))
+        self.assertEqual(handle_mission.conflicts, 0)
+        self.assertIsNone(expected.conflicts)
+
+    def test_start_correct_with_collisions(self):
+        '''
+        Tests that a parallel start has the same outcome as a sequential one when collisions are
+        enforced, both when conflicts are rare and when they are frequent, and that only the
+        conflicting rovers are executed again.
+        '''
+        for blueprints in (self.sparse_blueprints, self.crowded_blueprints):
+            expected = run_mission(blueprints, collisions=True, coverage=True)
+            handle_mission = run_mission(blueprints, {'parallel' : True, 'workers' : 2}, collisions=True, coverage=True)
+            self.assertEqual(handle_mission.outcome, expected.outcome)
+            self.assertEqual(final_states(handle_mission), final_states(expected))
+            self.assertEqual(occupied_positions(handle_mission), occupied_positions(expected))
+            self.assertEqual(list(handle_mission.coverage.intervals()), list(expected.coverage.intervals()))
+            self.assertIn('CRASHED', [rover._status for rover in expected._rovers])
+            self.assertTrue(0 < handle_mission.conflicts < len(handle_mission._rovers))
+
+    def test_start_correct_threads(self):
+        '''
+        Tests that a start on threads has the same outcome as a sequential one, with and without
+        collisions, and leaves the destination exactly as it would.
+        '''
+        for blueprints in (self.sparse_blueprints, self.crowded_blueprints):
+            for kwargs in ({}, {'collisions' : True, 'coverage' : True}):
+                expected = run_mission(blueprints, **kwargs)
+                handle_mission = run_mission(blueprints, {'threads' : 4}, **kwargs)
+                self.assertEqual(handle_mission.outcome, expected.outcome)
+                self.assertEqual(final_states(handle_mission), final_states(expected))
+                self.assertEqual(occupied_positions(handle_mission), occupied_positions(expected))
+                self.assertEqual(sorted(handle_mission._destination._occupancy or ()), sorted(expected._destination._occupancy or ()))
+                if kwargs:
+                    self.assertEqual(list(handle_mission.coverage.intervals()), list(expected.coverage.intervals()))
+                else:
+                    self.assertEqual(handle_mission.conflicts, 0)
+
+    def test_speculative_start_correct_executor(self):
+        '''
+        Tests that an already running executor can be used, and that objects already on the
+        plateau when the mission starts are taken into account.
+        '''
+        for seed in range(5):
+            blueprints = generate_blueprints(50, 6, 6, 20, seed).splitlines()[1:]
+            results = []
+            for parallel in (False, True):
+                handle_mars = Mars(6, 6, collisions=True)
+                handle_mars.update_plateau('boulder', 3, 3)
+                rovers = []
+                for rover_lz, rover_cmds in zip(blueprints[0::2], blueprints[1::2]):
+                    x, y, facing = rover_lz.split()
+                    rovers.append(Rover({'x' : int(x), 'y' : int(y), 'facing' : facing}, handle_mars, rover_cmds))
+                if parallel:
+                    with ThreadPoolExecutor(2) as executor:
+                        speculative_start(rovers, handle_mars, workers=2, executor=executor)
+                else:
+                    for rover in rovers:
+                        rover.send()
+                        rover.execute_instructions()
+                results.append([(rover._status, rover._current_position, rover._last_known_position) for rover in rovers])
+                self.assertEqual(handle_mars._plateau['boulder'], (3, 3))
+            self.assertEqual(results[0], results[1])
+
+    def test_speculative_start_wrong_illegal_workers(self):
+        '''
+        Tests that a ValueError exception is raised if no worker is given.
+        '''
+        self.assertRaises(
+                            ValueError,
+                            speculative_start,
+                            *[[], Mars(5, 5), 0]
+                            )
+
+    def test_threaded_start_wrong_illegal_threads(self):
+        '''
+        Tests that a ValueError exception is raised if no thread is given, or if a mission is
+        started both on threads and in parallel.
+        '''
+        self.assertRaises(
+                            ValueError,
+                            threaded_start,
+                            *[[], Mars(5, 5), 0]
+                            )
+        handle_mission = Mission(StringIO(self.sparse_blueprints))
+        handle_mission.setup()
+        self.assertRaises(
+                            ValueError,
+                            handle_mission.start,
+                            **{'threads' : 2, 'parallel' : True}
+                            )
+
+
+if __name__ == '__main__':
+        main()
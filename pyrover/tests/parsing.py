@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module tests the correct behaviour of the parsing of the mission's blueprints.
+'''
+
+from concurrent.futures import ThreadPoolExecutor
+from os.path import join
+from random import Random
+from tempfile import TemporaryDirectory
+from unittest import main, TestCase
+from unittest.mock import patch
+
+from pyrover.mission import Mission, MissionFailed
+from pyrover.parsing import BlueprintError, parse_file, parse_rovers, plan_ranges
+
+
+class TestParsing(TestCase):
+    '''
+    Instantiates a TestParsing object.
+    '''
+    def aux_generate_blueprints(self, rovers, seed=2468, newline='\n'):
+        '''
+        Auxiliary method that writes the blueprints of a random mission, with instructions of very
+        different lengths, and returns their path.
+        '''
+        generator = Random(seed)
+        lines = ["9 9"]
+        for _ in range(rovers):
+            lines.append("%s %s %s" % (generator.randint(0, 9), generator.randint(0, 9), generator.choice('NESW')))
+            lines.append(generator.choice(['', '@sweep', ''.join(generator.choice('LRM') for _ in range(generator.randint(0, 200)))]))
+        path = join(self.directory.name, 'blueprints_%s' % (seed))
+        with open(path, 'w', newline='') as f:
+            f.write(newline.join(lines) + newline)
+        return path
+
+    def aux_run(self, path, **kwargs):
+        '''
+        Auxiliary method that runs a mission out of the given blueprints and returns it.
+        '''
+        handle_mission = Mission(path)
+        handle_mission.setup(**kwargs)
+        handle_mission.start()
+        return handle_mission
+
+    def setUp(self):
+        '''
+        Initializes whatever is common to all tests.
+        '''
+        self.directory = TemporaryDirectory()
+
+    def tearDown(self):
+        '''
+        Instructions to execute at the end of each test method.
+        '''
+        self.directory.cleanup()
+
+    def test_plan_ranges_correct(self):
+        '''
+        Tests that the ranges cover the whole file after its first line, and that each of them
+        starts on a landing line and holds whole rovers.
+        '''
+        for seed in range(5):
+            with open(self.aux_generate_blueprints(300, seed), 'rb') as f:
+                data = f.read()
+            for chunks in (1, 3, 16, 1000):
+                header_end, ranges = plan_ranges(data, chunks)
+                self.assertEqual(ranges[0][0], header_end)
+                self.assertEqual(ranges[-1][1], len(data))
+                for (start, end, line), (next_start, _, next_line) in zip(ranges, ranges[1:]):
+                    self.assertEqual(end, next_start)
+                    self.assertEqual(next_line - line, data.count(b'\n', start, end))
+                for start, end, line in ranges:
+                    self.assertEqual(line % 2, 0)
+                    self.assertEqual(line, data.count(b'\n', 0, start) + 1)
+                    self.assertEqual(data.count(b'\n', start, end) % 2, 0)
+
+    def test_parse_file_correct(self):
+        '''
+        Tests that parsing a file in parallel returns the same rovers, in the same order, as
+        parsing it sequentially, whatever the line endings.
+        '''
+        for newline in ('\n', '\r\n'):
+            path = self.aux_generate_blueprints(500, newline=newline)
+            with open(path) as f:
+                lines = f.read().splitlines()
+            expected = parse_rovers(lines[1:])
+            with ThreadPoolExecutor(3) as executor:
+                self.assertEqual(parse_file(path, 3, executor), (9, 9, expected))
+            self.assertEqual(parse_file(path, 2), (9, 9, expected))
+
+    def test_setup_correct_parallel(self):
+        '''
+        Tests that a large mission, parsed in parallel, has the same outcome as a small one.
+        '''
+        path = self.aux_generate_blueprints(400)
+        expected = self.aux_run(path)
+        with patch('pyrover.parsing.PARALLEL_MIN_BYTES', 1):
+            handle_mission = self.aux_run(path, workers=2)
+        self.assertEqual(handle_mission.outcome, expected.outcome)
+        self.assertEqual(len(handle_mission._rovers), 400)
+
+    def test_parse_file_wrong_line_numbers(self):
+        '''
+        Tests that the errors found by the workers are reported against the lines of the file.
+        '''
+        path = self.aux_generate_blueprints(400)
+        with open(path) as f:
+            lines = f.read().splitlines()
+        for number, line in ((641, "1 2 Q"), (642, "MMX"), (700, "@nothing"), (2, "1 N")):
+            invalid = list(lines)
+            invalid[number - 1] = line
+            invalid_path = join(self.directory.name, 'invalid')
+            with open(invalid_path, 'w') as f:
+                f.write('\n'.join(invalid) + '\n')
+            with ThreadPoolExecutor(4) as executor:
+                with self.assertRaises(BlueprintError) as context:
+                    parse_file(invalid_path, 4, executor)
+            self.assertEqual(context.exception.line, number)
+            with patch('pyrover.parsing.PARALLEL_MIN_BYTES', 1):
+                with self.assertRaises(MissionFailed) as context:
+                    Mission(invalid_path).setup(workers=2)
+            self.assertIn("Line %s:" % (number), str(context.exception))
+
+    def test_parse_file_wrong_even_lines(self):
+        '''
+        Tests that a BlueprintError exception is raised if a file has an even number of lines.
+        '''
+        path = join(self.directory.name, 'even')
+        with open(path, 'w') as f:
+            f.write("5 5\n1 2 N\nMM\n3 3 E")
+        self.assertRaises(
+                            BlueprintError,
+                            parse_file,
+                            *[path, 2]
+                            )
+
+    def test_parse_rovers_wrong_heading(self):
+        '''
+        Tests that a BlueprintError exception is raised if a rover lands facing anything but one
+        of the cardinal points, and that a mission refuses to be setup with it.
+        '''
+        for heading in ('NE', 'ES', 'NESW', 'n'):
+            self.assertRaises(
+                                BlueprintError,
+                                parse_rovers,
+                                *[["1 2 %s" % (heading), "LM"]]
+                                )
+            path = join(self.directory.name, 'heading')
+            with open(path, 'w') as f:
+                f.write("5 5\n1 2 %s\n\n" % (heading))
+            self.assertRaises(
+                                MissionFailed,
+                                Mission(path).setup
+                                )
+
+
+if __name__ == '__main__':
+        main()
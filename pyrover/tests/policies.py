@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module tests the correct behaviour of the exploration policies.
+'''
+
+from io import StringIO
+from unittest import main, TestCase
+
+from pyrover.mars import Mars
+from pyrover.mission import Mission
+from pyrover.parallel import speculative_start
+from pyrover.policies import BoustrophedonPolicy, Policy, policy_from_line, RandomWalkPolicy
+from pyrover.rover import Rover
+
+
+class TestPolicies(TestCase):
+    '''
+    Instantiates a TestPolicies object.
+    '''
+    def aux_run_rover(self, handle_mars, landing_coords, policy):
+        '''
+        Auxiliary method that sends a rover driven by the given policy and returns it.
+        '''
+        handle_rover = Rover(landing_coords, handle_mars, policy)
+        handle_rover.send()
+        handle_rover.execute_instructions()
+        return handle_rover
+
+    def setUp(self):
+        '''
+        Initializes whatever is common to all tests.
+        '''
+        self.valid_width = 7
+        self.valid_height = 4
+
+    def tearDown(self):
+        '''
+        Instructions to execute at the end of each test method.
+        '''
+        pass
+
+    def test_sweep_correct_covers_plateau(self):
+        '''
+        Tests that a boustrophedon sweep covers the whole plateau, whatever the landing position,
+        and ends on the top row without ever getting lost.
+        '''
+        for x, y, facing in ((0, 0, 'N'), (3, 2, 'E'), (7, 4, 'S'), (6, 1, 'W')):
+            handle_mars = Mars(self.valid_width, self.valid_height, coverage=True)
+            handle_rover = self.aux_run_rover(handle_mars, {'x' : x, 'y' : y, 'facing' : facing}, BoustrophedonPolicy())
+            self.assertEqual(handle_rover._status, 'ALIVE')
+            self.assertEqual(handle_rover._current_position['y'], self.valid_height)
+            self.assertEqual(handle_mars.coverage.coverage_ratio(), 1.0)
+
+    def test_sweep_correct_stops_when_blocked(self):
+        '''
+        Tests that a sweep stops, rather than crash, when another object blocks its way.
+        '''
+        handle_mars = Mars(self.valid_width, self.valid_height, collisions=True)
+        handle_mars.update_plateau('boulder', 4, 1)
+        handle_rover = self.aux_run_rover(handle_mars, {'x' : 0, 'y' : 0, 'facing' : 'N'}, BoustrophedonPolicy())
+        self.assertEqual(handle_rover._status, 'ALIVE')
+        self.assertEqual(handle_rover._current_position, {'x' : 5, 'y' : 1, 'facing' : 'W'})
+
+    def test_random_walk_correct_never_lost(self):
+        '''
+        Tests that a random walk never takes a rover out of the plateau, nor into another object,
+        and that it executes as many instructions as its step budget.
+        '''
+        handle_mars = Mars(self.valid_width, self.valid_height, collisions=True, coverage=True)
+        handle_mars.update_plateau('boulder', 2, 2)
+        policy = RandomWalkPolicy(steps=5000, seed=7)
+        for landing_coords in ({'x' : 0, 'y' : 0, 'facing' : 'S'}, {'x' : 7, 'y' : 4, 'facing' : 'N'}):
+            handle_rover = self.aux_run_rover(handle_mars, landing_coords, policy)
+            self.assertEqual(handle_rover._status, 'ALIVE')
+        self.assertTrue(handle_mars.coverage.coverage_ratio() > 0.9)
+        self.assertEqual(len(list(policy.instructions(handle_rover))), 5000)
+
+    def test_random_walk_correct_reproducible(self):
+        '''
+        Tests that, given a seed, a random walk is reproducible.
+        '''
+        positions = []
+        for _ in range(2):
+            handle_rover = self.aux_run_rover(Mars(50, 50), {'x' : 25, 'y' : 25, 'facing' : 'N'}, RandomWalkPolicy(steps=300, seed=3))
+            positions.append(handle_rover._current_position)
+        self.assertEqual(positions[0], positions[1])
+
+    def test_policy_correct_step_budget(self):
+        '''
+        Tests that a rover driven by a policy stops once its step budget is exhausted.
+        '''
+        handle_rover = self.aux_run_rover(Mars(100, 0), {'x' : 0, 'y' : 0, 'facing' : 'E'}, BoustrophedonPolicy(steps=10))
+        # four rotations, facing south then west then east again, followed by six moves
+        self.assertEqual(handle_rover._current_position, {'x' : 6, 'y' : 0, 'facing' : 'E'})
+
+    def test_policy_wrong_illegal_args(self):
+        '''
+        Tests that a ValueError exception is raised if a policy is given an illegal step budget or
+        probability of moving, or if a random walk is given no step budget.
+        '''
+        for policy, illegal_kwargs in ((Policy, {'steps' : -1}), (BoustrophedonPolicy, {'steps' : 'all'}), (RandomWalkPolicy, {'move_probability' : 0}), (RandomWalkPolicy, {'steps' : None})):
+            self.assertRaises(
+                                ValueError,
+                                policy,
+                                **illegal_kwargs
+                                )
+
+    def test_policy_from_line_correct(self):
+        '''
+        Tests that policies are correctly referenced from the mission's blueprints, and that a
+        mission can mix rovers driven by policies and by instructions.
+        '''
+        self.assertIsInstance(policy_from_line('@sweep'), BoustrophedonPolicy)
+        self.assertEqual(policy_from_line('@random_walk 10')._steps, 10)
+        for engine in ('reference', 'table'):
+            handle_mission = Mission(StringIO("7 4\n0 0 N\n@sweep\n1 2 N\nLMLMLMLMM\n"), coverage=True, engine=engine)
+            handle_mission.setup()
+            handle_mission.start()
+            self.assertEqual(handle_mission.outcome, "7 4 E\n1 3 N\n")
+            self.assertEqual(handle_mission.coverage.coverage_ratio(), 1.0)
+
+    def test_policy_from_line_wrong_unknown_policy(self):
+        '''
+        Tests that a ValueError exception is raised if the blueprints reference an unknown policy,
+        and that rovers driven by a policy cannot be executed speculatively.
+        '''
+        for line in ('@teleport', '@sweep 10 20', 'sweep', '@'):
+            self.assertRaises(
+                                ValueError,
+                                policy_from_line,
+                                line
+                                )
+        handle_mars = Mars(5, 5)
+        self.assertRaises(
+                            ValueError,
+                            speculative_start,
+                            *[[Rover({'x' : 0, 'y' : 0, 'facing' : 'N'}, handle_mars, BoustrophedonPolicy())], handle_mars]
+                            )
+
+
+if __name__ == '__main__':
+        main()
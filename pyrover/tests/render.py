@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module tests the correct behaviour of the rendering of a plateau.
+'''
+
+from io import StringIO
+from unittest import main, TestCase
+
+from pyrover.mars import Mars
+from pyrover.mission import Mission
+from pyrover.render import LiveView, render_overview, render_viewport
+from pyrover.tests.helpers import run_mission
+
+
+class TestRender(TestCase):
+    '''
+    Instantiates a TestRender object.
+    '''
+    def setUp(self):
+        '''
+        Initializes whatever is common to all tests.
+        '''
+        self.valid_blueprints = "4 3\n0 0 N\nM\n2 1 E\nMM\n3 3 S\nR\n1 2 W\nMMM\n"
+
+    def tearDown(self):
+        '''
+        Instructions to execute at the end of each test method.
+        '''
+        pass
+
+    def test_render_viewport_correct(self):
+        '''
+        Tests that a viewport is drawn from north to south, each rover marked by its heading, and
+        that lost rovers are not drawn.
+        '''
+        for collisions in (False, True):
+            handle_mission = run_mission(self.valid_blueprints, collisions=collisions)
+            self.assertEqual(handle_mission.render(), "...<.\n.....\n^...>\n.....\n")
+            self.assertEqual(handle_mission.render((2, 0, 9, 2)), "...\n..>\n...\n")
+            self.assertEqual(handle_mission.render((5, 5, 9, 9)), '')
+
+    def test_render_viewport_correct_objects(self):
+        '''
+        Tests that objects other than rovers are marked as such, whether the viewport probes its
+        cells or scans the objects of the plateau.
+        '''
+        for collisions in (False, True):
+            handle_mars = Mars(10 ** 6, 10 ** 6, collisions=collisions)
+            for index in range(50):
+                handle_mars.update_plateau("object_%s" % (index), index * 1000, index)
+            self.assertEqual(render_viewport(handle_mars, (2999, 1, 3001, 3)), ".o.\n...\n...\n")
+            self.assertEqual(render_viewport(handle_mars, (0, 0, 1, 0)), "o.\n")
+            self.assertEqual(render_viewport(handle_mars, (0, 0, 10 ** 5, 0)).count('o'), 1)
+
+    def test_render_overview_correct(self):
+        '''
+        Tests that an overview has at most the given number of buckets, each drawn according to
+        its density relative to the densest.
+        '''
+        handle_mars = Mars(10 ** 6, 10 ** 6)
+        for index in range(9):
+            handle_mars.update_plateau("dense_%s" % (index), index, index)
+        handle_mars.update_plateau("sparse", 10 ** 6, 10 ** 6)
+        self.assertEqual(render_overview(handle_mars, 4, 2), "   .\n@   \n")
+        self.assertEqual(render_overview(handle_mars, 80, 24, (0, 0, 2, 1)), " @ \n@  \n")
+        self.assertEqual(len(render_overview(handle_mars).splitlines()), 24)
+        self.assertEqual(set(len(line) for line in render_overview(handle_mars).splitlines()), set([80]))
+
+    def test_render_overview_wrong_buckets(self):
+        '''
+        Tests that a ValueError exception is raised if an overview is not given a positive number
+        of columns and rows.
+        '''
+        handle_mars = Mars(5, 5)
+        for illegal_args in ([0, 1], [1, -1], ['1', 1]):
+            self.assertRaises(
+                                ValueError,
+                                render_overview,
+                                *[handle_mars] + illegal_args
+                                )
+
+    def test_live_view_correct(self):
+        '''
+        Tests that a live view draws an overview every given number of completed rovers.
+        '''
+        stream = StringIO()
+        handle_mission = Mission(StringIO(self.valid_blueprints))
+        handle_mission.events.register(LiveView(stream, every=2, columns=5, rows=4))
+        handle_mission.setup()
+        handle_mission.start()
+        self.assertEqual(stream.getvalue().count("rovers completed\n"), 2)
+        self.assertTrue(stream.getvalue().endswith("4 rovers completed\n" + handle_mission.render(overview=True, columns=5, rows=4)))
+
+
+if __name__ == '__main__':
+        main()
@@ -7,6 +7,7 @@ This module tests the correct behaviour of Rover.
 from copy import deepcopy
 from pdb import set_trace
 from pprint import pprint
+from random import Random
 from unittest import main, TestCase
 
 from pyrover.mars import Mars, OutOfBounds
@@ -391,6 +392,55 @@ class TestRover(TestCase):
         del handle_mars
         del handle_rover
 
+    def test_execute_instructions_correct_rover_crashes_into_another_one(self):
+        '''
+        Tests that, if collisions are enforced, a rover that moves onto a position occupied by
+        another rover crashes and stays where it was, while one that lands onto an occupied
+        position never makes it to the planet.
+        '''
+        handle_mars = Mars(5, 5, collisions=True)
+        handle_obstacle = self.aux_generate_handle_rover({'x' : 0, 'y' : 2, 'facing' : 'N'}, handle_mars, '')
+        handle_obstacle.send()
+        handle_rover = self.aux_generate_handle_rover({'x' : 0, 'y' : 0, 'facing' : 'N'}, handle_mars, 'MMRM')
+        handle_rover.send()
+        handle_rover.execute_instructions()
+        self.assertEqual(handle_rover._status, 'CRASHED')
+        self.assertEqual(handle_rover._current_position, {'x' : 0, 'y' : 1, 'facing' : 'N'})
+        self.assertEqual(handle_rover._last_known_position, handle_rover._current_position)
+        self.assertEqual(str(handle_rover), "Rover %s crashed. It is stuck in position 0, 1, facing N." % (handle_rover._id))
+
+        handle_rover = self.aux_generate_handle_rover({'x' : 0, 'y' : 1, 'facing' : 'E'}, handle_mars, 'M')
+        handle_rover.send()
+        handle_rover.execute_instructions()
+        self.assertEqual(handle_rover._status, 'CRASHED')
+        self.assertEqual(handle_rover._current_position, None)
+        self.assertEqual(str(handle_rover), "Rover %s crashed. It never made it to the planet." % (handle_rover._id))
+        del handle_mars
+        del handle_rover
+
+    def test_execute_instructions_correct_long_runs(self):
+        '''
+        Tests that executing long runs of moves at once leaves rovers, and the plateau, exactly as
+        executing every instruction on its own does, whether they are lost or crash.
+        '''
+        generator = Random(31)
+        statuses = set()
+        for _ in range(20):
+            landing_coords = [{'x' : generator.randint(0, 20), 'y' : generator.randint(0, 20), 'facing' : generator.choice('NESW')} for _ in range(60)]
+            programs = [''.join(generator.choice(['L', 'R', 'M', 'M' * generator.randint(2, 12)]) for _ in range(8)) for _ in range(60)]
+            results = []
+            for stepwise in (False, True):
+                handle_mars = Mars(20, 20, coverage=True, collisions=True)
+                rovers = [Rover(dict(landing), handle_mars, program) for landing, program in zip(landing_coords, programs)]
+                for handle_rover in rovers:
+                    handle_rover.send()
+                    handle_rover.execute_instructions(stepwise=stepwise)
+                states = [(rover._status, rover._current_position, rover._last_known_position) for rover in rovers]
+                results.append((states, sorted(handle_mars._occupancy), list(handle_mars._coverage.intervals())))
+            self.assertEqual(results[0], results[1])
+            statuses.update(state[0] for state in results[0][0])
+        self.assertEqual(statuses, {'ALIVE', 'CRASHED', 'LOST'})
+
     def test_calculate_new_position_wrong_mistyped_squares(self):
         '''
         Tests that a TypeError exception is raised if _calculate_new_position is passed the
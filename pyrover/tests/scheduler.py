@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module tests the correct behaviour of the simultaneous execution of a mission.
+'''
+
+from io import StringIO
+from unittest import main, TestCase
+
+from pyrover.events import EventBus
+from pyrover.mars import Mars
+from pyrover.mission import Mission
+from pyrover.rover import Rover
+from pyrover.scheduler import TickScheduler
+from pyrover.tests.helpers import final_states, generate_blueprints, run_mission
+
+
+class TestScheduler(TestCase):
+    '''
+    Instantiates a TestScheduler object.
+    '''
+    def setUp(self):
+        '''
+        Initializes whatever is common to all tests.
+        '''
+        pass
+
+    def tearDown(self):
+        '''
+        Instructions to execute at the end of each test method.
+        '''
+        pass
+
+    def test_start_correct_non_interacting(self):
+        '''
+        Tests that rovers that never interact finish as they would in a sequential mission.
+        '''
+        blueprints = generate_blueprints(200, 30, 30, 40, 97531)
+        expected = run_mission(blueprints, coverage=True)
+        handle_mission = run_mission(blueprints, {'simultaneous' : True}, coverage=True)
+        self.assertEqual(handle_mission.outcome, expected.outcome)
+        self.assertEqual(final_states(handle_mission), final_states(expected))
+        self.assertEqual(list(handle_mission.coverage.intervals()), list(expected.coverage.intervals()))
+        self.assertTrue(0 < handle_mission.ticks <= 42)
+        self.assertIsNone(expected.ticks)
+
+    def test_run_correct_simultaneous(self):
+        '''
+        Tests that rovers move at the same time, all of them landing before any moves: a rover
+        following another one crashes into it, rather than the other way around as it would in a
+        sequential mission.
+        '''
+        for simultaneous in (False, True):
+            handle_mars = Mars(5, 5, collisions=True)
+            behind = Rover({'x' : 0, 'y' : 0, 'facing' : 'N'}, handle_mars, 'MMM')
+            ahead = Rover({'x' : 0, 'y' : 1, 'facing' : 'N'}, handle_mars, 'MMM')
+            if simultaneous:
+                handle_scheduler = TickScheduler([behind, ahead])
+                self.assertEqual(handle_scheduler.run(), 5)
+                self.assertEqual(len(handle_scheduler), 0)
+                self.assertEqual((behind._status, behind._current_position), ('CRASHED', {'x' : 0, 'y' : 0, 'facing' : 'N'}))
+                self.assertEqual((ahead._status, ahead._current_position), ('ALIVE', {'x' : 0, 'y' : 4, 'facing' : 'N'}))
+            else:
+                for rover in (behind, ahead):
+                    rover.send()
+                    rover.execute_instructions()
+                self.assertEqual((behind._status, behind._current_position), ('ALIVE', {'x' : 0, 'y' : 3, 'facing' : 'N'}))
+                self.assertEqual((ahead._status, ahead._current_position), ('CRASHED', {'x' : 0, 'y' : 2, 'facing' : 'N'}))
+
+    def test_run_correct_max_ticks(self):
+        '''
+        Tests that a scheduler stops after the given number of ticks, leaving the rovers still
+        active where they are, alive, and that every rover is completed, finished ones as soon as
+        they leave the active set.
+        '''
+        completed = []
+        handle_bus = EventBus()
+        handle_bus.subscribe('on_complete', lambda rover: completed.append(rover))
+        handle_mars = Mars(9, 9)
+        short = Rover({'x' : 0, 'y' : 0, 'facing' : 'N'}, handle_mars, 'M', handle_bus)
+        long = Rover({'x' : 5, 'y' : 0, 'facing' : 'N'}, handle_mars, 'M' * 9, handle_bus)
+        lost = Rover({'x' : 10, 'y' : 0, 'facing' : 'N'}, handle_mars, 'M', handle_bus)
+        handle_scheduler = TickScheduler([short, long, lost])
+        handle_scheduler.land()
+        self.assertEqual(len(handle_scheduler), 2)
+        self.assertEqual(handle_scheduler.step(), 2)
+        self.assertEqual(handle_scheduler.step(), 1)
+        self.assertEqual(completed, [lost, short])
+        self.assertEqual(handle_scheduler.run(4), 4)
+        self.assertEqual(completed, [lost, short, long])
+        self.assertEqual(len(handle_scheduler), 0)
+        self.assertEqual((long._status, long._current_position), ('ALIVE', {'x' : 5, 'y' : 3, 'facing' : 'N'}))
+        self.assertEqual(short._current_position, {'x' : 0, 'y' : 1, 'facing' : 'N'})
+        self.assertEqual(lost._status, 'LOST')
+
+        handle_mission = Mission(StringIO(generate_blueprints(50, 10, 10, 20, 97531)))
+        handle_mission.events.subscribe('on_complete', lambda rover: completed.append(rover))
+        handle_mission.setup()
+        handle_mission.start(simultaneous=True, max_ticks=5)
+        self.assertEqual(sorted(rover._id for rover in completed[3:]), sorted(rover._id for rover in handle_mission._rovers))
+
+    def test_start_wrong_parallel(self):
+        '''
+        Tests that a ValueError exception is raised if a mission is started both in parallel and
+        simultaneously.
+        '''
+        handle_mission = Mission(StringIO("5 5\n1 1 N\nM\n"))
+        handle_mission.setup()
+        self.assertRaises(
+                            ValueError,
+                            handle_mission.start,
+                            *[True, None, True]
+                            )
+
+
+if __name__ == '__main__':
+        main()
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module tests the correct behaviour of the MissionServer.
+'''
+
+from os.path import abspath, exists, split
+from tempfile import mkdtemp
+from threading import Thread
+from unittest import main, TestCase
+
+from pyrover.server import MissionClient, MissionServer, run_blueprints
+
+
+class TestMissionServer(TestCase):
+    '''
+    Instantiates a TestMissionServer object.
+    '''
+    def setUp(self):
+        '''
+        Initializes whatever is common to all tests.
+        '''
+        dirname, _ = split(abspath(__file__))
+        with open("%s/files/mocks_mission_valid" % (dirname), "r") as f:
+            self.valid_blueprints = f.read()
+        self.valid_outcome = "1 3 N\n5 1 E\n"
+        self.slow_blueprints = "5 5\n" + "1 2 N\n%s\n" % ('LR' * 2000000)
+
+    def tearDown(self):
+        '''
+        Instructions to execute at the end of each test method.
+        '''
+        pass
+
+    def test_run_blueprints_correct(self):
+        '''
+        Tests that the blueprints are run as a Mission would, and that the final state of each
+        rover, lost ones included, is returned in order.
+        '''
+        outcome, rovers = run_blueprints(self.valid_blueprints.rstrip() + "\n0 0 S\nM\n")
+        self.assertEqual(outcome, self.valid_outcome)
+        self.assertEqual(rovers, [['ALIVE', 1, 3, 'N'], ['ALIVE', 5, 1, 'E'], ['LOST', None, None, None]])
+
+    def test_init_wrong_illegal_args(self):
+        '''
+        Tests that a ValueError exception is raised if a MissionServer is given no workers, no
+        room in its queue or a non positive timeout.
+        '''
+        for illegal_kwargs in ({'workers' : 0}, {'queue_size' : 0}, {'timeout' : 0}, {'timeout' : None}):
+            self.assertRaises(
+                                ValueError,
+                                MissionServer,
+                                ('127.0.0.1', 0),
+                                **illegal_kwargs
+                                )
+
+    def test_run_correct_tcp(self):
+        '''
+        Tests that missions sent over TCP are run and answered with the id they were sent with.
+        '''
+        with MissionServer(('127.0.0.1', 0), workers=2) as server:
+            with MissionClient(server.address) as client:
+                for request_id in ('first', 'second'):
+                    response = client.run(self.valid_blueprints, request_id)
+                    self.assertEqual(response['id'], request_id)
+                    self.assertEqual(response['status'], 'OK')
+                    self.assertEqual(response['outcome'], self.valid_outcome)
+                stats = client.stats()
+        self.assertEqual(stats['completed'], 2)
+        self.assertEqual(stats['received'], 2)
+        self.assertTrue(stats['latency_p50'] >= 0)
+
+    def test_run_correct_unix(self):
+        '''
+        Tests that missions can be sent over a Unix socket, which is removed once the server stops.
+        '''
+        address = "%s/pyrover.sock" % (mkdtemp())
+        with MissionServer(address, workers=1) as server:
+            with MissionClient(server.address) as client:
+                response = client.run(self.valid_blueprints)
+        self.assertEqual(response['status'], 'OK')
+        self.assertEqual(response['outcome'], self.valid_outcome)
+        self.assertFalse(exists(address))
+
+    def test_run_wrong_invalid_blueprints(self):
+        '''
+        Tests that invalid blueprints are reported as an error, and that the worker survives it.
+        '''
+        with MissionServer(('127.0.0.1', 0), workers=1) as server:
+            with MissionClient(server.address) as client:
+                response = client.run("5 5\n1 2 N\n")
+                self.assertEqual(response['status'], 'ERROR')
+                self.assertIn('MissionFailed', response['error'])
+                response = client.request({'op' : 'unknown'})
+                self.assertEqual(response['status'], 'ERROR')
+                response = client.run(self.valid_blueprints)
+                self.assertEqual(response['status'], 'OK')
+
+    def test_run_wrong_timeout(self):
+        '''
+        Tests that a mission exceeding the timeout is answered with a TIMEOUT status and that the
+        worker running it is replaced, so that following missions still succeed.
+        '''
+        with MissionServer(('127.0.0.1', 0), workers=1, timeout=0.2) as server:
+            with MissionClient(server.address) as client:
+                response = client.run(self.slow_blueprints)
+                self.assertEqual(response['status'], 'TIMEOUT')
+                response = client.run(self.valid_blueprints)
+                self.assertEqual(response['status'], 'OK')
+                self.assertEqual(client.stats()['timed_out'], 1)
+
+    def test_run_wrong_queue_full(self):
+        '''
+        Tests that requests received while the queue is full are rejected with a BUSY status.
+        '''
+        responses = []
+
+        def send(blueprints):
+            with MissionClient(server.address) as client:
+                responses.append(client.run(blueprints))
+
+        with MissionServer(('127.0.0.1', 0), workers=1, queue_size=1, timeout=1.0) as server:
+            threads = [Thread(target=send, args=(self.slow_blueprints,)) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            with MissionClient(server.address) as client:
+                stats = client.stats()
+        statuses = [response['status'] for response in responses]
+        self.assertIn('BUSY', statuses)
+        self.assertEqual(stats['rejected'], statuses.count('BUSY'))
+
+    def test_run_wrong_after_stop(self):
+        '''
+        Tests that requests sent on a connection still open once the server stopped are rejected
+        with a BUSY status, rather than left waiting for a worker that is gone.
+        '''
+        server = MissionServer(('127.0.0.1', 0), workers=1)
+        server.start()
+        with MissionClient(server.address, timeout=5.0) as client:
+            self.assertEqual(client.run(self.valid_blueprints)['status'], 'OK')
+            server.stop()
+            response = client.run(self.valid_blueprints, 'late')
+        self.assertEqual(response['id'], 'late')
+        self.assertEqual(response['status'], 'BUSY')
+
+
+if __name__ == '__main__':
+        main()
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module tests the correct behaviour of the shared-memory plateau.
+'''
+
+from multiprocessing import get_context
+from os.path import exists, join
+from random import Random
+from unittest import main, TestCase
+
+from pyrover.mars import Crashed, OutOfBounds
+from pyrover.rover import Rover
+from pyrover.shared import SharedMars
+
+
+def aux_wander(handle, seed, moves, results):
+    '''
+    Auxiliary function, run in a worker process, that attaches to a plateau and has a few objects
+    wander over it at random, reporting how many moves succeeded and how many crashed.
+    '''
+    handle_mars = SharedMars.attach(handle)
+    generator = Random(seed)
+    succeeded = crashed = 0
+    positions = {}
+    for object_id in ("object_%s_%s" % (seed, i) for i in range(4)):
+        while True:
+            x, y = generator.randrange(handle_mars._width), generator.randrange(handle_mars._height)
+            try:
+                handle_mars.update_plateau(object_id, x, y)
+            except Crashed:
+                continue
+            positions[object_id] = (x, y)
+            break
+    for _ in range(moves):
+        object_id = generator.choice(sorted(positions))
+        x, y = positions[object_id]
+        x, y = generator.choice(((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)))
+        if not (0 <= x < handle_mars._width and 0 <= y < handle_mars._height):
+            continue
+        try:
+            handle_mars.update_plateau(object_id, x, y)
+        except Crashed:
+            crashed += 1
+        else:
+            positions[object_id] = (x, y)
+            succeeded += 1
+    handle_mars.close()
+    results.put((succeeded, crashed))
+
+
+class TestShared(TestCase):
+    '''
+    Instantiates a TestShared object.
+    '''
+    def aux_exists(self, name):
+        '''
+        Auxiliary method that returns True if a shared memory segment with the given name exists.
+        '''
+        return exists(join('/dev/shm', name.lstrip('/')))
+
+    def setUp(self):
+        '''
+        Initializes whatever is common to all tests.
+        '''
+        self.context = get_context('fork')
+
+    def tearDown(self):
+        '''
+        Instructions to execute at the end of each test method.
+        '''
+        pass
+
+    def test_update_plateau_correct(self):
+        '''
+        Tests that a shared plateau behaves as a Mars with collisions enforced.
+        '''
+        with SharedMars(5, 5, coverage=True) as handle_mars:
+            self.assertTrue(handle_mars.collisions)
+            handle_mars.update_plateau('object_1', 1, 1)
+            handle_mars.update_plateau('object_1', 1, 2)
+            handle_mars.update_plateau('object_2', 1, 1)
+            self.assertRaises(Crashed, handle_mars.update_plateau, *['object_2', 1, 2])
+            self.assertRaises(OutOfBounds, handle_mars.update_plateau, *['object_1', 6, 2])
+            self.assertNotIn((1, 2), handle_mars._occupancy)
+            self.assertEqual(handle_mars._occupancy[(1, 1)], 'slot_1')
+            self.assertEqual(handle_mars.positions(), {1 : (1, 1)})
+            self.assertEqual(len(handle_mars.coverage), 2)
+
+    def test_rover_correct(self):
+        '''
+        Tests that rovers can be sent to a shared plateau, and crash into each others.
+        '''
+        with SharedMars(5, 5) as handle_mars:
+            first = Rover({'x' : 1, 'y' : 2, 'facing' : 'N'}, handle_mars, 'LMLMLMLMM')
+            second = Rover({'x' : 1, 'y' : 1, 'facing' : 'N'}, handle_mars, 'MM')
+            for rover in (first, second):
+                rover.send()
+                rover.execute_instructions()
+            self.assertEqual(first._current_position, {'x' : 1, 'y' : 3, 'facing' : 'N'})
+            self.assertEqual(second._status, 'CRASHED')
+            self.assertEqual(sorted(handle_mars.positions().values()), [(1, 2), (1, 3)])
+
+    def test_processes_correct(self):
+        '''
+        Tests that objects moved concurrently by several processes never share a cell, and that the
+        plateau seen by each process is the same.
+        '''
+        with SharedMars(5, 5, stripes=4) as handle_mars:
+            results = self.context.Queue()
+            workers = [self.context.Process(target=aux_wander, args=(handle_mars.handle, seed, 500, results)) for seed in range(4)]
+            for worker in workers:
+                worker.start()
+            outcomes = [results.get(timeout=60) for _ in workers]
+            for worker in workers:
+                worker.join()
+                self.assertEqual(worker.exitcode, 0)
+
+            positions = handle_mars.positions()
+            self.assertEqual(len(positions), 16)
+            self.assertEqual(len(set(positions.values())), 16)
+            self.assertEqual(sorted(handle_mars._occupancy), sorted(positions.values()))
+            self.assertTrue(sum(succeeded for succeeded, _ in outcomes) > 0)
+
+    def test_close_correct(self):
+        '''
+        Tests that the segment holding a plateau is destroyed when its owner closes it or is
+        garbage collected, but not when a process attached to it detaches.
+        '''
+        handle_mars = SharedMars(5, 5)
+        name = handle_mars.name
+        attached_mars = SharedMars.attach(handle_mars.handle)
+        attached_mars.close()
+        self.assertTrue(self.aux_exists(name))
+        handle_mars.close()
+        self.assertFalse(self.aux_exists(name))
+        handle_mars.close()
+
+        handle_mars = SharedMars(5, 5)
+        name = handle_mars.name
+        del handle_mars
+        self.assertFalse(self.aux_exists(name))
+
+    def test_init_wrong_illegal_slots(self):
+        '''
+        Tests that a ValueError exception is raised if a shared plateau has no slot.
+        '''
+        self.assertRaises(
+                            ValueError,
+                            SharedMars,
+                            *[5, 5, 0]
+                            )
+
+    def test_update_plateau_wrong_full(self):
+        '''
+        Tests that a ValueError exception is raised if more objects than slots land on a plateau.
+        '''
+        with SharedMars(5, 5, slots=1) as handle_mars:
+            handle_mars.update_plateau('object_1', 1, 1)
+            self.assertRaises(ValueError, handle_mars.update_plateau, *['object_2', 2, 2])
+
+    def test_rover_correct_lost_on_landing(self):
+        '''
+        Tests that rovers lost or crashed on landing take up no slot of the position table, so that
+        the following ones can still land.
+        '''
+        with SharedMars(5, 5, slots=2) as handle_mars:
+            for x in (-1, 7):
+                rover = Rover({'x' : x, 'y' : 1, 'facing' : 'N'}, handle_mars, 'M', validate=False)
+                rover.send()
+                self.assertEqual(rover._status, 'LOST')
+            handle_mars.update_plateau('object_1', 1, 1)
+            self.assertRaises(Crashed, handle_mars.update_plateau, *['object_2', 1, 1])
+            rover = Rover({'x' : 2, 'y' : 2, 'facing' : 'N'}, handle_mars, 'M')
+            rover.send()
+            rover.execute_instructions()
+            self.assertEqual(rover._current_position, {'x' : 2, 'y' : 3, 'facing' : 'N'})
+
+
+if __name__ == '__main__':
+        main()
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module tests the correct behaviour of the solver of the safe landing zones of a program.
+'''
+
+from random import Random
+from time import monotonic
+from unittest import main, skipUnless, TestCase
+
+from pyrover.mars import Mars
+from pyrover.rover import Rover
+from pyrover.solver import path_bounds, safe_landing_zones
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestSolver(TestCase):
+    '''
+    Instantiates a TestSolver object.
+    '''
+    def aux_safe_cells(self, width, height, instructions):
+        '''
+        Auxiliary method that returns the set of (x, y, facing) landing cells from which a rover
+        executing the given instructions is not lost, by sending a rover from each of them.
+        '''
+        safe = set()
+        for facing in 'NESW':
+            for y in range(height + 1):
+                for x in range(width + 1):
+                    handle_rover = Rover({'x' : x, 'y' : y, 'facing' : facing}, Mars(width, height), instructions)
+                    handle_rover.send()
+                    handle_rover.execute_instructions()
+                    if handle_rover._status != 'LOST':
+                        safe.add((x, y, facing))
+        return safe
+
+    def aux_zone_cells(self, zones):
+        '''
+        Auxiliary method that returns the set of (x, y, facing) landing cells within the given
+        rectangles.
+        '''
+        return set((x, y, facing) for facing, zone in zones.items() if zone is not None for y in range(zone[1], zone[3] + 1) for x in range(zone[0], zone[2] + 1))
+
+    def setUp(self):
+        '''
+        Initializes whatever is common to all tests.
+        '''
+        generator = Random(1357)
+        self.random_programs = [''.join(generator.choice('LRMMM') for _ in range(generator.randint(0, 12))) for _ in range(40)]
+
+    def tearDown(self):
+        '''
+        Instructions to execute at the end of each test method.
+        '''
+        pass
+
+    def test_safe_landing_zones_correct(self):
+        '''
+        Tests that the safe landing zones are exactly the landing cells and headings from which a
+        rover is not lost, including programs that cannot be executed safely from anywhere.
+        '''
+        self.assertEqual(path_bounds('LMRMMRRMMM'), (-1, -1, 0, 2))
+        for instructions in self.random_programs + ['MMMMMMM', 'MMMMLMMMM']:
+            handle_mars = Mars(5, 3)
+            zones = handle_mars.safe_landing_zones(instructions)
+            self.assertEqual(self.aux_zone_cells(zones), self.aux_safe_cells(5, 3, instructions))
+        self.assertEqual(handle_mars.safe_landing_zones('MMMMLMMMM'), {'N' : None, 'E' : None, 'S' : None, 'W' : None})
+
+    def test_safe_landing_zones_correct_large(self):
+        '''
+        Tests that the cost of solving does not depend on the size of the plateau.
+        '''
+        started = monotonic()
+        zones = Mars(10 ** 9, 10 ** 9).safe_landing_zones('MMRMMRMRRM' * 1000)
+        self.assertLess(monotonic() - started, 1.0)
+        min_dx, min_dy, max_dx, max_dy = path_bounds('MMRMMRMRRM' * 1000)
+        self.assertEqual(zones['N'], (-min_dx, -min_dy, 10 ** 9 - max_dx, 10 ** 9 - max_dy))
+
+    @skipUnless(numpy, "NumPy is not installed.")
+    def test_safe_landing_zones_correct_mask(self):
+        '''
+        Tests that the mask marks exactly the cells of the safe landing zones.
+        '''
+        for instructions in self.random_programs:
+            mask = Mars(5, 3).safe_landing_zones(instructions, mask=True)
+            self.assertEqual(mask.shape, (4, 4, 6))
+            cells = set((int(x), int(y), 'NESW'[heading]) for heading, y, x in zip(*numpy.nonzero(mask)))
+            self.assertEqual(cells, self.aux_zone_cells(safe_landing_zones(6, 4, instructions)))
+
+    def test_path_bounds_wrong_instructions(self):
+        '''
+        Tests that a ValueError exception is raised if the instructions hold an invalid value,
+        and a TypeError one if they are not a string.
+        '''
+        self.assertRaises(
+                            ValueError,
+                            Mars(5, 5).safe_landing_zones,
+                            *['MMX']
+                            )
+        self.assertRaises(
+                            TypeError,
+                            path_bounds,
+                            *[['M', 'M']]
+                            )
+
+
+if __name__ == '__main__':
+        main()
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+'''
+This module tests the correct behaviour of the terrain of a plateau.
+'''
+
+from io import StringIO
+from os.path import getsize, join
+from pickle import dumps, loads
+from tempfile import TemporaryDirectory
+from unittest import main, TestCase
+
+from pyrover.engines import ENGINES
+from pyrover.mars import Blocked, Mars, MOVE_OK
+from pyrover.mission import Mission
+from pyrover.rover import Rover
+from pyrover.terrain import BitmapTerrain, load_terrain, SparseTerrain, write_bitmap
+
+
+class TestTerrain(TestCase):
+    '''
+    Instantiates a TestTerrain object.
+    '''
+    def aux_write_terrains(self, width, height, cells):
+        '''
+        Auxiliary method that writes the given blocked cells both as a bitmap and as a sparse
+        list, and returns their paths.
+        '''
+        bitmap_path = join(self.directory.name, 'terrain.bitmap')
+        sparse_path = join(self.directory.name, 'terrain.txt')
+        write_bitmap(bitmap_path, width, height, cells)
+        with open(sparse_path, 'w') as f:
+            f.write(''.join("%s %s\n" % (x, y) for x, y in cells))
+        return bitmap_path, sparse_path
+
+    def setUp(self):
+        '''
+        Initializes whatever is common to all tests.
+        '''
+        self.directory = TemporaryDirectory()
+        self.valid_blocked = [(2, 2), (0, 4), (5, 5), (3, 0)]
+
+    def tearDown(self):
+        '''
+        Instructions to execute at the end of each test method.
+        '''
+        self.directory.cleanup()
+
+    def test_load_terrain_correct(self):
+        '''
+        Tests that both representations block the same cells, and nothing else, and that the
+        representation is told by the header of the file.
+        '''
+        bitmap_path, sparse_path = self.aux_write_terrains(6, 6, self.valid_blocked)
+        with load_terrain(bitmap_path) as bitmap, load_terrain(sparse_path) as sparse:
+            self.assertIsInstance(bitmap, BitmapTerrain)
+            self.assertIsInstance(sparse, SparseTerrain)
+            self.assertEqual((bitmap.width, bitmap.height), (6, 6))
+            self.assertIsNone(sparse.width)
+            for y in range(-1, 7):
+                for x in range(-1, 7):
+                    self.assertEqual((x, y) in bitmap, (x, y) in self.valid_blocked)
+                    self.assertEqual((x, y) in sparse, (x, y) in self.valid_blocked)
+            self.assertTrue((2, 2) in loads(dumps(bitmap)))
+
+    def test_write_bitmap_correct_large(self):
+        '''
+        Tests that a bitmap for a plateau of a billion cells is written and read without being
+        held in memory.
+        '''
+        path = join(self.directory.name, 'large.bitmap')
+        write_bitmap(path, 10 ** 5, 10 ** 4, [(99999, 9999), (12345, 6789)])
+        self.assertEqual(getsize(path), 24 + 10 ** 9 // 8)
+        handle_mars = Mars(99999, 9999, terrain=path)
+        self.assertTrue(handle_mars.blocked(12345, 6789))
+        self.assertFalse(handle_mars.blocked(12346, 6789))
+        handle_mars.terrain.close()
+
+    def test_update_plateau_correct_blocked(self):
+        '''
+        Tests that a rover moving onto a blocked cell is stuck before it, whether it moves one step
+        at a time or through a run of moves, and that landing on one blocks it at once.
+        '''
+        for path in self.aux_write_terrains(6, 6, self.valid_blocked):
+            for instructions in ('MMMM', 'MRLMRLMRLM'):
+                handle_mars = Mars(5, 5, terrain=path)
+                handle_rover = Rover({'x' : 2, 'y' : 5, 'facing' : 'S'}, handle_mars, instructions)
+                handle_rover.send()
+                handle_rover.execute_instructions()
+                self.assertEqual(handle_rover._status, 'BLOCKED')
+                self.assertEqual(handle_rover._current_position, {'x' : 2, 'y' : 3, 'facing' : 'S'})
+                self.assertIn("blocked by the terrain", str(handle_rover))
+            handle_rover = Rover({'x' : 0, 'y' : 4, 'facing' : 'S'}, handle_mars, 'M')
+            handle_rover.send()
+            self.assertEqual((handle_rover._status, handle_rover._current_position), ('BLOCKED', None))
+            self.assertRaises(
+                                Blocked,
+                                handle_mars.update_plateau,
+                                *['object', 5, 5]
+                                )
+
+    def test_move_path_correct_blocked(self):
+        '''
+        Tests that a batched move stops before a blocked cell, raising Blocked if asked to.
+        '''
+        handle_mars = Mars(5, 5, terrain=self.aux_write_terrains(6, 6, self.valid_blocked)[0])
+        handle_mars.update_plateau('object', 0, 2)
+        self.assertEqual(handle_mars.move_path('object', [(0, 3), (1, 3)]), MOVE_OK)
+        self.assertEqual(handle_mars.move_path('object', [(1, 2), (2, 2), (3, 2)]), 1)
+        self.assertEqual(handle_mars._plateau['object'], (1, 2))
+        self.assertRaises(
+                            Blocked,
+                            handle_mars.move_run,
+                            *['object', 1, 0, 3, True]
+                            )
+
+    def test_start_correct_engines(self):
+        '''
+        Tests that every engine, and the parallel execution, stop rovers on blocked cells as the
+        reference one does.
+        '''
+        blueprints = "5 5\n2 5 S\nMMMM\n0 0 N\nMMMMMM\n1 0 E\nMMMMM\n4 4 W\nMLMM\n"
+        terrain = self.aux_write_terrains(6, 6, self.valid_blocked)[0]
+        handle_mission = Mission(StringIO(blueprints), terrain=terrain)
+        handle_mission.setup()
+        handle_mission.start()
+        expected = [(rover._status, rover._current_position) for rover in handle_mission._rovers]
+        self.assertEqual(expected[2], ('BLOCKED', {'x' : 2, 'y' : 0, 'facing' : 'E'}))
+        self.assertEqual(handle_mission.outcome, "2 3 S\n0 3 N\n2 0 E\n3 2 S\n")
+        for engine in ENGINES:
+            for start_kwargs in ({}, {'parallel' : True, 'workers' : 1}):
+                handle_mission = Mission(StringIO(blueprints), terrain=terrain, engine=engine)
+                handle_mission.setup()
+                handle_mission.start(**start_kwargs)
+                self.assertEqual([(rover._status, rover._current_position) for rover in handle_mission._rovers], expected)
+
+    def test_close_correct(self):
+        '''
+        Tests that a terrain loaded by a planet is released when the planet is closed or garbage
+        collected, while one given already loaded is left open.
+        '''
+        bitmap_path, _ = self.aux_write_terrains(6, 6, self.valid_blocked)
+        with Mars(5, 5, terrain=bitmap_path) as handle_mars:
+            terrain = handle_mars.terrain
+            self.assertTrue((2, 2) in terrain)
+        self.assertTrue(terrain._data.closed)
+        handle_mars.close()
+
+        handle_mars = Mars(5, 5, terrain=bitmap_path)
+        terrain = handle_mars.terrain
+        del handle_mars
+        self.assertTrue(terrain._data.closed)
+
+        with load_terrain(bitmap_path) as terrain:
+            Mars(5, 5, terrain=terrain).close()
+            self.assertFalse(terrain._data.closed)
+
+    def test_init_wrong_dimensions(self):
+        '''
+        Tests that a ValueError exception is raised if a bitmap does not match the plateau, or if a
+        sparse list holds an invalid line.
+        '''
+        bitmap_path, sparse_path = self.aux_write_terrains(6, 6, self.valid_blocked)
+        with open(sparse_path, 'a') as f:
+            f.write("1 2 3\n")
+        for illegal_args, path in (([4, 5], bitmap_path), ([5, 5], sparse_path)):
+            self.assertRaises(
+                                ValueError,
+                                Mars,
+                                *illegal_args,
+                                **{'terrain' : path}
+                                )
+
+
+if __name__ == '__main__':
+        main()
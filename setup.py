@@ -1,8 +1,13 @@
+import re
 from distutils.core import setup
 
+# the version is only written in the package itself
+with open('pyrover/__init__.py') as f:
+    version = re.search(r"^__version__ = '([^']+)'", f.read(), re.M).group(1)
+
 setup(
     name='pyrover',
-    version='1.0.4',
+    version=version,
     author='Jascha Casadio',
     author_email='jaschacasadio@gmail.com',
     packages=   [